@@ -0,0 +1,108 @@
+# run from src: python -m benchmarks.animation_clock_bench
+# animation frame lookup, the old per entity cursor ticked with a while loop vs sampling the shared clock with a bisect when drawn
+
+import json
+import random
+from os import path
+
+from benchmarks.bench_utils import base_dir, best_of
+from const import FIXED_DT, MAX_SIM_STEPS_PER_FRAME
+from nodes.animator import Animator, parse_animation_clip
+
+JSON_NAME = "blue_fly_idle_or_flying_anim_strip_3.json"
+# 1 sim tick, a long hitch, coming back to an entity after a while
+DTS = [FIXED_DT, 1_000.0, 60_000.0]
+ENTITIES = 1000
+# how many of them are on screen (and so get updated)
+VISIBLE = [50, 300]
+# sim ticks per rendered frame, 1 when keeping up, the cap when the render side lags
+TICKS_PER_FRAME = [1, MAX_SIM_STEPS_PER_FRAME]
+NUMBER = 20
+
+
+class LegacyCursor:
+    # the old Animator.update / get_current_frame, on the shared clip so only the stepping differs
+    def __init__(self, clip):
+        self.clip = clip
+        self.current_time = 0
+        self.current_frame = 0
+
+    def update(self, dt):
+        durations = self.clip.durations
+        self.current_time += dt
+        while self.current_time >= durations[self.current_frame]:
+            self.current_time -= durations[self.current_frame]
+            self.current_frame = (self.current_frame + 1) % len(durations)
+
+    def get_current_frame(self):
+        return self.clip.frames[self.current_frame]
+
+
+def run():
+    with open(path.join(base_dir, "jsons", JSON_NAME)) as file:
+        clip = parse_animation_clip(json.load(file))
+
+    per_dt = []
+    for dt in DTS:
+        legacy = [LegacyCursor(clip) for _ in range(ENTITIES)]
+        shared = [Animator(clip) for _ in range(ENTITIES)]
+        clock = [0.0]
+
+        def tick_legacy():
+            for animator in legacy:
+                animator.update(dt)
+                animator.get_current_frame()
+
+        def sample_shared():
+            clock[0] += dt
+            for animator in shared:
+                animator.get_current_frame(clock[0])
+
+        legacy_s = best_of(tick_legacy, number=NUMBER)
+        shared_s = best_of(sample_shared, number=NUMBER)
+        per_dt.append(
+            {
+                "dt_ms": dt,
+                "legacy_ns_per_entity": legacy_s / ENTITIES * 1e9,
+                "shared_ns_per_entity": shared_s / ENTITIES * 1e9,
+            }
+        )
+
+    # the sim ticks of 1 rendered frame and its draw, the old way ticked every updated (visible) entity each tick, the new way samples the drawn ones once
+    per_frame = []
+    for visible in VISIBLE:
+        for ticks in TICKS_PER_FRAME:
+            rng = random.Random(visible)
+            legacy = [LegacyCursor(clip) for _ in range(visible)]
+            shared = [
+                Animator(clip, rng.uniform(0, clip.total_time)) for _ in range(visible)
+            ]
+            clock = [0.0]
+
+            def frame_legacy():
+                for _ in range(ticks):
+                    for animator in legacy:
+                        animator.update(FIXED_DT)
+                for animator in legacy:
+                    animator.get_current_frame()
+
+            def frame_shared():
+                clock[0] += FIXED_DT * ticks
+                for animator in shared:
+                    animator.get_current_frame(clock[0])
+
+            legacy_s = best_of(frame_legacy, number=NUMBER)
+            shared_s = best_of(frame_shared, number=NUMBER)
+            per_frame.append(
+                {
+                    "visible": visible,
+                    "sim_ticks_per_frame": ticks,
+                    "legacy_us": legacy_s * 1e6,
+                    "shared_us": shared_s * 1e6,
+                }
+            )
+    return {"per_dt": per_dt, "per_frame": per_frame}
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,86 @@
+# run from src: python -m benchmarks.animation_flyweight_bench
+# spawning bats, every bat parsing the aseprite json into its own rects (the old Animator) vs 1 shared clip and a cursor each
+
+import json
+import tracemalloc
+from os import path
+
+import pygame
+
+from benchmarks.bench_utils import base_dir, best_of
+from nodes.animator import Animator, parse_animation_clip
+
+JSON_NAME = "blue_fly_idle_or_flying_anim_strip_3.json"
+COUNTS = [100, 500, 2000]
+
+
+class LegacyAnimator:
+    # the old Animator, frames parsed per instance
+    def __init__(self, sprite_sheet, animation_data):
+        self.sprite_sheet = sprite_sheet
+        self.frames = []
+        self.durations = []
+        self.total_time = 0
+        self.current_time = 0
+        self.current_frame = 0
+
+        for frame_name, frame_data in animation_data["frames"].items():
+            frame_rect = pygame.Rect(
+                frame_data["frame"]["x"],
+                frame_data["frame"]["y"],
+                frame_data["frame"]["w"],
+                frame_data["frame"]["h"],
+            )
+            self.frames.append(frame_rect)
+            self.durations.append(frame_data["duration"])
+            self.total_time += frame_data["duration"]
+
+
+def allocated_bytes(fn):
+    # what the made things still hold once made
+    tracemalloc.start()
+    made = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del made
+    return current
+
+
+def run():
+    with open(path.join(base_dir, "jsons", JSON_NAME)) as file:
+        animation_data = json.load(file)
+    sprite_sheet = pygame.Surface((24, 8))
+    clip = parse_animation_clip(animation_data)
+
+    results = []
+    for count in COUNTS:
+
+        def spawn_legacy():
+            return [LegacyAnimator(sprite_sheet, animation_data) for _ in range(count)]
+
+        def spawn_shared():
+            return [Animator(clip) for _ in range(count)]
+
+        legacy_s = best_of(spawn_legacy)
+        shared_s = best_of(spawn_shared)
+        legacy_bytes = allocated_bytes(spawn_legacy)
+        shared_bytes = allocated_bytes(spawn_shared)
+        results.append(
+            {
+                "animators": count,
+                "legacy_spawn_ms": legacy_s * 1e3,
+                "shared_spawn_ms": shared_s * 1e3,
+                "legacy_bytes_per_animator": legacy_bytes / count,
+                "shared_bytes_per_animator": shared_bytes / count,
+                "spawn_speedup": legacy_s / shared_s,
+            }
+        )
+    return {
+        "clip_parse_ms_once": best_of(lambda: parse_animation_clip(animation_data))
+        * 1e3,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
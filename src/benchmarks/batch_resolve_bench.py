@@ -0,0 +1,187 @@
+# run from src: python -m benchmarks.batch_resolve_bench
+# batched numpy move and slide against the scalar one, exits 1 on any case where they do not agree
+# 1. random rect / velocity / dt cases all over test_room, velocity, contact normal and tile hit must be identical, with and without the sat
+# 2. time a room's worth of bats through the scalar move_and_slide 1 by 1 vs move_and_slide_entities at several enemy counts
+
+import json
+import os
+import random
+import sys
+from os import path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+from benchmarks.bench_utils import base_dir, best_of  # noqa: E402
+from const import FIXED_DT  # noqa: E402
+from utils import batch_raycast_utils, raycast_utils  # noqa: E402
+from utils.init_pygame import init_pygame  # noqa: E402
+from utils.tilemap_utils import tile_range, tilemap_routine  # noqa: E402
+
+ROOM_JSON_NAME = "test_room.json"
+CASES = 100_000
+# bats are 8 x 8, the rest is there to hit more than 2 x 2 tile slots
+RECT_SIZES = [(8, 8)] * 6 + [(7, 18), (3, 5), (20, 12)]
+# px / ms, bat max_run is 0.09, some past it, some standing still, some under the 0.01 direction dead zone
+SPEEDS = [0.0, 0.005, 0.05, 0.09, 0.2]
+DTS = [FIXED_DT, 16, 17]
+ENEMY_COUNTS = [16, 64, 150, 256, 1_024]
+
+
+class Entity:
+    # what move_and_slide_entities reads / writes
+    __slots__ = ("rect", "velocity")
+
+    def __init__(self, x, y, w, h, vx, vy):
+        self.rect = pygame.FRect(x, y, w, h)
+        self.velocity = pygame.Vector2(vx, vy)
+
+
+def random_cases(data, count, seed):
+    # rect anywhere in (and a bit past) the room, velocity of a random speed in each axis
+    rng = random.Random(seed)
+    room_w = data["width"] * data["tileheight"]
+    room_h = data["height"] * data["tileheight"]
+    cases = []
+    for _ in range(count):
+        w, h = rng.choice(RECT_SIZES)
+        cases.append(
+            (
+                rng.uniform(-w, room_w),
+                rng.uniform(-h, room_h),
+                w,
+                h,
+                rng.choice(SPEEDS) * rng.uniform(-1, 1),
+                rng.choice(SPEEDS) * rng.uniform(-1, 1),
+                rng.choice(DTS),
+            )
+        )
+    return cases
+
+
+def count_mismatches(data, cases, use_sat):
+    # scalar resolve 1 case at a time vs 1 batch per dt, also how many cases hit a tile / got their velocity resolved
+    mismatches = 0
+    hit = 0
+    resolved = 0
+    for dt in DTS:
+        group = [case for case in cases if case[6] == dt]
+        rects = np.array([case[:4] for case in group], dtype=np.float32)
+        velocities = np.array([case[4:6] for case in group], dtype=np.float64)
+        contact_normals = np.zeros((len(group), 2), dtype=np.float64)
+        tiles_hit = batch_raycast_utils.resolve_vel_against_solid_tiles_batch(
+            rects,
+            dt,
+            velocities,
+            data["tileheight"],
+            data["collision_grid"],
+            contact_normals,
+            data["collision_sat_grid"] if use_sat else None,
+        )
+        for i, (x, y, w, h, vx, vy, _) in enumerate(group):
+            velocity = pygame.Vector2(vx, vy)
+            contact_normal = pygame.Vector2(0.0, 0.0)
+            tile_hit = raycast_utils.resolve_vel_against_solid_tiles(
+                pygame.FRect(x, y, w, h),
+                dt,
+                velocity,
+                data["tileheight"],
+                data["width"],
+                data["height"],
+                data["collision_layer"],
+                pygame.Vector2(0.0, 0.0),
+                contact_normal,
+                collision_sat=data["collision_sat"] if use_sat else None,
+            )
+            if (
+                velocity.x != velocities[i, 0]
+                or velocity.y != velocities[i, 1]
+                or contact_normal.x != contact_normals[i, 0]
+                or contact_normal.y != contact_normals[i, 1]
+                or tile_hit != tiles_hit[i]
+            ):
+                mismatches += 1
+            hit += tile_hit != 0
+            resolved += velocity.x != vx or velocity.y != vy
+    return mismatches, hit, resolved
+
+
+def time_paths(data, count, seed):
+    # bat sized, bat speed, starting in air, both paths start every run from the same spots
+    rng = random.Random(seed)
+    entities = []
+    while len(entities) < count:
+        x = rng.uniform(0, data["width"] * data["tileheight"] - 8)
+        y = rng.uniform(0, data["height"] * data["tileheight"] - 8)
+        entity = Entity(x, y, 8, 8, rng.uniform(-0.09, 0.09), rng.uniform(-0.09, 0.09))
+        tiles = tile_range(x, y, 8, 8, data["tileheight"])
+        if not raycast_utils.count_collidable_tiles(
+            *tiles, data["width"], data["height"], data["collision_sat"]
+        ):
+            entities.append(entity)
+    start_state = [(e.rect.copy(), e.velocity.copy()) for e in entities]
+
+    def reset():
+        for entity, (rect, velocity) in zip(entities, start_state):
+            entity.rect.update(rect)
+            entity.velocity.update(velocity)
+
+    def scalar():
+        reset()
+        for entity in entities:
+            raycast_utils.move_and_slide(
+                entity.rect,
+                FIXED_DT,
+                entity.velocity,
+                data["tileheight"],
+                data["width"],
+                data["height"],
+                data["collision_layer"],
+                pygame.Vector2(0.0, 0.0),
+                pygame.Vector2(0.0, 0.0),
+                collision_sat=data["collision_sat"],
+            )
+
+    def batched():
+        reset()
+        batch_raycast_utils.move_and_slide_entities(
+            entities,
+            FIXED_DT,
+            data["tileheight"],
+            data["collision_grid"],
+            data["collision_sat_grid"],
+        )
+
+    reset_s = best_of(reset, number=20)
+    return {
+        "enemies": count,
+        "scalar_ms": (best_of(scalar, number=20) - reset_s) * 1e3,
+        "batch_ms": (best_of(batched, number=20) - reset_s) * 1e3,
+    }
+
+
+def run():
+    init_pygame(headless=True)
+    data = tilemap_routine(
+        path.join(base_dir, "jsons", ROOM_JSON_NAME), base_dir, "", None, headless=True
+    )
+    cases = random_cases(data, CASES, seed=0)
+    mismatches, hit, resolved = count_mismatches(data, cases, use_sat=False)
+    mismatches_with_sat, _, _ = count_mismatches(data, cases, use_sat=True)
+    return {
+        "room": ROOM_JSON_NAME,
+        "cases": CASES,
+        "cases_hitting_a_tile": hit,
+        "cases_resolved": resolved,
+        "mismatches": mismatches,
+        "mismatches_with_sat": mismatches_with_sat,
+        "timings": [time_paths(data, count, seed=count) for count in ENEMY_COUNTS],
+    }
+
+
+if __name__ == "__main__":
+    results = run()
+    print(json.dumps(results, indent=2))
+    sys.exit(1 if results["mismatches"] or results["mismatches_with_sat"] else 0)
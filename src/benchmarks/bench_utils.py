@@ -0,0 +1,78 @@
+# bits shared by the benchmarks
+
+import json
+import random
+import time
+from os import listdir, path
+
+import pygame
+
+from const import TILE_COLLIDABLE
+
+base_dir = path.dirname(path.dirname(path.abspath(__file__)))
+
+
+class Item:
+    """Bare minimum a spatial index needs, a rect (a bat sized one by default) and a type for tagged queries"""
+
+    __slots__ = ("rect", "type")
+
+    def __init__(
+        self, x: float, y: float, w: float = 8, h: float = 8, type: str | None = None
+    ) -> None:
+        self.rect = pygame.FRect(x, y, w, h)
+        self.type = type
+
+
+def room_json_names() -> list[str]:
+    """Every tiled map in jsons, the rest are spritesheet jsons"""
+    names = []
+    for name in sorted(listdir(path.join(base_dir, "jsons"))):
+        with open(path.join(base_dir, "jsons", name)) as file:
+            if "layers" in json.load(file):
+                names.append(name)
+    return names
+
+
+def best_of(fn, number: int = 1, repeat: int = 5) -> float:
+    """Best seconds per call of fn over repeat runs of number calls, the least noisy number we can get"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def random_air_positions(room, count: int, seed: int) -> list[tuple[float, float]]:
+    """count random bottom left positions inside air tiles of a loaded room"""
+    rng = random.Random(seed)
+    air = [
+        index
+        for index, tile in enumerate(room.collision_layer)
+        if not tile & TILE_COLLIDABLE
+    ]
+    positions = []
+    for index in rng.choices(air, k=count):
+        x = (index % room.width) * room.tileheight
+        y = (index // room.width + 1) * room.tileheight
+        positions.append((float(x), float(y)))
+    return positions
+
+
+def spawn_enemies(room, count: int, seed: int = 0) -> list:
+    """Add count more enemies of the room's first enemy kind at random air tiles, like the room json had them"""
+    entity_data = next(iter(room.spritesheet_instanced_data.values()))
+    spawned = [
+        entity_data["class_ref"](
+            x,
+            y,
+            room,
+            entity_data["png"],
+            entity_data["clip"],
+        )
+        for x, y in random_air_positions(room, count, seed)
+    ]
+    room.enemy_layer_list.extend(spawned)
+    return spawned
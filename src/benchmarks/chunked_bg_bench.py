@@ -0,0 +1,148 @@
+# run from src: python -m benchmarks.chunked_bg_bench
+# room bg as 1 pre rendered surface vs lazily painted chunks in an lru, load time, memory and per frame cost while the camera pans around
+# the big rooms are test_room's tile layers repeated scale x scale times
+
+import json
+import math
+import os
+import time
+from os import path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from benchmarks.bench_utils import base_dir  # noqa: E402
+from const import HEIGHT, SPRITESHEET_WIDTH, WIDTH  # noqa: E402
+from utils.chunked_bg_utils import ChunkedBackground  # noqa: E402
+from utils.init_pygame import init_pygame  # noqa: E402
+
+ROOM_JSON_NAME = "test_room.json"
+SCALES = [1, 4, 12]
+FRAMES = 600
+# px per frame, the camera sweeps the room in a lissajous so it keeps coming back to places it has seen
+PAN_SPEED = 4.0
+
+
+def scaled_layers(data, scale):
+    width = data["width"]
+    height = data["height"]
+    layers = []
+    for layer in data["layers"]:
+        if layer["type"] != "tilelayer":
+            continue
+        rows = [
+            layer["data"][y * width : (y + 1) * width] * scale for y in range(height)
+        ]
+        layers.append([tile for _ in range(scale) for row in rows for tile in row])
+    return layers, width * scale, height * scale
+
+
+def pre_render_full(layers, width, height, tileheight, spritesheet):
+    # the old way, every tile of every layer on 1 room sized surface
+    pre_rendered_bg = pygame.Surface(
+        (width * tileheight, height * tileheight), pygame.SRCALPHA
+    )
+    for layer_data in layers:
+        for index, tile_id in enumerate(layer_data):
+            tile_id -= 1
+            if tile_id == -1:
+                continue
+            pre_rendered_bg.blit(
+                spritesheet,
+                ((index % width) * tileheight, (index // width) * tileheight),
+                (
+                    (tile_id % SPRITESHEET_WIDTH) * tileheight,
+                    (tile_id // SPRITESHEET_WIDTH) * tileheight,
+                    tileheight,
+                    tileheight,
+                ),
+            )
+    return pre_rendered_bg
+
+
+def cameras(width_px, height_px):
+    camera = pygame.FRect(0, 0, WIDTH, HEIGHT)
+    span_x = max(width_px - WIDTH, 0)
+    span_y = max(height_px - HEIGHT, 0)
+    for frame in range(FRAMES):
+        t = frame * PAN_SPEED / max(span_x, span_y, 1)
+        camera.x = span_x * (0.5 - 0.5 * math.cos(t * math.pi))
+        camera.y = span_y * (0.5 - 0.5 * math.cos(t * math.pi * 0.7))
+        yield camera
+
+
+def run():
+    screen = init_pygame().screen
+    with open(path.join(base_dir, "jsons", ROOM_JSON_NAME)) as file:
+        data = json.load(file)
+    tileheight = data["tileheight"]
+    sheet_name = path.splitext(path.basename(data["tilesets"][0]["source"]))[0]
+    spritesheet = pygame.image.load(
+        path.join(base_dir, "pngs", f"{sheet_name}.png")
+    ).convert_alpha()
+
+    results = []
+    for scale in SCALES:
+        layers, width, height = scaled_layers(data, scale)
+        width_px = width * tileheight
+        height_px = height * tileheight
+
+        start = time.perf_counter()
+        pre_rendered_bg = pre_render_full(
+            layers, width, height, tileheight, spritesheet
+        )
+        full_load_ms = (time.perf_counter() - start) * 1e3
+        full_frame_ms = []
+        for camera in cameras(width_px, height_px):
+            start = time.perf_counter()
+            screen.blit(pre_rendered_bg, (-camera.x, -camera.y))
+            full_frame_ms.append((time.perf_counter() - start) * 1e3)
+        full_bytes = pre_rendered_bg.get_bytesize() * width_px * height_px
+        del pre_rendered_bg
+
+        start = time.perf_counter()
+        background = ChunkedBackground(layers, width, height, tileheight, spritesheet)
+        chunked_load_ms = (time.perf_counter() - start) * 1e3
+        chunked_frame_ms = []
+        chunks_blitted = 0
+        peak_cached_bytes = 0
+        for camera in cameras(width_px, height_px):
+            background.draw(screen, camera)
+            chunked_frame_ms.append(background.blit_ms)
+            chunks_blitted += background.chunks_blitted
+            peak_cached_bytes = max(
+                peak_cached_bytes, background.stats()["cached_bytes"]
+            )
+        stats = background.stats()
+
+        full_frame_ms.sort()
+        chunked_frame_ms.sort()
+        results.append(
+            {
+                "tiles": f"{width} x {height}",
+                "full": {
+                    "load_ms": full_load_ms,
+                    "bytes": full_bytes,
+                    "median_frame_ms": full_frame_ms[FRAMES // 2],
+                    "max_frame_ms": full_frame_ms[-1],
+                },
+                "chunked": {
+                    "load_ms": chunked_load_ms,
+                    "peak_cached_bytes": peak_cached_bytes,
+                    "tile_bytes": stats["tile_bytes"],
+                    "median_frame_ms": chunked_frame_ms[FRAMES // 2],
+                    # a frame that had to paint new chunks
+                    "max_frame_ms": chunked_frame_ms[-1],
+                    "chunks_per_frame": chunks_blitted / FRAMES,
+                    "chunks_painted": stats["chunks_painted"],
+                    "ms_per_chunk_painted": stats["paint_ms"] / stats["chunks_painted"],
+                    "evictions": stats["evictions"],
+                },
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
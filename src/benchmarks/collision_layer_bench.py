@@ -0,0 +1,148 @@
+# run from src: python -m benchmarks.collision_layer_bench
+# old "0" / "1" / "2" str collision layer vs the bytes of tile flags, memory and lookup cost
+
+import json
+import os
+import sys
+import timeit
+from os import path
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from const import TILE_COLLIDABLE  # noqa: E402
+from utils.init_pygame import init_pygame  # noqa: E402
+from utils.tilemap_utils import tilemap_routine  # noqa: E402
+
+base_dir = path.dirname(path.dirname(path.abspath(__file__)))
+
+# tile the biggest room this many times each way to stand in for the big rooms we are designing
+SCALE_UP = 10
+
+
+def old_get_tile_and_position(
+    world_tu_x, world_tu_y, width, height, world_map_grid_data, tileheight
+):
+    # the resolver's helper from before the flag bytes, as it was
+    if 0 <= world_tu_x < width and 0 <= world_tu_y < height:
+        tile = world_map_grid_data[world_tu_y * width + world_tu_x]
+        return tile, (world_tu_x * tileheight, world_tu_y * tileheight)
+    else:
+        return "-1", (-1, -1)  # Out of bounds
+
+
+def old_scan(width, height, tileheight, collision_layer):
+    # what the resolver used to do per candidate tile, get_tile_and_position then str compares
+    # the position of a hit placed the tile rect for the ray test, summed here so it is used
+    hits = 0
+    position_sum = 0
+    for world_tu_x in range(-1, width + 1):
+        for world_tu_y in range(-1, height + 1):
+            tile, position = old_get_tile_and_position(
+                world_tu_x, world_tu_y, width, height, collision_layer, tileheight
+            )
+            if tile == "0" or tile == "-1":
+                continue
+            hits += 1
+            position_sum += position[0] + position[1]
+    return hits, position_sum
+
+
+def new_scan(width, height, tileheight, collision_layer):
+    # what the resolver does now, read the flag byte and test the bits, the kernel takes the tile position as 2 floats
+    hits = 0
+    position_sum = 0
+    for world_tu_x in range(-1, width + 1):
+        if not 0 <= world_tu_x < width:
+            continue
+        for world_tu_y in range(-1, height + 1):
+            if not 0 <= world_tu_y < height:
+                continue
+            tile = collision_layer[world_tu_y * width + world_tu_x]
+            if not tile & TILE_COLLIDABLE:
+                continue
+            hits += 1
+            position_sum += world_tu_x * tileheight + world_tu_y * tileheight
+    return hits, position_sum
+
+
+def measure(name, width, height, tileheight, collision_layer, collision_grid):
+    old_layer = "".join(str(tile) for tile in collision_layer)
+    assert old_scan(width, height, tileheight, old_layer) == new_scan(
+        width, height, tileheight, collision_layer
+    )
+    lookups = (width + 2) * (height + 2)
+    number = max(1, 200_000 // lookups)
+    old_s = min(
+        timeit.repeat(
+            lambda: old_scan(width, height, tileheight, old_layer),
+            number=number,
+            repeat=5,
+        )
+    )
+    new_s = min(
+        timeit.repeat(
+            lambda: new_scan(width, height, tileheight, collision_layer),
+            number=number,
+            repeat=5,
+        )
+    )
+    return {
+        "room": name,
+        "tiles": width * height,
+        "str_bytes": sys.getsizeof(old_layer),
+        "flags_bytes": sys.getsizeof(collision_layer),
+        # the numpy grid is a view on the same buffer, only its header costs
+        "numpy_view_bytes": sys.getsizeof(collision_grid),
+        "str_ns_per_lookup": old_s / (lookups * number) * 1e9,
+        "flags_ns_per_lookup": new_s / (lookups * number) * 1e9,
+    }
+
+
+def run():
+    init_pygame()
+    results = []
+    biggest = None
+    for json_name in sorted(os.listdir(path.join(base_dir, "jsons"))):
+        if not json_name.startswith("test_room"):
+            continue
+        data = tilemap_routine(
+            path.join(base_dir, "jsons", json_name), base_dir, "", None
+        )
+        results.append(
+            measure(
+                json_name,
+                data["width"],
+                data["height"],
+                data["tileheight"],
+                data["collision_layer"],
+                data["collision_grid"],
+            )
+        )
+        if (
+            biggest is None
+            or data["collision_grid"].size > biggest["collision_grid"].size
+        ):
+            biggest = data
+
+    # scaled up copy of the biggest room
+    collision_grid = np.tile(biggest["collision_grid"], (SCALE_UP, SCALE_UP))
+    collision_layer = collision_grid.tobytes()
+    results.append(
+        measure(
+            f"biggest x{SCALE_UP}",
+            collision_grid.shape[1],
+            collision_grid.shape[0],
+            biggest["tileheight"],
+            collision_layer,
+            np.frombuffer(collision_layer, dtype=np.uint8).reshape(
+                collision_grid.shape
+            ),
+        )
+    )
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,137 @@
+# run from src: python -m benchmarks.flat_quadtree_bench
+# object QuadTree vs pooled FlatQuadTree, time and allocations per frame
+# a frame is upkeep (clear and insert everyone, or move everyone) plus 1 camera search and 1 search per bat around itself
+# ms_per_frame is the best frame (least noisy), flat_vs_quadtree is flat ms / object ms, under 1 means the flat tree wins
+
+import json
+import random
+import time
+import tracemalloc
+
+import pygame
+
+from benchmarks.bench_utils import Item
+from utils import quadtree_utils
+from utils.flat_quadtree_utils import FlatQuadTree
+
+WORLD = (0, 0, 4096, 4096)
+COUNTS = [200, 2_000, 10_000]
+FRAMES = 20
+# tracemalloc is slow, only a couple of frames for the allocation numbers
+TRACED_FRAMES = 2
+STEP = 1.5
+
+
+def make_frame(index, items, upkeep, buffer):
+    camera = pygame.FRect(1888, 1958, 320, 180)
+    flat = isinstance(index, FlatQuadTree)
+
+    def frame():
+        if upkeep == "rebuild":
+            index.clear()
+            for item in items:
+                index.insert(item)
+        else:
+            for item in items:
+                index.move(item)
+            index.collapse_empty()
+        if flat:
+            index.search_into(camera, buffer)
+            for item in items:
+                index.search_into(item.rect, buffer)
+        else:
+            index.search(camera)
+            for item in items:
+                index.search(item.rect)
+
+    return frame
+
+
+def measure(make_index, count, upkeep):
+    rng = random.Random(count)
+    items = [Item(rng.uniform(0, 4088), rng.uniform(0, 4088)) for _ in range(count)]
+    steps = [(rng.uniform(-STEP, STEP), rng.uniform(-STEP, STEP)) for _ in items]
+    index = make_index()
+    for item in items:
+        index.insert(item)
+    frame = make_frame(index, items, upkeep, [])
+    flat = isinstance(index, FlatQuadTree)
+
+    def step(tick):
+        # back and forth so every frame has the same amount of motion
+        sign = 1 if tick % 2 == 0 else -1
+        for item, (dx, dy) in zip(items, steps):
+            item.rect.x += dx * sign
+            item.rect.y += dy * sign
+
+    frame_s = float("inf")
+    for tick in range(FRAMES):
+        step(tick)
+        start = time.perf_counter()
+        frame()
+        frame_s = min(frame_s, time.perf_counter() - start)
+
+    # the object tree makes a node object per child and a list per search call (recursion included)
+    # the flat one only ever grows its slot lists, and search_into fills the one buffer
+    created = {"nodes": 0, "search_lists": 0}
+    original_init = quadtree_utils.QuadTree.__init__
+    original_search = quadtree_utils.QuadTree.search
+
+    def counting_init(self, *args, **kwargs):
+        created["nodes"] += 1
+        original_init(self, *args, **kwargs)
+
+    def counting_search(self, area):
+        created["search_lists"] += 1
+        return original_search(self, area)
+
+    peak_bytes = 0
+    for tick in range(TRACED_FRAMES):
+        step(tick)
+        slots_before = len(index.x) if flat else 0
+        quadtree_utils.QuadTree.__init__ = counting_init
+        quadtree_utils.QuadTree.search = counting_search
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        frame()
+        peak_bytes += tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+        quadtree_utils.QuadTree.__init__ = original_init
+        quadtree_utils.QuadTree.search = original_search
+        if flat:
+            created["nodes"] += len(index.x) - slots_before
+
+    return {
+        "ms_per_frame": frame_s * 1e3,
+        "nodes_created_per_frame": created["nodes"] / TRACED_FRAMES,
+        "search_lists_created_per_frame": created["search_lists"] / TRACED_FRAMES,
+        # tracemalloc peak over what was live before the frame
+        "peak_alloc_kib_per_frame": peak_bytes / TRACED_FRAMES / 1024,
+    }
+
+
+def run():
+    results = []
+    for count in COUNTS:
+        for upkeep in ("rebuild", "move"):
+            quadtree = measure(
+                lambda: quadtree_utils.QuadTree(pygame.FRect(WORLD)), count, upkeep
+            )
+            flat_quadtree = measure(
+                lambda: FlatQuadTree(pygame.FRect(WORLD)), count, upkeep
+            )
+            results.append(
+                {
+                    "items": count,
+                    "upkeep": upkeep,
+                    "flat_vs_quadtree": flat_quadtree["ms_per_frame"]
+                    / quadtree["ms_per_frame"],
+                    "quadtree": quadtree,
+                    "flat_quadtree": flat_quadtree,
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,44 @@
+# run from src: python -m benchmarks.headless_sim_bench
+# sim ticks per second of every room with no window, this is the number to track
+
+import json
+import time
+
+from benchmarks.bench_utils import base_dir, room_json_names
+from const import FIXED_DT
+from nodes.room import Room
+from utils.init_pygame import init_pygame
+
+WARMUP_TICKS = 60
+TICKS = 3000
+
+
+def run():
+    init_pygame(headless=True)
+    results = []
+    for name in room_json_names():
+        room = Room(base_dir, name, headless=True)
+        for _ in range(WARMUP_TICKS):
+            room.update(FIXED_DT)
+
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            room.update(FIXED_DT)
+        elapsed = time.perf_counter() - start
+
+        results.append(
+            {
+                "room": name,
+                "enemies": len(room.enemy_layer_list),
+                "ticks": TICKS,
+                "ms_per_tick": elapsed / TICKS * 1e3,
+                "sim_ticks_per_second": TICKS / elapsed,
+                # real time the sim covers per real second, 1.0 is just keeping up
+                "realtime_factor": TICKS * FIXED_DT / 1e3 / elapsed,
+            }
+        )
+    return {"fixed_dt_ms": FIXED_DT, "rooms": results}
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
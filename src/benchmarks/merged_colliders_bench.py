@@ -0,0 +1,129 @@
+# run from src: python -m benchmarks.merged_colliders_bench
+# bats bouncing around test_room, per tile move and slide vs merged boxes on the same bats, ray tests and time per frame
+
+import json
+import os
+import random
+import time
+from os import path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from const import TILE_COLLIDABLE  # noqa: E402
+from utils import raycast_utils  # noqa: E402
+from utils.init_pygame import init_pygame  # noqa: E402
+from utils.tilemap_utils import tilemap_routine  # noqa: E402
+
+base_dir = path.dirname(path.dirname(path.abspath(__file__)))
+
+ROOM_JSON_NAME = "test_room.json"
+BAT_COUNT = 200
+FRAMES = 300
+DT = 16
+MAX_RUN = 0.09
+
+
+def spawn_bats(data, seed):
+    # bats in air tiles only, same spots for both modes
+    rng = random.Random(seed)
+    width, tileheight = data["width"], data["tileheight"]
+    air = [
+        index
+        for index, tile in enumerate(data["collision_layer"])
+        if not tile & TILE_COLLIDABLE
+    ]
+    bats = []
+    for index in rng.choices(air, k=BAT_COUNT):
+        rect = pygame.FRect(
+            (index % width) * tileheight + 4, (index // width) * tileheight + 4, 8, 8
+        )
+        direction = pygame.Vector2(rng.choice([1, -1]), rng.choice([1, -1]))
+        bats.append((rect, pygame.Vector2(direction * MAX_RUN), direction))
+    return bats
+
+
+def resolve(data, bats, merged_colliders):
+    # move and slide every bat from the same state, returns the resolved velocities and normals
+    results = []
+    for rect, _, direction in bats:
+        velocity = direction * MAX_RUN
+        contact_normal = pygame.Vector2(0.0, 0.0)
+        raycast_utils.resolve_vel_against_solid_tiles(
+            rect,
+            DT,
+            velocity,
+            data["tileheight"],
+            data["width"],
+            data["height"],
+            data["collision_layer"],
+            pygame.Vector2(0.0, 0.0),
+            contact_normal,
+            collision_sat=data["collision_sat"],
+            merged_colliders=merged_colliders,
+        )
+        results.append((velocity, contact_normal))
+    return results
+
+
+def simulate(data, merged_colliders):
+    # both modes see the exact same bats every frame, the per tile result is what moves them on
+    room_rect = pygame.FRect(
+        0, 0, data["width"] * data["tileheight"], data["height"] * data["tileheight"]
+    )
+    bats = spawn_bats(data, seed=0)
+    totals = {
+        "per_tile": {"ray_tests": 0, "seconds": 0.0},
+        "merged": {"ray_tests": 0, "seconds": 0.0},
+    }
+    for _ in range(FRAMES):
+        for mode, colliders in (("merged", merged_colliders), ("per_tile", None)):
+            raycast_utils.reset_resolve_counters()
+            start = time.perf_counter()
+            results = resolve(data, bats, colliders)
+            totals[mode]["seconds"] += time.perf_counter() - start
+            totals[mode]["ray_tests"] += raycast_utils.resolve_counters["ray_tests"]
+
+        for (rect, velocity, direction), (new_velocity, contact_normal) in zip(
+            bats, results
+        ):
+            velocity.update(new_velocity)
+            direction.x = contact_normal.x or direction.x
+            direction.y = contact_normal.y or direction.y
+            rect.x += velocity.x * DT
+            rect.y += velocity.y * DT
+            rect.clamp_ip(room_rect)
+
+    return {
+        mode: {
+            "ray_tests_per_frame": total["ray_tests"] / FRAMES,
+            "ms_per_frame": total["seconds"] / FRAMES * 1e3,
+        }
+        for mode, total in totals.items()
+    }
+
+
+def run():
+    init_pygame()
+    data = tilemap_routine(
+        path.join(base_dir, "jsons", ROOM_JSON_NAME),
+        base_dir,
+        "",
+        None,
+        merge_colliders=True,
+    )
+    merged_colliders = data["merged_colliders"]
+    return {
+        "room": ROOM_JSON_NAME,
+        "bats": BAT_COUNT,
+        "collidable_tiles": sum(
+            1 for tile in data["collision_layer"] if tile & TILE_COLLIDABLE
+        ),
+        "merged_boxes": len(merged_colliders.rects),
+        **simulate(data, merged_colliders),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
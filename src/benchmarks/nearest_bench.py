@@ -0,0 +1,98 @@
+# run from src: python -m benchmarks.nearest_bench
+# QuadTree.nearest / within_radius vs a brute force scan, aggro range and target picking sized queries
+
+import json
+import random
+
+import pygame
+
+from benchmarks.bench_utils import Item, best_of
+from utils.quadtree_utils import QuadTree
+
+WORLD = (0, 0, 4096, 4096)
+COUNTS = [200, 2_000, 10_000]
+QUERIES = 200
+KS = [1, 8]
+# about an aggro range and about a screen
+RADII = [64.0, 200.0]
+
+
+def distance_sq(point, rect):
+    dx = max(rect.left - point.x, 0.0, point.x - rect.right)
+    dy = max(rect.top - point.y, 0.0, point.y - rect.bottom)
+    return dx * dx + dy * dy
+
+
+def brute_nearest(items, point, k):
+    return sorted(items, key=lambda item: distance_sq(point, item.rect))[:k]
+
+
+def brute_within(items, point, radius):
+    return [item for item in items if distance_sq(point, item.rect) <= radius * radius]
+
+
+def run():
+    results = []
+    for count in COUNTS:
+        rng = random.Random(count)
+        items = [Item(rng.uniform(0, 4088), rng.uniform(0, 4088)) for _ in range(count)]
+        quadtree = QuadTree(pygame.FRect(WORLD))
+        for item in items:
+            quadtree.insert(item)
+        points = [
+            pygame.Vector2(rng.uniform(0, 4096), rng.uniform(0, 4096))
+            for _ in range(QUERIES)
+        ]
+
+        result = {"items": count, "queries": QUERIES}
+        for k in KS:
+            # ties can come out in any order, compare distances
+            mismatches = sum(
+                [distance_sq(point, item.rect) for item in quadtree.nearest(point, k)]
+                != [
+                    distance_sq(point, item.rect)
+                    for item in brute_nearest(items, point, k)
+                ]
+                for point in points
+            )
+            result[f"nearest_k{k}"] = {
+                "tree_us": best_of(
+                    lambda: [quadtree.nearest(point, k) for point in points], repeat=3
+                )
+                / QUERIES
+                * 1e6,
+                "brute_force_us": best_of(
+                    lambda: [brute_nearest(items, point, k) for point in points],
+                    repeat=1,
+                )
+                / QUERIES
+                * 1e6,
+                "mismatches": mismatches,
+            }
+        for radius in RADII:
+            mismatches = sum(
+                {id(item) for item in quadtree.within_radius(point, radius)}
+                != {id(item) for item in brute_within(items, point, radius)}
+                for point in points
+            )
+            result[f"within_radius_{radius:g}"] = {
+                "tree_us": best_of(
+                    lambda: [quadtree.within_radius(point, radius) for point in points],
+                    repeat=3,
+                )
+                / QUERIES
+                * 1e6,
+                "brute_force_us": best_of(
+                    lambda: [brute_within(items, point, radius) for point in points],
+                    repeat=1,
+                )
+                / QUERIES
+                * 1e6,
+                "mismatches": mismatches,
+            }
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,73 @@
+# run from src: python -m benchmarks.quadtree_move_bench
+# per tick enemy quadtree upkeep in a crowded room, clear and insert everyone vs move everyone
+
+import json
+import random
+import time
+
+from benchmarks.bench_utils import base_dir, spawn_enemies
+from const import FIXED_DT
+from nodes.room import Room
+from utils import quadtree_utils
+from utils.init_pygame import init_pygame
+
+ROOM_JSON_NAME = "test_room.json"
+ENEMY_COUNTS = [200, 1_000, 5_000, 20_000]
+TICKS = 60
+
+
+def run():
+    init_pygame(headless=True)
+    results = []
+    for count in ENEMY_COUNTS:
+        random.seed(0)
+        room = Room(base_dir, ROOM_JSON_NAME, headless=True)
+        spawn_enemies(room, count - len(room.enemy_layer_list), seed=count)
+        enemies = room.enemy_layer_list
+
+        # same bats, same positions, 2 trees kept side by side with the room's own
+        rebuilt = quadtree_utils.QuadTree(room.rect.copy())
+        moved = quadtree_utils.QuadTree(room.rect.copy())
+        for enemy in enemies:
+            moved.insert(enemy)
+
+        rebuild_s = 0.0
+        move_s = 0.0
+        relocations = 0
+        for _ in range(TICKS):
+            room.update(FIXED_DT)
+
+            start = time.perf_counter()
+            rebuilt.clear()
+            for enemy in enemies:
+                rebuilt.insert(enemy)
+            rebuild_s += time.perf_counter() - start
+
+            before = dict(moved.item_nodes)
+            start = time.perf_counter()
+            for enemy in enemies:
+                moved.move(enemy)
+            moved.collapse_empty()
+            move_s += time.perf_counter() - start
+            relocations += sum(
+                1
+                for enemy in enemies
+                if moved.item_nodes.get(enemy) is not before.get(enemy)
+            )
+
+        results.append(
+            {
+                "enemies": len(enemies),
+                "ticks": TICKS,
+                "rebuild_ms_per_tick": rebuild_s / TICKS * 1e3,
+                "move_ms_per_tick": move_s / TICKS * 1e3,
+                "speedup": rebuild_s / move_s,
+                "relocated_per_tick": relocations / TICKS,
+                "visible_enemies_last_tick": len(room.visible_enemies),
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
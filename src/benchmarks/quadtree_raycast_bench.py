@@ -0,0 +1,111 @@
+# run from src: python -m benchmarks.quadtree_raycast_bench
+# hitscan vs enemies, QuadTree.raycast vs search on the ray's bounding box + ray_vs_rect on every result vs ray_vs_rect on every enemy
+
+import json
+import math
+import random
+
+import pygame
+
+from benchmarks.bench_utils import Item, best_of
+from utils.quadtree_utils import QuadTree
+from utils.raycast_utils import ray_vs_rect_kernel
+
+WORLD = (0, 0, 4096, 4096)
+COUNTS = [200, 2_000, 10_000]
+RAYS = 200
+# short shot, about a screen, long diagonal across most of the room
+LENGTHS = [64.0, 320.0, 3000.0]
+
+
+def first_hit(items, origin, direction, max_t):
+    # same rules as QuadTree.raycast, but over the given items
+    dir_x = direction.x * max_t
+    dir_y = direction.y * max_t
+    best_item = None
+    best_t = math.inf
+    for item in items:
+        rect = item.rect
+        hit, t, _, _ = ray_vs_rect_kernel(
+            origin.x, origin.y, dir_x, dir_y, rect.x, rect.y, rect.w, rect.h
+        )
+        if not hit or t != t or t > 1.0:
+            continue
+        t = max(t, 0.0)
+        if t < best_t:
+            best_item = item
+            best_t = t
+    return best_item, best_t * max_t
+
+
+def bounding_box(origin, direction, max_t):
+    end = origin + direction * max_t
+    left, right = sorted((origin.x, end.x))
+    top, bottom = sorted((origin.y, end.y))
+    return pygame.FRect(left, top, right - left, bottom - top)
+
+
+def run():
+    results = []
+    for count in COUNTS:
+        rng = random.Random(count)
+        items = [Item(rng.uniform(0, 4088), rng.uniform(0, 4088)) for _ in range(count)]
+        quadtree = QuadTree(pygame.FRect(WORLD))
+        for item in items:
+            quadtree.insert(item)
+
+        for length in LENGTHS:
+            rays = []
+            for _ in range(RAYS):
+                angle = rng.uniform(0, math.tau)
+                rays.append(
+                    (
+                        pygame.Vector2(rng.uniform(0, 4096), rng.uniform(0, 4096)),
+                        pygame.Vector2(math.cos(angle), math.sin(angle)),
+                        length,
+                    )
+                )
+
+            mismatches = 0
+            hits = 0
+            for origin, direction, max_t in rays:
+                hit = quadtree.raycast(origin, direction, max_t)
+                _, t = first_hit(items, origin, direction, max_t)
+                # ties can pick either item, compare t
+                if (hit is None) != (t == math.inf) or (hit and abs(hit.t - t) > 1e-9):
+                    mismatches += 1
+                hits += hit is not None
+
+            results.append(
+                {
+                    "items": count,
+                    "ray_length": length,
+                    "rays": RAYS,
+                    "hits": hits,
+                    "mismatches": mismatches,
+                    "raycast_us": best_of(
+                        lambda: [quadtree.raycast(*ray) for ray in rays], repeat=3
+                    )
+                    / RAYS
+                    * 1e6,
+                    "search_bbox_us": best_of(
+                        lambda: [
+                            first_hit(quadtree.search(bounding_box(*ray)), *ray)
+                            for ray in rays
+                        ],
+                        repeat=1,
+                    )
+                    / RAYS
+                    * 1e6,
+                    "brute_force_us": best_of(
+                        lambda: [first_hit(items, *ray) for ray in rays], repeat=1
+                    )
+                    / RAYS
+                    * 1e6,
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
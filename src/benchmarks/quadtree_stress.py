@@ -0,0 +1,217 @@
+# run from src: python -m benchmarks.quadtree_stress
+# random insert / move / remove / search / query_pairs on every SPATIAL_INDEX_CLASSES backend against brute force, exits 1 on any mismatch
+# every frame some items are removed and put right back, or hop off the area and back, before anything queries
+# the old first overlapping child quadtree runs alongside to show what it used to miss
+
+import json
+import random
+import sys
+import time
+from typing import List
+
+import pygame
+
+from benchmarks.bench_utils import Item
+from nodes.room import SPATIAL_INDEX_CLASSES
+
+WORLD = (0, 0, 2048, 2048)
+ITEMS = 3_000
+FRAMES = 200
+SEARCHES_PER_FRAME = 50
+# mostly bats, some big stuff that straddles even the root quadrants
+ITEM_SIZES = [(8, 8)] * 8 + [(16, 16), (48, 24), (400, 16)]
+MAX_STEP = 6.0
+
+
+class LegacyQuadTree:
+    # the old one, straddlers go to whatever child they overlap first
+    MAX_DEPTH: int = 6
+    MAX_ITEMS: int = 4
+
+    def __init__(self, rect: pygame.FRect, depth: int = 0) -> None:
+        self.rect = rect
+        self.depth = depth
+        self.items: List[any] = []
+        self.children: List[LegacyQuadTree] = []
+
+    def insert(self, particle: any) -> bool:
+        if not self.rect.colliderect(particle.rect):
+            return False
+        if len(self.items) < self.MAX_ITEMS or self.depth >= self.MAX_DEPTH:
+            self.items.append(particle)
+            return True
+        if not self.children:
+            half_w, half_h = self.rect.w / 2, self.rect.h / 2
+            for dx, dy in [(0, 0), (half_w, 0), (0, half_h), (half_w, half_h)]:
+                self.children.append(
+                    LegacyQuadTree(
+                        pygame.FRect(
+                            self.rect.x + dx, self.rect.y + dy, half_w, half_h
+                        ),
+                        self.depth + 1,
+                    )
+                )
+        for child in self.children:
+            if child.insert(particle):
+                return True
+        return False
+
+    def search(self, area: pygame.FRect) -> List[any]:
+        found = [p for p in self.items if area.colliderect(p.rect)]
+        for child in self.children:
+            if child.rect.colliderect(area):
+                found.extend(child.search(area))
+        return found
+
+
+def node_stats(node, depth_items, leaf_items):
+    depth_items[node.depth] = depth_items.get(node.depth, 0) + len(node.items)
+    if not node.children:
+        leaf_items.append(len(node.items))
+    for child in node.children:
+        node_stats(child, depth_items, leaf_items)
+
+
+def brute_force_pairs(stored, area):
+    # every overlapping pair of stored items with at least 1 of the 2 in area, as id pairs in either order
+    pairs = set()
+    near = [item for item in stored if area.colliderect(item.rect)]
+    for item in near:
+        for other in stored:
+            if other is not item and item.rect.colliderect(other.rect):
+                pairs.add(frozenset((id(item), id(other))))
+    return pairs
+
+
+def update(index, stored, item, op):
+    # run op on index and keep stored (what brute force expects it to hold) in step with what it returned
+    if op == "remove":
+        index.remove(item)
+        stored.discard(item)
+    elif getattr(index, op)(item):
+        stored.add(item)
+    else:
+        stored.discard(item)
+
+
+def run():
+    rng = random.Random(0)
+    world = pygame.FRect(WORLD)
+    items = []
+    for _ in range(ITEMS):
+        w, h = rng.choice(ITEM_SIZES)
+        items.append(Item(rng.uniform(-w, world.w), rng.uniform(-h, world.h), w, h))
+    indexes = {
+        name: index_class(pygame.FRect(world))
+        for name, index_class in SPATIAL_INDEX_CLASSES.items()
+    }
+    stored = {name: set() for name in indexes}
+    for name, index in indexes.items():
+        for item in items:
+            update(index, stored[name], item, "insert")
+
+    searches = 0
+    pair_queries = 0
+    mismatches = dict.fromkeys(indexes, 0)
+    pair_mismatches = dict.fromkeys(indexes, 0)
+    legacy_mismatches = 0
+    upkeep_s = dict.fromkeys(indexes, 0.0)
+    for _ in range(FRAMES):
+        for item in items:
+            item.rect.x += rng.uniform(-MAX_STEP, MAX_STEP)
+            item.rect.y += rng.uniform(-MAX_STEP, MAX_STEP)
+        # some leave for this frame
+        gone = rng.sample(items, 10)
+        # some get taken out and put right back, nothing queries in between
+        bounced = rng.sample(items, 10)
+        # some jump off the whole area and back in 2 moves, again with no query in between
+        hopped = rng.sample(items, 10)
+        gone_ids = {id(item) for item in gone}
+
+        for name, index in indexes.items():
+            start = time.perf_counter()
+            for item in gone:
+                update(index, stored[name], item, "remove")
+            for item in bounced:
+                update(index, stored[name], item, "remove")
+                update(index, stored[name], item, "insert")
+            for item in hopped:
+                x = item.rect.x
+                item.rect.x = -10 * world.w
+                update(index, stored[name], item, "move")
+                item.rect.x = x
+                update(index, stored[name], item, "move")
+            for item in items:
+                if id(item) not in gone_ids:
+                    update(index, stored[name], item, "move")
+            index.collapse_empty()
+            upkeep_s[name] += time.perf_counter() - start
+
+        legacy = LegacyQuadTree(pygame.FRect(world))
+        for item in items:
+            legacy.insert(item)
+
+        for _ in range(SEARCHES_PER_FRAME):
+            area = pygame.FRect(
+                rng.uniform(-50, world.w),
+                rng.uniform(-50, world.h),
+                rng.uniform(1, 320),
+                rng.uniform(1, 180),
+            )
+            for name, index in indexes.items():
+                # only what is stored is expected, the gone ones are not
+                expected = {
+                    id(item) for item in stored[name] if area.colliderect(item.rect)
+                }
+                found = index.search(area)
+                # len catches the same item found twice
+                if {id(item) for item in found} != expected or len(found) != len(
+                    expected
+                ):
+                    mismatches[name] += 1
+            expected = {id(item) for item in items if area.colliderect(item.rect)}
+            if {id(item) for item in legacy.search(area)} != expected:
+                legacy_mismatches += 1
+            searches += 1
+
+        # camera sized, like room asks for bat bounces
+        area = pygame.FRect(
+            rng.uniform(0, world.w - 320), rng.uniform(0, world.h - 180), 320, 180
+        )
+        for name, index in indexes.items():
+            expected = brute_force_pairs(stored[name], area)
+            found = index.query_pairs(area=area)
+            # a pair twice or an item paired with itself shows up as a len / set difference
+            if {frozenset((id(a), id(b))) for a, b in found} != expected or len(
+                found
+            ) != len(expected):
+                pair_mismatches[name] += 1
+        pair_queries += 1
+
+    depth_items = {}
+    leaf_items = []
+    node_stats(indexes["quadtree"], depth_items, leaf_items)
+    return {
+        "items": ITEMS,
+        "frames": FRAMES,
+        "searches": searches,
+        "pair_queries": pair_queries,
+        "mismatches_vs_brute_force": mismatches,
+        "pair_mismatches_vs_brute_force": pair_mismatches,
+        "legacy_mismatches_vs_brute_force": legacy_mismatches,
+        "upkeep_ms_per_frame": {
+            name: upkeep / FRAMES * 1e3 for name, upkeep in upkeep_s.items()
+        },
+        "quadtree_items_per_depth": dict(sorted(depth_items.items())),
+        "quadtree_max_items_per_leaf": max(leaf_items),
+        "quadtree_mean_items_per_leaf": sum(leaf_items) / len(leaf_items),
+    }
+
+
+if __name__ == "__main__":
+    results = run()
+    print(json.dumps(results, indent=2))
+    failed = any(results["mismatches_vs_brute_force"].values()) or any(
+        results["pair_mismatches_vs_brute_force"].values()
+    )
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,65 @@
+# run from src: python -m benchmarks.quadtree_tuning_bench
+# MAX_ITEMS / MAX_DEPTH sweep on a real room with a crowd of bats, tick time next to the tree stats it ends up with
+
+import json
+import time
+
+from benchmarks.bench_utils import base_dir, spawn_enemies
+from const import FIRST_ROOM_JSON_NAME, FIXED_DT
+from nodes.room import Room
+from utils.init_pygame import init_pygame
+from utils.quadtree_utils import QuadTree
+
+EXTRA_ENEMIES = [0, 500]
+MAX_ITEMS = [2, 4, 8, 16]
+MAX_DEPTHS = [4, 6, 8]
+WARMUP_TICKS = 30
+TICKS = 300
+
+
+def run():
+    init_pygame(headless=True)
+    defaults = (QuadTree.MAX_ITEMS, QuadTree.MAX_DEPTH)
+    results = []
+    try:
+        for extra in EXTRA_ENEMIES:
+            for max_items in MAX_ITEMS:
+                for max_depth in MAX_DEPTHS:
+                    QuadTree.MAX_ITEMS = max_items
+                    QuadTree.MAX_DEPTH = max_depth
+                    room = Room(base_dir, FIRST_ROOM_JSON_NAME, headless=True)
+                    spawn_enemies(room, extra)
+                    for _ in range(WARMUP_TICKS):
+                        room.update(FIXED_DT)
+
+                    queries = 0
+                    nodes_visited = 0
+                    start = time.perf_counter()
+                    for _ in range(TICKS):
+                        room.update(FIXED_DT)
+                        queries += room.enemy_collision_layer.queries
+                        nodes_visited += room.enemy_collision_layer.nodes_visited
+                    elapsed = time.perf_counter() - start
+
+                    stats = room.enemy_collision_layer.stats()
+                    results.append(
+                        {
+                            "enemies": len(room.enemy_layer_list),
+                            "max_items": max_items,
+                            "max_depth": max_depth,
+                            "ms_per_tick": elapsed / TICKS * 1e3,
+                            "queries_per_tick": queries / TICKS,
+                            "nodes_visited_per_query": nodes_visited / queries,
+                            "node_count": stats["node_count"],
+                            "max_depth_reached": stats["max_depth"],
+                            "leaf_items": stats["leaf_items"],
+                            "node_items": stats["node_items"],
+                        }
+                    )
+    finally:
+        QuadTree.MAX_ITEMS, QuadTree.MAX_DEPTH = defaults
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,63 @@
+# run from src: python -m benchmarks.query_pairs_bench
+# every overlapping pair of bats, 1 search per bat (each pair found twice) vs 1 query_pairs pass, on every spatial index
+
+import json
+import random
+
+import pygame
+
+from benchmarks.bench_utils import Item, best_of
+from nodes.room import SPATIAL_INDEX_CLASSES
+
+WORLD = (0, 0, 4096, 4096)
+# sparse is the whole room, dense is everyone on one screen
+DISTRIBUTIONS = {"sparse": (0, 0, 4096, 4096), "dense": (1888, 1958, 320, 180)}
+COUNTS = [200, 2_000, 10_000]
+
+
+def search_pairs(index, items):
+    # what the bats used to do, search around yourself, keep the ones that are not you
+    pairs = 0
+    checks = 0
+    for item in items:
+        found = index.search(item.rect)
+        checks += len(found)
+        pairs += len(found) - 1
+    return pairs // 2, checks
+
+
+def run():
+    results = []
+    for distribution, (x, y, w, h) in DISTRIBUTIONS.items():
+        for count in COUNTS:
+            rng = random.Random(count)
+            items = [
+                Item(rng.uniform(x, x + w - 8), rng.uniform(y, y + h - 8), type="enemy")
+                for _ in range(count)
+            ]
+            result = {"distribution": distribution, "items": count}
+            for name, index_class in SPATIAL_INDEX_CLASSES.items():
+                index = index_class(pygame.FRect(WORLD))
+                for item in items:
+                    index.insert(item)
+                pairs, search_checks = search_pairs(index, items)
+                found = index.query_pairs("enemy")
+                assert len(found) == pairs, (name, len(found), pairs)
+                result[name] = {
+                    "pairs": pairs,
+                    "search_ms": best_of(lambda: search_pairs(index, items), repeat=3)
+                    * 1e3,
+                    # lower bound, only what search returned, not what it looked at
+                    "search_results": search_checks,
+                    "query_pairs_ms": best_of(
+                        lambda: index.query_pairs("enemy"), repeat=3
+                    )
+                    * 1e3,
+                    "query_pairs_tests": index.pair_tests,
+                }
+            results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
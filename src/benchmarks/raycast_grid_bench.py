@@ -0,0 +1,135 @@
+# run from src: python -m benchmarks.raycast_grid_bench
+# thousands of hitscan rays per frame across test_room, grid walk vs ray_vs_rect on every collidable tile
+
+import json
+import math
+import os
+import random
+import time
+from os import path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from const import TILE_COLLIDABLE  # noqa: E402
+from utils import raycast_utils  # noqa: E402
+from utils.init_pygame import init_pygame  # noqa: E402
+from utils.tilemap_utils import tilemap_routine  # noqa: E402
+
+base_dir = path.dirname(path.dirname(path.abspath(__file__)))
+
+ROOM_JSON_NAME = "test_room.json"
+RAYS_PER_FRAME = 2000
+FRAMES = 10
+# about a screen width
+MAX_DISTANCE = 320.0
+
+
+def make_rays(data, seed):
+    # shots from random air spots in random directions
+    rng = random.Random(seed)
+    width, tileheight = data["width"], data["tileheight"]
+    air = [
+        index
+        for index, tile in enumerate(data["collision_layer"])
+        if not tile & TILE_COLLIDABLE
+    ]
+    rays = []
+    for index in rng.choices(air, k=RAYS_PER_FRAME):
+        origin = pygame.Vector2(
+            (index % width) * tileheight + rng.uniform(0, tileheight),
+            (index // width) * tileheight + rng.uniform(0, tileheight),
+        )
+        angle = rng.uniform(0, math.tau)
+        rays.append((origin, pygame.Vector2(math.cos(angle), math.sin(angle))))
+    return rays
+
+
+def brute_force(data, tiles, origin, direction):
+    # what we would have to do with only ray_vs_rect, every collidable tile, keep the nearest
+    best = None
+    for world_tu_x, world_tu_y in tiles:
+        hit, t, _, _ = raycast_utils.ray_vs_rect_kernel(
+            origin.x,
+            origin.y,
+            direction.x * MAX_DISTANCE,
+            direction.y * MAX_DISTANCE,
+            world_tu_x * data["tileheight"],
+            world_tu_y * data["tileheight"],
+            data["tileheight"],
+            data["tileheight"],
+        )
+        if hit and 0.0 <= t <= 1.0 and (best is None or t < best[0]):
+            best = (t, world_tu_x, world_tu_y)
+    return best
+
+
+def run():
+    init_pygame()
+    data = tilemap_routine(
+        path.join(base_dir, "jsons", ROOM_JSON_NAME), base_dir, "", None
+    )
+    width = data["width"]
+    tiles = [
+        (index % width, index // width)
+        for index, tile in enumerate(data["collision_layer"])
+        if tile & TILE_COLLIDABLE
+    ]
+    rays = make_rays(data, seed=0)
+
+    def grid_frame():
+        return [
+            raycast_utils.raycast_grid(
+                origin,
+                direction,
+                MAX_DISTANCE,
+                data["tileheight"],
+                data["width"],
+                data["height"],
+                data["collision_layer"],
+            )
+            for origin, direction in rays
+        ]
+
+    def brute_frame():
+        return [
+            brute_force(data, tiles, origin, direction) for origin, direction in rays
+        ]
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        grid_hits = grid_frame()
+    grid_s = (time.perf_counter() - start) / FRAMES
+
+    start = time.perf_counter()
+    brute_hits = brute_frame()
+    brute_s = time.perf_counter() - start
+
+    # both must agree on the distance to the first hit (the tile can differ on exact corners)
+    mismatches = 0
+    for grid_hit, brute_hit in zip(grid_hits, brute_hits):
+        grid_distance = grid_hit.distance if grid_hit else None
+        brute_distance = brute_hit[0] * MAX_DISTANCE if brute_hit else None
+        if (grid_distance is None) != (brute_distance is None) or (
+            grid_distance is not None and abs(grid_distance - brute_distance) > 1e-6
+        ):
+            mismatches += 1
+
+    hits = [hit for hit in grid_hits if hit]
+    return {
+        "room": ROOM_JSON_NAME,
+        "rays_per_frame": RAYS_PER_FRAME,
+        "max_distance": MAX_DISTANCE,
+        "collidable_tiles": len(tiles),
+        "hit_ratio": len(hits) / len(grid_hits),
+        "mean_hit_distance": sum(hit.distance for hit in hits) / max(1, len(hits)),
+        "grid_ms_per_frame": grid_s * 1e3,
+        "grid_rays_per_second": RAYS_PER_FRAME / grid_s,
+        "brute_force_ms_per_frame": brute_s * 1e3,
+        "mismatches_vs_brute_force": mismatches,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
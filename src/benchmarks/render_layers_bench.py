@@ -0,0 +1,55 @@
+# run from src: python -m benchmarks.render_layers_bench
+# Room.draw per render layer, opaque bg chunks (no fill, no blending) vs per pixel alpha bg chunks over a fill, every room
+
+import json
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from benchmarks.bench_utils import base_dir, room_json_names  # noqa: E402
+from const import FIXED_DT  # noqa: E402
+from nodes.room import Room  # noqa: E402
+from utils.chunked_bg_utils import ChunkedBackground  # noqa: E402
+from utils.init_pygame import init_pygame  # noqa: E402
+
+FRAMES = 600
+
+
+def median_draw_ms(room, screen):
+    samples = {name: [] for name in room.draw_ms}
+    for _ in range(FRAMES):
+        room.update(FIXED_DT)
+        room.draw(screen, 1.0)
+        for name, ms in room.draw_ms.items():
+            samples[name].append(ms)
+    return {name: sorted(ms)[FRAMES // 2] for name, ms in samples.items()}
+
+
+def run():
+    screen = init_pygame().screen
+    results = []
+    for name in room_json_names():
+        result = {"room": name}
+        for opaque in (False, True):
+            # same seed, bats pick their directions with random
+            random.seed(0)
+            room = Room(base_dir, name)
+            background = room.background
+            room.background = ChunkedBackground(
+                background.tile_layers,
+                background.width,
+                background.height,
+                background.tileheight,
+                background.spritesheet,
+                opaque=opaque,
+            )
+            draw_ms = median_draw_ms(room, screen)
+            draw_ms["total"] = sum(draw_ms.values())
+            result["opaque" if opaque else "alpha"] = draw_ms
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
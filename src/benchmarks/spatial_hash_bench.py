@@ -0,0 +1,97 @@
+# run from src: python -m benchmarks.spatial_hash_bench
+# QuadTree vs SpatialHashGrid, bats spread over a big room (sparse) and packed into one screen (dense)
+
+import json
+import random
+
+import pygame
+
+from benchmarks.bench_utils import Item, best_of
+from const import TILE_SIZE
+from utils.quadtree_utils import QuadTree
+from utils.spatial_hash_utils import SpatialHashGrid
+
+# about a 256 x 256 tile room
+WORLD = (0, 0, 4096, 4096)
+# sparse is the whole room, dense is everyone on one screen
+DISTRIBUTIONS = {"sparse": (0, 0, 4096, 4096), "dense": (1888, 1958, 320, 180)}
+COUNTS = [200, 2_000, 10_000]
+CELL_SIZES = [TILE_SIZE, TILE_SIZE * 2, TILE_SIZE * 4]
+# bat per tick step is about 1.5 px
+STEP = 1.5
+CAMERA_SEARCHES = 50
+
+
+def measure(index, items, rng):
+    def rebuild():
+        index.clear()
+        for item in items:
+            index.insert(item)
+
+    rebuild()
+    steps = [(rng.uniform(-STEP, STEP), rng.uniform(-STEP, STEP)) for _ in items]
+
+    def move_all():
+        # back and forth so every repeat sees the same positions
+        for item, (dx, dy) in zip(items, steps):
+            item.rect.x += dx
+            item.rect.y += dy
+            index.move(item)
+        index.collapse_empty()
+        for item, (dx, dy) in zip(items, steps):
+            item.rect.x -= dx
+            item.rect.y -= dy
+            index.move(item)
+        index.collapse_empty()
+
+    cameras = [
+        pygame.FRect(rng.uniform(0, 4096 - 320), rng.uniform(0, 4096 - 180), 320, 180)
+        for _ in range(CAMERA_SEARCHES)
+    ]
+    bats = rng.sample(items, min(len(items), 500))
+
+    # what every bat does every tick, search around its own rect
+    def bat_searches():
+        for item in bats:
+            index.search(item.rect)
+
+    def camera_searches():
+        for camera in cameras:
+            index.search(camera)
+
+    return {
+        "rebuild_ms": best_of(rebuild, repeat=3) * 1e3,
+        "move_all_ms": best_of(move_all, repeat=3) / 2 * 1e3,
+        "bat_search_us": best_of(bat_searches, repeat=3) / len(bats) * 1e6,
+        "camera_search_us": best_of(camera_searches, repeat=3) / len(cameras) * 1e6,
+    }
+
+
+def run():
+    results = []
+    for distribution, (x, y, w, h) in DISTRIBUTIONS.items():
+        for count in COUNTS:
+            rng = random.Random(count)
+            items = [
+                Item(rng.uniform(x, x + w - 8), rng.uniform(y, y + h - 8))
+                for _ in range(count)
+            ]
+            result = {
+                "distribution": distribution,
+                "items": count,
+                "quadtree": measure(
+                    QuadTree(pygame.FRect(WORLD)), items, random.Random(0)
+                ),
+            }
+            for cell_size in CELL_SIZES:
+                result[f"hash_grid_{cell_size}"] = measure(
+                    SpatialHashGrid(pygame.FRect(WORLD), cell_size),
+                    items,
+                    random.Random(0),
+                )
+            results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
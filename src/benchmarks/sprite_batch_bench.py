@@ -0,0 +1,79 @@
+# run from src: python -m benchmarks.sprite_batch_bench
+# hundreds of bats on screen, 1 screen.blit each (the old draw) vs the render queue (1 fblits per source surface)
+
+import json
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from benchmarks.bench_utils import base_dir, best_of, spawn_enemies  # noqa: E402
+from const import FIRST_ROOM_JSON_NAME, FIXED_DT  # noqa: E402
+from nodes.room import Room  # noqa: E402
+from utils import raycast_utils  # noqa: E402
+from utils.init_pygame import init_pygame  # noqa: E402
+
+COUNTS = [100, 300, 1000]
+NUMBER = 20
+
+
+def draw_blit(entity, screen, camera, alpha, area=None):
+    # entity.draw before the render queue, lerp and blit right away
+    x = raycast_utils.lerp(entity.previous_position.x, entity.rect.x, alpha)
+    y = raycast_utils.lerp(entity.previous_position.y, entity.rect.y, alpha)
+    screen.blit(entity.surf, (x - camera.x, y - camera.y), area)
+
+
+def blit_each(screen, room, alpha):
+    # what Room.draw did before the queue, for the sprites only
+    draw_blit(room.player, screen, room.render_camera, alpha)
+    for enemy in room.visible_enemies:
+        frame_rect = enemy.animator.get_current_frame(room.animation_time)
+        draw_blit(enemy, screen, room.render_camera, alpha, frame_rect)
+
+
+def render_queue(screen, room, alpha):
+    room.player.draw(room.render_queue, room.render_camera, alpha)
+    for enemy in room.visible_enemies:
+        enemy.draw(room.render_queue, room.render_camera, alpha)
+    room.render_queue.flush(screen)
+
+
+def run():
+    screen = init_pygame().screen
+    results = []
+    for count in COUNTS:
+        random.seed(count)
+        room = Room(base_dir, FIRST_ROOM_JSON_NAME)
+        spawned = spawn_enemies(room, count, seed=count)
+        # everyone on screen, scattered over the camera instead of the whole room
+        room.update(FIXED_DT)
+        rng = random.Random(count)
+        for enemy in spawned:
+            enemy.rect.x = rng.uniform(
+                room.camera.left, room.camera.right - enemy.rect.w
+            )
+            enemy.rect.y = rng.uniform(
+                room.camera.top, room.camera.bottom - enemy.rect.h
+            )
+            enemy.previous_position.update(enemy.rect.x, enemy.rect.y)
+            room.enemy_collision_layer.move(enemy)
+        room.visible_enemies = room.enemy_collision_layer.search(room.camera)
+        room.render_camera.topleft = room.camera.topleft
+
+        blit_each_s = best_of(lambda: blit_each(screen, room, 0.5), number=NUMBER)
+        render_queue_s = best_of(lambda: render_queue(screen, room, 0.5), number=NUMBER)
+        results.append(
+            {
+                "sprites": len(room.visible_enemies) + 1,
+                "blit_each_ms": blit_each_s * 1e3,
+                "render_queue_ms": render_queue_s * 1e3,
+                "fblits_calls": room.render_queue.fblits_calls,
+                "speedup": blit_each_s / render_queue_s,
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
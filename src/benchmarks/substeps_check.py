@@ -0,0 +1,121 @@
+# run from src: python -m benchmarks.substeps_check
+# move and slide sub steps, exits 1 if count_substeps gives a wrong count or move_and_slide raises for any rect shape
+# 1. count_substeps on normal, point and line shaped rects, moving and standing still
+# 2. point / line / bat sized rects through move_and_slide in test_room for a few frames, none of them may raise
+
+import json
+import os
+import random
+import sys
+from os import path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from benchmarks.bench_utils import base_dir  # noqa: E402
+from const import CCD_MAX_SUBSTEPS, FIXED_DT, TILE_COLLIDABLE  # noqa: E402
+from utils import raycast_utils  # noqa: E402
+from utils.init_pygame import init_pygame  # noqa: E402
+from utils.tilemap_utils import tilemap_routine  # noqa: E402
+
+ROOM_JSON_NAME = "test_room.json"
+# (w, h, velocity x, velocity y, dt, expected steps)
+SUBSTEP_CASES = [
+    (8, 8, 0.09, 0.0, FIXED_DT, 1),
+    (8, 8, 0.0, 0.0, FIXED_DT, 1),
+    # 8 px in one step, 4 px is the most a step may move
+    (8, 8, 0.5, 0.0, 16.0, 2),
+    (8, 8, 100.0, 0.0, FIXED_DT, CCD_MAX_SUBSTEPS),
+    # no thickness, any move at all takes every step allowed
+    (0, 8, 1.0, 0.0, 16.6, CCD_MAX_SUBSTEPS),
+    (8, 0, 0.0, -0.01, 16.6, CCD_MAX_SUBSTEPS),
+    (0, 0, 0.05, 0.05, FIXED_DT, CCD_MAX_SUBSTEPS),
+    (0, 0, 0.0, 0.0, FIXED_DT, 1),
+]
+# rect shapes pushed through move_and_slide, bats, the player, points and lines
+SHAPES = [(8, 8), (7, 18), (0, 0), (0, 8), (8, 0)]
+SHAPE_RECTS = 200
+SHAPE_FRAMES = 30
+BAT_SPEED = 0.09
+
+
+def check_substep_counts():
+    failures = []
+    for w, h, vx, vy, dt, expected in SUBSTEP_CASES:
+        try:
+            steps = raycast_utils.count_substeps(
+                pygame.FRect(0, 0, w, h), pygame.Vector2(vx, vy), dt
+            )
+        except Exception as error:
+            steps = repr(error)
+        if steps != expected:
+            failures.append({"case": [w, h, vx, vy, dt], "steps": steps})
+    return failures
+
+
+def air_positions(data, count, seed):
+    rng = random.Random(seed)
+    air = [
+        index
+        for index, tile in enumerate(data["collision_layer"])
+        if not tile & TILE_COLLIDABLE
+    ]
+    return [
+        (
+            (index % data["width"]) * data["tileheight"] + rng.uniform(0, 8),
+            (index // data["width"]) * data["tileheight"] + rng.uniform(0, 8),
+            rng.uniform(-1, 1),
+            rng.uniform(-1, 1),
+        )
+        for index in rng.choices(air, k=count)
+    ]
+
+
+def move(data, rect, velocity, dt):
+    raycast_utils.move_and_slide(
+        rect,
+        dt,
+        velocity,
+        data["tileheight"],
+        data["width"],
+        data["height"],
+        data["collision_layer"],
+        pygame.Vector2(0.0, 0.0),
+        pygame.Vector2(0.0, 0.0),
+    )
+
+
+def check_shapes(data):
+    # every shape must get through move_and_slide, speeds up to 10x a bat so the thin ones sub step
+    errors = {}
+    for w, h in SHAPES:
+        for x, y, dx, dy in air_positions(data, SHAPE_RECTS, seed=w * 100 + h):
+            rect = pygame.FRect(x, y, w, h)
+            velocity = pygame.Vector2(dx, dy) * BAT_SPEED * 10
+            try:
+                for _ in range(SHAPE_FRAMES):
+                    move(data, rect, velocity, FIXED_DT)
+            except Exception as error:
+                errors[f"{w}x{h}"] = repr(error)
+                break
+    return errors
+
+
+def run():
+    init_pygame(headless=True)
+    data = tilemap_routine(
+        path.join(base_dir, "jsons", ROOM_JSON_NAME), base_dir, "", None, headless=True
+    )
+    return {
+        "room": ROOM_JSON_NAME,
+        "substep_count_failures": check_substep_counts(),
+        "move_and_slide_errors": check_shapes(data),
+    }
+
+
+if __name__ == "__main__":
+    results = run()
+    print(json.dumps(results, indent=2))
+    failed = results["substep_count_failures"] or results["move_and_slide_errors"]
+    sys.exit(1 if failed else 0)
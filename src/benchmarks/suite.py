@@ -0,0 +1,245 @@
+# run from src: python -m benchmarks.suite [--out results.json] [--only quadtree resolve ...]
+# the repeatable one, quadtree, move and slide, room loading and whole room ticks in one json so 2 runs can be diffed
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import time
+from os import path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+from benchmarks.bench_utils import (  # noqa: E402
+    Item,
+    base_dir,
+    best_of,
+    random_air_positions,
+    room_json_names,
+    spawn_enemies,
+)
+from const import FIXED_DT  # noqa: E402
+from nodes.room import Room  # noqa: E402
+from utils import quadtree_utils, raycast_utils  # noqa: E402
+from utils.init_pygame import init_pygame  # noqa: E402
+from utils.tilemap_utils import tilemap_routine  # noqa: E402
+
+QUADTREE_ITEM_COUNTS = [10, 100, 1_000, 10_000]
+# big enough that 10k bat sized items still leave air between them
+QUADTREE_WORLD = (0, 0, 4096, 4096)
+QUADTREE_SEARCHES = 100
+# px / ms, bat max_run is 0.09, the rest is knockback / dash / dt spike territory
+RESOLVE_SPEEDS = [0.0, 0.01, 0.05, 0.09, 0.2, 0.5, 1.0, 2.0]
+RESOLVE_RECTS = 1_000
+ROOM_UPDATE_ROOM = "test_room.json"
+ROOM_UPDATE_ENEMY_COUNTS = [40, 200, 1_000, 5_000]
+ROOM_UPDATE_TICKS = 120
+
+
+def bench_quadtree():
+    rng = random.Random(0)
+    world = pygame.FRect(QUADTREE_WORLD)
+    results = []
+    for count in QUADTREE_ITEM_COUNTS:
+        items = [
+            Item(rng.uniform(0, world.w - 8), rng.uniform(0, world.h - 8), 8, 8)
+            for _ in range(count)
+        ]
+        # camera sized queries
+        areas = [
+            pygame.FRect(
+                rng.uniform(0, world.w - 320), rng.uniform(0, world.h - 180), 320, 180
+            )
+            for _ in range(QUADTREE_SEARCHES)
+        ]
+        quadtree = quadtree_utils.QuadTree(pygame.FRect(world))
+
+        def insert_all():
+            quadtree.clear()
+            for item in items:
+                quadtree.insert(item)
+
+        def search_all():
+            for area in areas:
+                quadtree.search(area)
+
+        insert_s = best_of(insert_all, repeat=5)
+        insert_all()
+        search_s = best_of(search_all, repeat=5)
+        found = sum(len(quadtree.search(area)) for area in areas)
+
+        # clear is destructive, refill outside the timer every time
+        clear_s = float("inf")
+        for _ in range(5):
+            insert_all()
+            start = time.perf_counter()
+            quadtree.clear()
+            clear_s = min(clear_s, time.perf_counter() - start)
+
+        results.append(
+            {
+                "items": count,
+                # insert_all clears first, an empty clear is noise next to a full insert
+                "insert_all_ms": insert_s * 1e3,
+                "insert_us_per_item": insert_s / count * 1e6,
+                "search_us_per_query": search_s / QUADTREE_SEARCHES * 1e6,
+                "mean_found_per_query": found / QUADTREE_SEARCHES,
+                "clear_ms": clear_s * 1e3,
+            }
+        )
+    return results
+
+
+def bench_resolve():
+    init_pygame(headless=True)
+    room = Room(base_dir, ROOM_UPDATE_ROOM, headless=True)
+    rng = random.Random(0)
+    positions = random_air_positions(room, RESOLVE_RECTS, seed=1)
+    angles = [rng.uniform(0, math.tau) for _ in positions]
+    contact_point = pygame.Vector2()
+    contact_normal = pygame.Vector2()
+    results = []
+    for speed in RESOLVE_SPEEDS:
+        cases = [
+            (
+                pygame.FRect(x, y - 8, 8, 8),
+                pygame.Vector2(math.cos(angle) * speed, math.sin(angle) * speed),
+            )
+            for (x, y), angle in zip(positions, angles)
+        ]
+
+        def resolve_all():
+            for rect, velocity in cases:
+                raycast_utils.resolve_vel_against_solid_tiles(
+                    rect,
+                    FIXED_DT,
+                    pygame.Vector2(velocity),
+                    room.tileheight,
+                    room.width,
+                    room.height,
+                    room.collision_layer,
+                    contact_point,
+                    contact_normal,
+                    collision_sat=room.collision_sat,
+                    merged_colliders=room.merged_colliders,
+                )
+
+        resolve_s = best_of(resolve_all, repeat=5)
+        raycast_utils.reset_resolve_counters()
+        resolve_all()
+        counters = dict(raycast_utils.resolve_counters)
+        results.append(
+            {
+                "speed_px_per_ms": speed,
+                "px_per_tick": speed * FIXED_DT,
+                "us_per_call": resolve_s / RESOLVE_RECTS * 1e6,
+                "sat_early_out_ratio": counters["sat_early_outs"] / counters["calls"],
+                "ray_tests_per_call": counters["ray_tests"] / counters["calls"],
+            }
+        )
+    return results
+
+
+def bench_tilemap_routine():
+    # real display mode, convert_alpha needs one
+    init_pygame()
+    results = []
+    for name in room_json_names():
+        tile_json_path = path.join(base_dir, "jsons", name)
+        results.append(
+            {
+                "room": name,
+                # "" as the current stage, so the tile sheet is loaded every time like a stage change
+                "ms": best_of(
+                    lambda: tilemap_routine(tile_json_path, base_dir, "", None),
+                    repeat=5,
+                )
+                * 1e3,
+                "headless_ms": best_of(
+                    lambda: tilemap_routine(
+                        tile_json_path, base_dir, "", None, headless=True
+                    ),
+                    repeat=5,
+                )
+                * 1e3,
+            }
+        )
+    return results
+
+
+def bench_room_update():
+    init_pygame(headless=True)
+    results = []
+    for count in ROOM_UPDATE_ENEMY_COUNTS:
+        # same seed every run, bats pick their directions with random
+        random.seed(0)
+        room = Room(base_dir, ROOM_UPDATE_ROOM, headless=True)
+        extra = count - len(room.enemy_layer_list)
+        if extra > 0:
+            spawn_enemies(room, extra, seed=count)
+        room.update(FIXED_DT)
+
+        tick_ms = []
+        visible = 0
+        for _ in range(ROOM_UPDATE_TICKS):
+            start = time.perf_counter()
+            room.update(FIXED_DT)
+            tick_ms.append((time.perf_counter() - start) * 1e3)
+            visible += len(room.visible_enemies)
+        tick_ms.sort()
+        results.append(
+            {
+                "room": ROOM_UPDATE_ROOM,
+                "enemies": len(room.enemy_layer_list),
+                "mean_visible_enemies": visible / ROOM_UPDATE_TICKS,
+                "ticks": ROOM_UPDATE_TICKS,
+                "mean_ms_per_tick": sum(tick_ms) / len(tick_ms),
+                "median_ms_per_tick": tick_ms[len(tick_ms) // 2],
+                "p95_ms_per_tick": tick_ms[int(len(tick_ms) * 0.95)],
+                "sim_ticks_per_second": 1e3 * len(tick_ms) / sum(tick_ms),
+            }
+        )
+    return results
+
+
+BENCHES = {
+    "quadtree": bench_quadtree,
+    "resolve": bench_resolve,
+    "tilemap_routine": bench_tilemap_routine,
+    "room_update": bench_room_update,
+}
+
+
+def run(only=None):
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+    }
+    for name, bench in BENCHES.items():
+        if only and name not in only:
+            continue
+        results[name] = bench()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", help="write the json here too")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHES))
+    args = parser.parse_args()
+
+    output = json.dumps(run(args.only), indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as file:
+            file.write(output + "\n")
@@ -0,0 +1,169 @@
+# run from src: python -m benchmarks.sweep_and_prune_bench
+# the particle scenario from room/optimize_test.py (7 x 18 particles bouncing off tiles and each other) at 200 / 2k / 20k
+# per frame broadphase cost, quadtree rebuilt from scratch like the prototype did vs every spatial index kept up with move
+
+import json
+import math
+import random
+import time
+from os import path
+from types import SimpleNamespace
+
+import numpy as np
+import pygame
+
+from benchmarks.bench_utils import base_dir, random_air_positions
+from const import FIXED_DT, TILE_COLLIDABLE
+from nodes.room import SPATIAL_INDEX_CLASSES
+from utils import quadtree_utils, raycast_utils
+from utils.init_pygame import init_pygame
+from utils.tilemap_utils import tilemap_routine
+
+ROOM_JSON_NAME = "test_room.json"
+# (particles, frames), the room is tiled up so every count has the prototype's 200 per room density
+SCENARIOS = [(200, 60), (2_000, 30), (20_000, 10)]
+PROTOTYPE_COUNT = 200
+
+
+class Particle:
+    # room/optimize_test.py Particle, minus the drawing
+    def __init__(self, x, y, room):
+        self.type = "particle"
+        self.room = room
+        self.rect = pygame.FRect(x, y - 18, 7, 18)
+        self.max_run = 0.09
+        self.velocity = pygame.Vector2(0.0, 0.0)
+        self.decay = 0.01
+        self.direction_horizontal = 1
+        self.direction_vertical = 1
+        self.bounce_cooldown = 0
+
+    def update(self, dt):
+        if self.bounce_cooldown > 0:
+            self.bounce_cooldown -= dt
+        self.velocity.x = raycast_utils.exp_decay(
+            self.velocity.x, self.direction_horizontal * self.max_run, self.decay, dt
+        )
+        self.velocity.y = raycast_utils.exp_decay(
+            self.velocity.y, self.direction_vertical * self.max_run, self.decay, dt
+        )
+        contact_normal = pygame.Vector2(0.0, 0.0)
+        raycast_utils.move_and_slide(
+            self.rect,
+            dt,
+            self.velocity,
+            self.room.tileheight,
+            self.room.width,
+            self.room.height,
+            self.room.collision_layer,
+            pygame.Vector2(0.0, 0.0),
+            contact_normal,
+            collision_sat=self.room.collision_sat,
+        )
+        self.direction_horizontal = contact_normal.x or self.direction_horizontal
+        self.direction_vertical = contact_normal.y or self.direction_vertical
+        self.rect.clamp_ip(self.room.rect)
+
+    def bounce_with(self, other):
+        if self.bounce_cooldown <= 0 and other.bounce_cooldown <= 0:
+            new_dirs = [-1, 1]
+            random.shuffle(new_dirs)
+            self.direction_horizontal = new_dirs[0]
+            other.direction_horizontal = new_dirs[1]
+            random.shuffle(new_dirs)
+            self.direction_vertical = new_dirs[0]
+            other.direction_vertical = new_dirs[1]
+            self.bounce_cooldown = 400
+            other.bounce_cooldown = 400
+
+
+def scaled_room(data, scale):
+    # the room collision layer repeated scale x scale times
+    collision_grid = np.tile(data["collision_grid"], (scale, scale))
+    height, width = collision_grid.shape
+    collision_sat_grid = np.zeros((height + 1, width + 1), dtype=np.int32)
+    collision_sat_grid[1:, 1:] = (
+        ((collision_grid & TILE_COLLIDABLE) != 0).cumsum(axis=0).cumsum(axis=1)
+    )
+    tileheight = data["tileheight"]
+    return SimpleNamespace(
+        width=width,
+        height=height,
+        tileheight=tileheight,
+        collision_layer=collision_grid.tobytes(),
+        collision_sat=collision_sat_grid.ravel().tolist(),
+        rect=pygame.FRect(0, 0, width * tileheight, height * tileheight),
+    )
+
+
+def run():
+    init_pygame(headless=True)
+    data = tilemap_routine(
+        path.join(base_dir, "jsons", ROOM_JSON_NAME), base_dir, "", None, headless=True
+    )
+    results = []
+    for count, frames in SCENARIOS:
+        random.seed(count)
+        room = scaled_room(data, math.ceil(math.sqrt(count / PROTOTYPE_COUNT)))
+        particles = [
+            Particle(x, y, room)
+            for x, y in random_air_positions(room, count, seed=count)
+        ]
+
+        rebuilt = quadtree_utils.QuadTree(room.rect.copy())
+        indexes = {
+            name: index_class(room.rect.copy())
+            for name, index_class in SPATIAL_INDEX_CLASSES.items()
+        }
+        for index in indexes.values():
+            for particle in particles:
+                index.insert(particle)
+        times = {"quadtree_rebuild": 0.0, **{name: 0.0 for name in indexes}}
+        pair_counts = 0
+
+        for _ in range(frames):
+            for particle in particles:
+                particle.update(FIXED_DT)
+
+            # the prototype, clear and insert everyone every frame
+            start = time.perf_counter()
+            rebuilt.clear()
+            for particle in particles:
+                rebuilt.insert(particle)
+            pairs = rebuilt.query_pairs("particle")
+            times["quadtree_rebuild"] += time.perf_counter() - start
+
+            for name, index in indexes.items():
+                start = time.perf_counter()
+                for particle in particles:
+                    index.move(particle)
+                index.collapse_empty()
+                index_pairs = index.query_pairs("particle")
+                times[name] += time.perf_counter() - start
+                assert len(index_pairs) == len(pairs), (
+                    name,
+                    len(index_pairs),
+                    len(pairs),
+                )
+
+            pair_counts += len(pairs)
+            for particle, other in pairs:
+                particle.bounce_with(other)
+
+        results.append(
+            {
+                "particles": count,
+                "room_px": [room.rect.w, room.rect.h],
+                "frames": frames,
+                "mean_pairs": pair_counts / frames,
+                # upkeep (rebuild or move everyone) plus 1 query_pairs over the whole room
+                "broadphase_ms_per_frame": {
+                    name: seconds / frames * 1e3 for name, seconds in times.items()
+                },
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,218 @@
+# run from src: python -m benchmarks.swept_aabb_kernel_bench
+# the Vector2 / FRect / list swept aabb from before the kernels vs the wrappers vs the plain float kernels
+# per call the legacy one makes 1 FRect, 4 Vector2 and a list (+ 1 Vector2 on hit), the kernel makes at most 1 result tuple
+
+import json
+import random
+import time
+
+import pygame
+
+from utils import raycast_utils
+
+CALLS = 200_000
+DT = 16
+
+
+# ---- before the kernels, kept here as is so there is something to compare against ----
+
+
+def legacy_ray_vs_rect(
+    ray_origin: pygame.Vector2,
+    ray_dir: pygame.Vector2,
+    target_rect: pygame.FRect,
+    contact_point: pygame.Vector2,
+    contact_normal: pygame.Vector2,
+    t_hit_near: list,
+) -> bool:
+    """
+    | True if light ray hits rect.
+    |
+    | Parameter needs ray origin, ray dir, target_rect.
+    |
+    | Need immutable list for extra info after computation.
+    | contact_point, contact_normal, t_hit_near.
+    """
+
+    # Cache division
+    one_over_ray_dir_x: float = 0.0
+    one_over_ray_dir_y: float = 0.0
+    sign: float = -1.0
+
+    # Handle infinity
+    if abs(ray_dir.x) < 0.1:
+        if ray_dir.x > 0.0:
+            sign = 1.0
+        one_over_ray_dir_x = float("inf") * sign
+    else:
+        one_over_ray_dir_x = 1.0 / ray_dir.x
+
+    # Handle infinity
+    if abs(ray_dir.y) < 0.1:
+        if ray_dir.y > 0.0:
+            sign = 1.0
+        one_over_ray_dir_y = float("inf") * sign
+    else:
+        one_over_ray_dir_y = 1.0 / ray_dir.y
+
+    # Get near far time
+    t_near = pygame.Vector2(
+        (target_rect.x - ray_origin.x) * one_over_ray_dir_x,
+        (target_rect.y - ray_origin.y) * one_over_ray_dir_y,
+    )
+    t_far = pygame.Vector2(
+        (target_rect.x + target_rect.width - ray_origin.x) * one_over_ray_dir_x,
+        (target_rect.y + target_rect.height - ray_origin.y) * one_over_ray_dir_y,
+    )
+
+    # Sort near far time
+    if t_near.x > t_far.x:
+        t_near.x, t_far.x = t_far.x, t_near.x
+    if t_near.y > t_far.y:
+        t_near.y, t_far.y = t_far.y, t_near.y
+
+    # COLLISION RULE
+    if t_near.x > t_far.y or t_near.y > t_far.x:
+        return False
+
+    # Get near far time
+    t_hit_near[0] = max(t_near.x, t_near.y)
+    t_hit_far: float = min(t_far.x, t_far.y)
+
+    if t_hit_far < 0:
+        return False
+
+    # Compute contact point, handed back through the caller's Vector2 like the other outputs
+    contact_point.update(ray_origin + t_hit_near[0] * ray_dir)
+
+    # Compute contact normal
+    if t_near.x > t_near.y:
+        contact_normal.x, contact_normal.y = (1, 0) if ray_dir.x < 0 else (-1, 0)
+    elif t_near.x < t_near.y:
+        contact_normal.x, contact_normal.y = (0, 1) if ray_dir.y < 0 else (0, -1)
+    else:
+        if one_over_ray_dir_x < 0 and one_over_ray_dir_y < 0:
+            contact_normal.x, contact_normal.y = (1, 1)
+        elif one_over_ray_dir_x > 0 and one_over_ray_dir_y > 0:
+            contact_normal.x, contact_normal.y = (-1, -1)
+        elif one_over_ray_dir_x < 0 and one_over_ray_dir_y > 0:
+            contact_normal.x, contact_normal.y = (1, -1)
+        elif one_over_ray_dir_x > 0 and one_over_ray_dir_y < 0:
+            contact_normal.x, contact_normal.y = (-1, 1)
+
+    return True
+
+
+def legacy_dynamic_rect_vs_rect(
+    input_velocity: pygame.Vector2,
+    collider_rect: pygame.FRect,
+    target_rect: pygame.FRect,
+    contact_point: pygame.Vector2,
+    contact_normal: pygame.Vector2,
+    t_hit_near: list[float],
+    dt: int,
+) -> bool:
+    """
+    | If dynamic actor is not moving, returns False.
+    """
+
+    if not abs(input_velocity.x) > 0.0 and not abs(input_velocity.y) > 0.0:
+        return False
+    expanded_target: pygame.FRect = pygame.FRect(
+        target_rect.x - collider_rect.width / 2,
+        target_rect.y - collider_rect.height / 2,
+        target_rect.width + collider_rect.width,
+        target_rect.height + collider_rect.height,
+    )
+    hit = legacy_ray_vs_rect(
+        pygame.Vector2(
+            collider_rect.x + collider_rect.width / 2,
+            collider_rect.y + collider_rect.height / 2,
+        ),
+        input_velocity * dt,
+        expanded_target,
+        contact_point,
+        contact_normal,
+        t_hit_near,
+    )
+    if hit:
+        return t_hit_near[0] >= 0.0 and t_hit_near[0] < 1.0
+    else:
+        return False
+
+
+# ---- bench ----
+
+
+def make_cases(seed):
+    # bat sized colliders next to tiles, moving at about bat speed, so roughly half hit
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(1000):
+        target = pygame.FRect(
+            rng.randrange(0, 40) * 16, rng.randrange(0, 22) * 16, 16, 16
+        )
+        collider = pygame.FRect(
+            target.x + rng.uniform(-16, 16), target.y + rng.uniform(-16, 16), 8, 8
+        )
+        velocity = pygame.Vector2(rng.uniform(-0.2, 0.2), rng.uniform(-0.2, 0.2))
+        cases.append((velocity, collider, target))
+    return cases
+
+
+def measure(call, cases):
+    repeat = CALLS // len(cases)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            call(*case)
+    elapsed = time.perf_counter() - start
+    return {"ns_per_call": elapsed / (repeat * len(cases)) * 1e9}
+
+
+def call_legacy(velocity, collider, target):
+    legacy_dynamic_rect_vs_rect(
+        velocity, collider, target, pygame.Vector2(), pygame.Vector2(), [0.0], DT
+    )
+
+
+def call_wrapper(velocity, collider, target):
+    raycast_utils.dynamic_rect_vs_rect(
+        velocity, collider, target, pygame.Vector2(), pygame.Vector2(), [0.0], DT
+    )
+
+
+def call_kernel(velocity, collider, target):
+    raycast_utils.dynamic_rect_vs_rect_kernel(
+        velocity.x,
+        velocity.y,
+        collider.x,
+        collider.y,
+        collider.w,
+        collider.h,
+        target.x,
+        target.y,
+        target.w,
+        target.h,
+        DT,
+    )
+
+
+def run():
+    cases = make_cases(seed=0)
+    # plain floats, what the resolver loop actually holds
+    float_cases = [
+        (v.x, v.y, c.x, c.y, c.w, c.h, t.x, t.y, t.w, t.h, DT) for v, c, t in cases
+    ]
+    return {
+        "legacy_dynamic_rect_vs_rect": measure(call_legacy, cases),
+        "dynamic_rect_vs_rect_wrapper": measure(call_wrapper, cases),
+        "dynamic_rect_vs_rect_kernel_from_rects": measure(call_kernel, cases),
+        "dynamic_rect_vs_rect_kernel_floats": measure(
+            raycast_utils.dynamic_rect_vs_rect_kernel, float_cases
+        ),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
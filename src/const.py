@@ -1,5 +1,43 @@
 WIDTH, HEIGHT = 320, 180
 FPS = 60
+# sim runs at this rate no matter the render fps, everything in update gets the same dt (ms)
+SIM_TICKS_PER_SECOND = 60
+FIXED_DT = 1000 / SIM_TICKS_PER_SECOND
+# max sim ticks per rendered frame, past this the backlog is dropped so a hitch cannot spiral
+MAX_SIM_STEPS_PER_FRAME = 5
 TILE_SIZE = 16
 SPRITESHEET_WIDTH = 32
 FIRST_ROOM_JSON_NAME = "test_room.json"
+# below this many visible opted in enemies the numpy move and slide costs more than the plain loop
+BATCH_MOVE_AND_SLIDE_MIN_COUNT = 128
+# merge solid / thin tiles into big boxes on room load and move and slide against those (no seams, fewer ray tests)
+MERGE_STATIC_COLLIDERS = False
+# move and slide sub steps when a rect would move more than this fraction of its smaller side in one step (no tunneling)
+CCD_SAFE_FRACTION = 0.5
+# cap so a huge dt spike cannot stall the frame, past this it just moves further per sub step
+CCD_MAX_SUBSTEPS = 16
+
+# spatial index each room layer is searched through, "quadtree", "flat_quadtree", "hash_grid" or "sweep_and_prune"
+SPATIAL_INDEX_BY_LAYER = {"enemy": "quadtree", "door": "quadtree"}
+# hash grid cell, 2 tiles fits 8 x 8 bats and the 7 x 18 player in a few cells without making camera searches walk hundreds of them
+SPATIAL_HASH_CELL_SIZE = TILE_SIZE * 2
+
+# room bg is painted in square chunks of this many tiles a side, 16 is 256 px, so a 320 x 180 view touches at most 3 x 2 of them
+BG_CHUNK_TILES = 16
+# what is under the room bg, opaque bg chunks are painted over it so the screen does not have to be filled with it
+BG_FILL_COLOR = "black"
+# most painted bg chunks kept in memory, the least recently seen go first, 24 of 256 x 256 px is about 6 MB
+BG_CHUNK_CACHE_SIZE = 24
+
+# render queue layers, lower ones are drawn first (bg is not in the queue, it is always under everything)
+RENDER_LAYER_PLAYER = 0
+RENDER_LAYER_ENEMIES = 1
+
+# collision layer tile flags, 1 byte per tile, a tile can be solid and sticky at the same time
+TILE_AIR = 0
+TILE_SOLID = 1 << 0
+TILE_THIN = 1 << 1
+TILE_STICKY_FLOOR = 1 << 2
+TILE_SLIPPERY_FLOOR = 1 << 3
+# flags that move and slide stops against
+TILE_COLLIDABLE = TILE_SOLID | TILE_THIN
@@ -3,11 +3,14 @@ import json
 from os import path
 import pygame
 from nodes.enemies.blue_bat import BlueBat
+from nodes.animator import parse_animation_clip
 from nodes.enemies.orange_bat import OrangeBat
 
 
 class SpritesheetDataMap:
     def __init__(self, base_dir):
+        # json path -> parsed animation clip, so coming back to a stage does not parse it again
+        self.animation_clips = {}
         # list what each stage owns, like png, jsons, music, etc...
         self.spritesheet_data_map = {
             "forest_of_illusion_tile_sheet": {
@@ -38,17 +41,23 @@ class SpritesheetDataMap:
             },
         }
 
-    def load_spritesheet_data(self, spritesheet_data):
+    def load_spritesheet_data(self, spritesheet_data, headless=False):
         """Load images and JSON data for the given spritesheet data map."""
         # the thing that does the actual loading, should take a long time, to be called when u switch stage
         for entity_name, entity_data in spritesheet_data.items():
-            # Load PNG
+            # Load PNG, headless has no display mode to convert to, nothing gets drawn anyway
             if "png" in entity_data:
-                entity_data["png"] = pygame.image.load(
-                    entity_data["png"]
-                ).convert_alpha()
+                entity_data["png"] = pygame.image.load(entity_data["png"])
+                if not headless:
+                    entity_data["png"] = entity_data["png"].convert_alpha()
 
-            # Load JSON
+            # Load JSON, read and parsed once per asset, every entity of it gets the same clip
+            # "json" stays the path, the raw dict is dropped as soon as the clip is built
             if "json" in entity_data:
-                with open(entity_data["json"]) as json_file:
-                    entity_data["json"] = json.load(json_file)
+                json_path = entity_data["json"]
+                clip = self.animation_clips.get(json_path)
+                if clip is None:
+                    with open(json_path) as json_file:
+                        clip = parse_animation_clip(json.load(json_file))
+                    self.animation_clips[json_path] = clip
+                entity_data["clip"] = clip
@@ -5,5 +5,50 @@ import pygame
 
 @dataclass
 class PygameContext:
-    screen: pygame.Surface
+    # None when headless
+    screen: pygame.Surface | None
     clock: pygame.time.Clock
+
+
+@dataclass
+class MergedColliders:
+    # one big box per run of same flag solid / thin tiles
+    rects: list[pygame.FRect]
+    flags: list[int]
+    # per tile, id of the box covering it or -1 for air
+    box_id_by_tile: list[int]
+
+
+@dataclass
+class GridRayHit:
+    # flags of the tile that stopped the ray and its tile coords
+    tile: int
+    world_tu_x: int
+    world_tu_y: int
+    point: pygame.Vector2
+    # (0, 0) when the ray starts inside the tile
+    normal: pygame.Vector2
+    distance: float
+
+
+@dataclass
+class ItemRayHit:
+    # first item the ray touched, rect owner from the spatial index
+    item: object
+    point: pygame.Vector2
+    # (0, 0) when the ray starts inside the item
+    normal: pygame.Vector2
+    # along the ray, origin + direction * t
+    t: float
+
+
+@dataclass(frozen=True)
+class AnimationClip:
+    # parsed once per asset and shared by every entity playing it, never changes
+    # spritesheet area of each frame, x y w h
+    frames: tuple[tuple[int, int, int, int], ...]
+    # ms each frame stays up
+    durations: tuple[int, ...]
+    # ms into the clip each frame ends at, running sum of durations, bisect it to find the frame at any time
+    frame_ends: tuple[int, ...]
+    total_time: int
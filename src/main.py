@@ -1,9 +1,10 @@
 from os import path
 import sys
 import pygame
-from const import FIRST_ROOM_JSON_NAME, FPS
+from const import FIRST_ROOM_JSON_NAME, FIXED_DT, FPS, MAX_SIM_STEPS_PER_FRAME
 from nodes.room import Room
 from utils.init_pygame import init_pygame
+from utils.quadtree_utils import QuadTree
 
 # Get the main.py abs path in any machine!
 base_dir = path.dirname(path.abspath(__file__))
@@ -22,19 +23,76 @@ room = Room(base_dir, FIRST_ROOM_JSON_NAME)
 def main():
     # Game Loop
     running = 1
+    # real ms not simulated yet
+    accumulator = 0.0
+    # measured sim hz and render fps, refreshed every second
+    stats_ms = 0
+    stats_ticks = 0
+    stats_frames = 0
+    # F3 - toggle the quadtree overlay, its stats and the per render layer draw ms in the caption
+    show_spatial_index = False
+    # keys pressed since the last sim tick, gathered once a render frame, the first tick after gets them and clears them
+    # so a press is seen exactly once no matter how many ticks (0, 1, 2) a frame runs
+    just_pressed = set()
     while running:
-        dt = clock.tick(60)  # Cap at 60 FPS
+        frame_ms = clock.tick(FPS)  # Cap the frame rate
+        accumulator += frame_ms
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = 0
+            if event.type == pygame.KEYDOWN:
+                just_pressed.add(event.key)
+                if event.key == pygame.K_F3:
+                    show_spatial_index = not show_spatial_index
 
-        # room update
-        room.update(dt, screen)
+        # room update, fixed steps only
+        steps = 0
+        while accumulator >= FIXED_DT and steps < MAX_SIM_STEPS_PER_FRAME:
+            room.update(FIXED_DT, just_pressed)
+            just_pressed.clear()
+            accumulator -= FIXED_DT
+            steps += 1
+        # hitch, drop the backlog instead of catching up forever (the game just slows down)
+        if accumulator >= FIXED_DT:
+            accumulator %= FIXED_DT
+
+        # room draw, in between the last 2 sim ticks
+        room.draw(screen, accumulator / FIXED_DT)
+        if show_spatial_index:
+            room.draw_spatial_index(screen)
 
         # Update the screen
         pygame.display.update()
-        clock.tick(FPS)  # Cap the frame rate
+
+        stats_ms += frame_ms
+        stats_ticks += steps
+        stats_frames += 1
+        if stats_ms >= 1000:
+            seconds = stats_ms / 1000
+            caption = (
+                f"sim {stats_ticks / seconds:.1f} hz"
+                f" | render {stats_frames / seconds:.1f} fps"
+            )
+            # enemy quadtree as of the last sim tick
+            enemy_layer = room.enemy_collision_layer
+            if show_spatial_index and isinstance(enemy_layer, QuadTree):
+                tree = enemy_layer.stats()
+                leaves = " ".join(f"{n}:{c}" for n, c in tree["leaf_items"].items())
+                caption += (
+                    f" | {tree['node_count']} nodes, depth {tree['max_depth']}"
+                    f", leaves {leaves}"
+                    f" | {tree['queries']} queries/tick"
+                    f", {tree['nodes_visited_per_query']:.1f} nodes/query"
+                )
+            if show_spatial_index:
+                caption += " | draw ms " + " ".join(
+                    f"{name} {ms:.2f}" for name, ms in room.draw_ms.items()
+                )
+            pygame.display.set_caption(caption)
+            stats_ms = 0
+            stats_ticks = 0
+            stats_frames = 0
 
     pygame.quit()
 
@@ -1,34 +1,40 @@
-import pygame
+from bisect import bisect_right
+from itertools import accumulate
 
+from definitions import AnimationClip
 
-class Animator:
-    def __init__(self, sprite_sheet, animation_data):
-        self.sprite_sheet = sprite_sheet
-        self.frames = []
-        self.durations = []
-        self.total_time = 0
-        self.current_time = 0
-        self.current_frame = 0
 
-        # Parse frames from JSON
-        for frame_name, frame_data in animation_data["frames"].items():
-            frame_rect = pygame.Rect(
+def parse_animation_clip(animation_data) -> AnimationClip:
+    """Aseprite json to a clip, SpritesheetDataMap does this once per asset"""
+    frames = []
+    durations = []
+    # Parse frames from JSON
+    for frame_name, frame_data in animation_data["frames"].items():
+        frames.append(
+            (
                 frame_data["frame"]["x"],
                 frame_data["frame"]["y"],
                 frame_data["frame"]["w"],
                 frame_data["frame"]["h"],
             )
-            self.frames.append(frame_rect)
-            self.durations.append(frame_data["duration"])
-            self.total_time += frame_data["duration"]
+        )
+        durations.append(frame_data["duration"])
+    frame_ends = tuple(accumulate(durations))
+    return AnimationClip(tuple(frames), tuple(durations), frame_ends, frame_ends[-1])
+
+
+class Animator:
+    # 1 per entity, so only when it started lives here, the frames are the shared clip's
+    # nothing to update, the frame is worked out from the room's animation clock when it is drawn, off screen costs nothing
+    __slots__ = ("clip", "start_time")
 
-    def update(self, dt):
-        """Update the animation frame based on elapsed time."""
-        self.current_time += dt
-        while self.current_time >= self.durations[self.current_frame]:
-            self.current_time -= self.durations[self.current_frame]
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
+    def __init__(self, clip: AnimationClip, start_time: float = 0.0):
+        self.clip = clip
+        # animation clock time (ms) it started at, frame 0 from there
+        self.start_time = start_time
 
-    def get_current_frame(self):
-        """Return the current frame's rectangle."""
-        return self.frames[self.current_frame]
+    def get_current_frame(self, time: float):
+        """Return the frame's spritesheet area at time (ms on the animation clock), same cost however long it has been."""
+        clip = self.clip
+        elapsed = (time - self.start_time) % clip.total_time
+        return clip.frames[bisect_right(clip.frame_ends, elapsed)]
@@ -2,12 +2,17 @@ import random
 import pygame
 
 # from room import Room
+from const import RENDER_LAYER_ENEMIES
 from nodes.animator import Animator
 from utils import raycast_utils
+from utils.render_queue_utils import RenderQueue
 
 
 class OrangeBat:
-    def __init__(self, x, y, room, png, json, enemy_collision_layer):
+    # opt in to the batched move and slide, room resolves every visible one of us in one numpy pass
+    batch_move_and_slide: bool = True
+
+    def __init__(self, x, y, room, png, clip):
         # id for collision layer search, so others know what this is
         self.type = "enemy"
         # enemy type 1 needs room ref, for move and slide and pos clamping within room limit
@@ -17,6 +22,8 @@ class OrangeBat:
         # set pos is by rect bottom left
         self.rect.x = x
         self.rect.y = y - self.rect.h
+        # pos before the last sim tick, draw lerps between the two
+        self.previous_position = pygame.Vector2(self.rect.x, self.rect.y)
 
         self.max_run: float = 0.09  # Px / ms
         self.velocity: pygame.Vector2 = pygame.Vector2(0.0, 0.0)
@@ -27,12 +34,17 @@ class OrangeBat:
 
         self.bounce_cooldown = 0  # Cooldown timer in ms
 
-        self.enemy_collision_layer = enemy_collision_layer
-
-        # Initialize the animator
-        self.animator = Animator(png, json)
+        # Initialize the animator, the clip is shared with every other one of us, only when mine started is mine
+        self.animator = Animator(clip, room.animation_time)
 
     def update(self, dt):
+        self.update_velocity(dt)
+        contact_normal = self.move_and_slide(dt)
+        self.update_after_move_and_slide(dt, contact_normal)
+
+    def update_velocity(self, dt):
+        """Everything before move and slide, batched or not"""
+        self.previous_position.update(self.rect.x, self.rect.y)
         # Reduce cooldown timer
         if self.bounce_cooldown > 0:
             self.bounce_cooldown -= dt
@@ -43,10 +55,12 @@ class OrangeBat:
         self.velocity.y = raycast_utils.exp_decay(
             self.velocity.y, self.direction_vertical * self.max_run, self.decay, dt
         )
-        # Move and slide just like in Godot
+
+    def move_and_slide(self, dt) -> pygame.Vector2:
+        """Scalar move and slide just like in Godot, sub steps itself if this frame is too fast"""
         contact_normal = pygame.Vector2(0.0, 0.0)
         contact_point = pygame.Vector2(0.0, 0.0)
-        raycast_utils.resolve_vel_against_solid_tiles(
+        raycast_utils.move_and_slide(
             self.rect,
             dt,
             self.velocity,
@@ -56,27 +70,20 @@ class OrangeBat:
             self.room.collision_layer,
             contact_point,
             contact_normal,
+            collision_sat=self.room.collision_sat,
+            merged_colliders=self.room.merged_colliders,
         )
+        return contact_normal
+
+    def update_after_move_and_slide(self, dt, contact_normal: pygame.Vector2):
+        """Everything after move and slide (rect already moved), batched or not"""
         self.direction_horizontal = contact_normal.x or self.direction_horizontal
         self.direction_vertical = contact_normal.y or self.direction_vertical
-        # Update pos
-        self.rect.x += self.velocity.x * dt
-        self.rect.y += self.velocity.y * dt
         # Clamp in screen rect
         self.rect.clamp_ip(self.room.rect)
 
-        # handle me bouncing off of each other
-        nearby = self.enemy_collision_layer.search(self.rect)
-        for other in nearby:
-            if other != self:
-                if other.__class__.__name__ == self.__class__.__name__:
-                    self.bounce_with(other)
-
-        # Update animation
-        self.animator.update(dt)
-
     def bounce_with(self, other: "OrangeBat"):
-        """Handles bouncing between my frens"""
+        """Handles bouncing between my frens, room calls this once per overlapping pair"""
         # Reset color to default before checking collisions
         if self.bounce_cooldown <= 0 and other.bounce_cooldown <= 0:
             # Randomize new directions ensuring they are different
@@ -94,8 +101,10 @@ class OrangeBat:
             self.bounce_cooldown = 400  # 200ms cooldown
             other.bounce_cooldown = 400
 
-    def draw(self, screen: pygame.Surface, camera: pygame.FRect):
-        frame_rect = self.animator.get_current_frame()
-        screen.blit(
-            self.surf, (self.rect.x - camera.x, self.rect.y - camera.y), frame_rect
+    def draw(self, render_queue: RenderQueue, camera: pygame.FRect, alpha: float = 1.0):
+        frame_rect = self.animator.get_current_frame(self.room.animation_time)
+        x = raycast_utils.lerp(self.previous_position.x, self.rect.x, alpha)
+        y = raycast_utils.lerp(self.previous_position.y, self.rect.y, alpha)
+        render_queue.submit(
+            self.surf, (x - camera.x, y - camera.y), frame_rect, RENDER_LAYER_ENEMIES
         )
@@ -1,11 +1,14 @@
 import pygame
 
 # from room import Room
+from const import RENDER_LAYER_PLAYER, TILE_THIN
 from utils import raycast_utils
+from utils.render_queue_utils import RenderQueue
+from utils.tilemap_utils import tile_range
 
 
 class Player:
-    def __init__(self, x, y, room, enemy_collision_layer, door_collision_layer):
+    def __init__(self, x, y, room, enemy_collision_layer):
         # player needs room ref, for move and slide and pos clamping within room limit
         self.room = room
         self.surf: pygame.Surface = pygame.Surface((7, 18))
@@ -14,18 +17,22 @@ class Player:
         # set pos is by rect bottom left
         self.rect.x = x
         self.rect.y = y - self.rect.h
+        # pos before the last sim tick, draw lerps between the two
+        self.previous_position = pygame.Vector2(self.rect.x, self.rect.y)
 
         self.max_run: float = 0.09  # Px / ms
         self.velocity: pygame.Vector2 = pygame.Vector2(0.0, 0.0)
         self.decay: float = 0.01
-        self.floor = ""
+        self.floor = 0
 
         self.enemy_collision_layer = enemy_collision_layer
-        self.door_collision_layer = door_collision_layer
+        # tiles the rect covered at the last trigger check, None so the first update checks
+        self.occupied_tiles = None
 
-    def update(self, dt):
+    def update(self, dt, just_pressed):
+        # just_pressed comes from main once a render frame, a tick is not a frame so get_just_pressed here would miss / repeat presses
+        self.previous_position.update(self.rect.x, self.rect.y)
         pressed = pygame.key.get_pressed()
-        just_pressed = pygame.key.get_just_pressed()
         # Get dir
         direction_horizontal = pressed[pygame.K_RIGHT] - pressed[pygame.K_LEFT]
         direction_vertical = pressed[pygame.K_DOWN] - pressed[pygame.K_UP]
@@ -39,7 +46,7 @@ class Player:
         # Move and slide just like in Godot
         contact_normal = pygame.Vector2(0.0, 0.0)
         contact_point = pygame.Vector2(0.0, 0.0)
-        tile_you_hit = raycast_utils.resolve_vel_against_solid_tiles(
+        tile_you_hit = raycast_utils.move_and_slide(
             self.rect,
             dt,
             self.velocity,
@@ -50,18 +57,17 @@ class Player:
             contact_point,
             contact_normal,
             is_player=True,
+            collision_sat=self.room.collision_sat,
+            merged_colliders=self.room.merged_colliders,
         )
         if contact_normal.y == -1:
             self.floor = tile_you_hit
-        # Update pos
-        self.rect.x += self.velocity.x * dt
-        self.rect.y += self.velocity.y * dt
         # Clamp in screen rect
         self.rect.clamp_ip(self.room.rect)
 
         # Testing slip through thin floors, hold down and press space for jump
-        if self.floor == "2":
-            if pressed[pygame.K_DOWN] and just_pressed[pygame.K_SPACE]:
+        if self.floor & TILE_THIN:
+            if pressed[pygame.K_DOWN] and pygame.K_SPACE in just_pressed:
                 self.rect.y += 1
 
         # handle player hitting enemy type 1
@@ -70,12 +76,22 @@ class Player:
         if len(nearby_enemies):
             self.surf.fill("yellow")
 
-        # handle player hitting door
-        nearby_doors = self.door_collision_layer.search(self.rect)
-        if len(nearby_doors):
-            self.room.on_player_hit_door_change_room(
-                nearby_doors[0].target_room_json_name, nearby_doors[0].name
-            )
+        # handle player hitting door (and later other triggers), only when it is on different tiles than last time
+        occupied_tiles = tile_range(
+            self.rect.x, self.rect.y, self.rect.w, self.rect.h, self.room.tileheight
+        )
+        if occupied_tiles != self.occupied_tiles:
+            self.occupied_tiles = occupied_tiles
+            for trigger in self.room.triggers_in(occupied_tiles):
+                if trigger.type == "door":
+                    self.room.on_player_hit_door_change_room(
+                        trigger.target_room_json_name, trigger.name
+                    )
+                    break
 
-    def draw(self, screen: pygame.Surface, camera: pygame.FRect):
-        screen.blit(self.surf, (self.rect.x - camera.x, self.rect.y - camera.y))
+    def draw(self, render_queue: RenderQueue, camera: pygame.FRect, alpha: float = 1.0):
+        x = raycast_utils.lerp(self.previous_position.x, self.rect.x, alpha)
+        y = raycast_utils.lerp(self.previous_position.y, self.rect.y, alpha)
+        render_queue.submit(
+            self.surf, (x - camera.x, y - camera.y), layer=RENDER_LAYER_PLAYER
+        )
@@ -1,45 +1,231 @@
 import copy
+import time
 from os import path
+from typing import AbstractSet
 
 import pygame
 
-from const import HEIGHT, TILE_SIZE, WIDTH
+from const import (
+    BATCH_MOVE_AND_SLIDE_MIN_COUNT,
+    BG_FILL_COLOR,
+    HEIGHT,
+    MERGE_STATIC_COLLIDERS,
+    SPATIAL_INDEX_BY_LAYER,
+    TILE_SIZE,
+    WIDTH,
+)
 from nodes.door import Door
 from db.spritesheet_data_map import SpritesheetDataMap
 from nodes.player import Player
-from utils import quadtree_utils
+from utils import (
+    batch_raycast_utils,
+    flat_quadtree_utils,
+    quadtree_utils,
+    raycast_utils,
+    spatial_hash_utils,
+    sweep_and_prune_utils,
+)
+from utils.render_queue_utils import RenderQueue
 from utils.tilemap_utils import tilemap_routine
 
+# what SPATIAL_INDEX_BY_LAYER names map to, all take the room rect and share insert / move / remove / collapse_empty / search / query_pairs / clear
+SPATIAL_INDEX_CLASSES = {
+    "quadtree": quadtree_utils.QuadTree,
+    "flat_quadtree": flat_quadtree_utils.FlatQuadTree,
+    "hash_grid": spatial_hash_utils.SpatialHashGrid,
+    "sweep_and_prune": sweep_and_prune_utils.SweepAndPrune,
+}
+
 
 class Room:
-    def __init__(self, base_dir, tile_json_path):
+    def __init__(self, base_dir, tile_json_path, headless=False):
         self.base_dir = base_dir
+        # sim only, no tile sheet, no bg, no convert_alpha, draw does nothing (needs init_pygame(headless=True))
+        self.headless = headless
         self.spritesheet_data_map = SpritesheetDataMap(self.base_dir)
         self.spritesheet_instanced_data = {}
         self.camera = pygame.FRect(0, 0, WIDTH, HEIGHT)
+        # camera before the last sim tick, draw lerps between the two
+        self.previous_camera_position = pygame.Vector2(0.0, 0.0)
+        # reused every draw, the interpolated camera
+        self.render_camera = pygame.FRect(0, 0, WIDTH, HEIGHT)
+        # sim ms since the room object was made, every animator reads its frame off this instead of ticking its own
+        self.animation_time = 0.0
+        # ms per render layer of the last draw
+        # player / enemies is submitting to the render queue, sprites is the queue blitting them
+        self.draw_ms = {
+            "fill": 0.0,
+            "bg": 0.0,
+            "player": 0.0,
+            "enemies": 0.0,
+            "sprites": 0.0,
+        }
         self._load_room_data(tile_json_path, "START")
 
     def on_player_hit_door_change_room(self, tile_json_path, target_door_name):
         self._load_room_data(tile_json_path, target_door_name)
 
-    def update(self, dt: int, screen: pygame.Surface):
-        self.player.update(dt)
-        self.enemy_collision_layer.clear()
+    def raycast_grid(
+        self, origin: pygame.Vector2, direction: pygame.Vector2, max_distance: float
+    ):
+        """First solid or thin tile along the ray in this room, for hitscan shots"""
+        return raycast_utils.raycast_grid(
+            origin,
+            direction,
+            max_distance,
+            self.tileheight,
+            self.width,
+            self.height,
+            self.collision_layer,
+        )
+
+    def triggers_in(self, tiles: tuple[int, int, int, int]) -> list:
+        """Every trigger (door, ...) covering the inclusive (left, top, right, bottom) tiles, each once"""
+        l_tu, t_tu, r_tu, b_tu = tiles
+        found = []
+        for world_tu_y in range(max(t_tu, 0), min(b_tu, self.height - 1) + 1):
+            for world_tu_x in range(max(l_tu, 0), min(r_tu, self.width - 1) + 1):
+                for trigger_id in self.trigger_layer.get(
+                    world_tu_y * self.width + world_tu_x, ()
+                ):
+                    trigger = self.triggers[trigger_id]
+                    if trigger not in found:
+                        found.append(trigger)
+        return found
 
+    def update(self, dt: float, just_pressed: AbstractSet[int] = frozenset()):
+        """One fixed sim tick, no drawing. just_pressed is the keys pressed since the last tick"""
+        # fresh move and slide counters for this tick
+        raycast_utils.reset_resolve_counters()
+        # same for the quadtree query counters, the other indexes do not keep any
+        if isinstance(self.enemy_collision_layer, quadtree_utils.QuadTree):
+            self.enemy_collision_layer.reset_query_stats()
+        self.previous_camera_position.update(self.camera.x, self.camera.y)
+        self.animation_time += dt
+
+        self.player.update(dt, just_pressed)
+
+        # most bats stay in their node / cells from one tick to the next, so move beats clear and insert everything again
         for enemy in self.enemy_layer_list:
-            self.enemy_collision_layer.insert(enemy)
+            self.enemy_collision_layer.move(enemy)
+        self.enemy_collision_layer.collapse_empty()
 
         self.camera.center = self.player.rect.center
         self.camera.clamp_ip(self.rect)
 
-        screen.fill("black")
-        screen.blit(self.pre_rendered_bg, (-self.camera.x, -self.camera.y))
-        self.player.draw(screen, self.camera)
-
         nearby_enemies = self.enemy_collision_layer.search(self.camera)
+        # draw shows the same ones that got updated
+        self.visible_enemies = nearby_enemies
+
+        # bats bouncing off of each other, 1 pass over every overlapping pair instead of a search per bat
+        # only pairs with an awake (on camera) one in them, same as when each did its own search
+        for enemy, other in self.enemy_collision_layer.query_pairs(
+            "enemy", self.camera
+        ):
+            if enemy.__class__ is other.__class__:
+                enemy.bounce_with(other)
+
+        # enemies that opt in get their move and slide resolved all at once, numpy only pays off for a crowd
+        # the batch only knows tiles, so merged boxes mean everyone goes through the scalar path
+        batched_enemies = [
+            enemy
+            for enemy in nearby_enemies
+            if getattr(enemy, "batch_move_and_slide", False)
+        ]
+        if (
+            len(batched_enemies) < BATCH_MOVE_AND_SLIDE_MIN_COUNT
+            or self.merged_colliders is not None
+        ):
+            batched_enemies = []
+        if batched_enemies:
+            for enemy in batched_enemies:
+                enemy.update_velocity(dt)
+            # the batch is one step only, fast movers sub step on their own
+            single_step_enemies = []
+            for enemy in batched_enemies:
+                if raycast_utils.count_substeps(enemy.rect, enemy.velocity, dt) > 1:
+                    enemy.update_after_move_and_slide(dt, enemy.move_and_slide(dt))
+                else:
+                    single_step_enemies.append(enemy)
+            contact_normals = batch_raycast_utils.move_and_slide_entities(
+                single_step_enemies,
+                dt,
+                self.tileheight,
+                self.collision_grid,
+                self.collision_sat_grid,
+            )
+            for enemy, contact_normal in zip(single_step_enemies, contact_normals):
+                enemy.update_after_move_and_slide(dt, contact_normal)
+
+        already_updated = set(batched_enemies)
         for enemy in nearby_enemies:
-            enemy.update(dt)
-            enemy.draw(screen, self.camera)
+            if enemy not in already_updated:
+                enemy.update(dt)
+
+    def draw(self, screen: pygame.Surface, alpha: float):
+        """Draw the room alpha of the way from the previous sim tick to the latest one"""
+        if self.headless:
+            return
+        self.render_camera.x = raycast_utils.lerp(
+            self.previous_camera_position.x, self.camera.x, alpha
+        )
+        self.render_camera.y = raycast_utils.lerp(
+            self.previous_camera_position.y, self.camera.y, alpha
+        )
+
+        # ms each render layer took this draw, to see what the blending costs
+        start = time.perf_counter()
+        # opaque bg chunks already have the fill color under them, only a view hanging off the room needs it
+        if not self.background.covers(self.render_camera):
+            screen.fill(BG_FILL_COLOR)
+        fill_done = time.perf_counter()
+        self.background.draw(screen, self.render_camera)
+        bg_done = time.perf_counter()
+        # sprites only submit, the queue blits them all at the end, 1 fblits per layer and source surface
+        self.player.draw(self.render_queue, self.render_camera, alpha)
+        player_done = time.perf_counter()
+
+        for enemy in self.visible_enemies:
+            enemy.draw(self.render_queue, self.render_camera, alpha)
+        enemies_done = time.perf_counter()
+        self.render_queue.flush(screen)
+        sprites_done = time.perf_counter()
+
+        self.draw_ms["fill"] = (fill_done - start) * 1e3
+        self.draw_ms["bg"] = (bg_done - fill_done) * 1e3
+        self.draw_ms["player"] = (player_done - bg_done) * 1e3
+        self.draw_ms["enemies"] = (enemies_done - player_done) * 1e3
+        self.draw_ms["sprites"] = (sprites_done - enemies_done) * 1e3
+
+    def draw_spatial_index(self, screen: pygame.Surface):
+        """Debug overlay, node rects of the enemy (red) / door (blue) quadtrees on camera, call right after draw"""
+        if self.headless:
+            return
+        # gameplay finds doors through the trigger layer, the door index only exists for this overlay
+        if self.door_collision_layer is None:
+            self.door_collision_layer = SPATIAL_INDEX_CLASSES[
+                SPATIAL_INDEX_BY_LAYER["door"]
+            ](self.rect)
+            for door in self.doors:
+                self.door_collision_layer.insert(door)
+        for layer, color in (
+            (self.enemy_collision_layer, "red"),
+            (self.door_collision_layer, "blue"),
+        ):
+            if not isinstance(layer, quadtree_utils.QuadTree):
+                continue
+            stack = [layer]
+            while stack:
+                node = stack.pop()
+                if not node.rect.colliderect(self.render_camera):
+                    continue
+                pygame.draw.rect(
+                    screen,
+                    color,
+                    node.rect.move(-self.render_camera.x, -self.render_camera.y),
+                    1,
+                )
+                stack.extend(node.children)
 
     def _load_room_data(self, tile_json_path, target_door_name):
         data = tilemap_routine(
@@ -47,13 +233,22 @@ class Room:
             self.base_dir,
             current_stage=getattr(self, "current_stage", ""),
             spritesheet=getattr(self, "spritesheet", None),
+            merge_colliders=MERGE_STATIC_COLLIDERS,
+            headless=self.headless,
         )
 
         self.width = data["width"]
         self.height = data["height"]
         self.tileheight = data["tileheight"]
         self.collision_layer = data["collision_layer"]
-        self.pre_rendered_bg = data["pre_rendered_bg"]
+        self.collision_grid = data["collision_grid"]
+        self.collision_sat = data["collision_sat"]
+        self.collision_sat_grid = data["collision_sat_grid"]
+        self.merged_colliders = data["merged_colliders"]
+        self.trigger_layer = data["trigger_layer"]
+        self.background = data["background"]
+        # new room, new spritesheets, drop the frames cut out of the old ones
+        self.render_queue = RenderQueue()
         self.players = data["players"]
         self.enemies = data["enemies"]
         self.raw_doors = data["doors"]
@@ -69,39 +264,51 @@ class Room:
                 ]
             )
             self.spritesheet_data_map.load_spritesheet_data(
-                self.spritesheet_instanced_data
+                self.spritesheet_instanced_data, self.headless
             )
 
-        self.enemy_collision_layer = quadtree_utils.QuadTree(self.rect)
+        self.enemy_collision_layer = SPATIAL_INDEX_CLASSES[
+            SPATIAL_INDEX_BY_LAYER["enemy"]
+        ](self.rect)
         self.enemy_layer_list = [
             self.spritesheet_instanced_data[enemy["name"]]["class_ref"](
                 enemy["x"],
                 enemy["y"],
                 self,
                 self.spritesheet_instanced_data[enemy["name"]]["png"],
-                self.spritesheet_instanced_data[enemy["name"]]["json"],
-                self.enemy_collision_layer,
+                self.spritesheet_instanced_data[enemy["name"]]["clip"],
             )
             for enemy in self.enemies
         ]
+        for enemy in self.enemy_layer_list:
+            self.enemy_collision_layer.insert(enemy)
 
-        self.door_collision_layer = quadtree_utils.QuadTree(self.rect)
         self.doors = [
             Door(door["x"], door["y"], door["properties"][0]["value"], door["name"])
             for door in self.raw_doors
         ]
-        for door in self.doors:
-            self.door_collision_layer.insert(door)
+        # built by draw_spatial_index the first time the F3 overlay shows this room
+        self.door_collision_layer = None
+        # tiled object id -> the thing made of it, what the trigger layer ids point to
+        self.triggers = {
+            raw_door["id"]: door for raw_door, door in zip(self.raw_doors, self.doors)
+        }
 
         self.player = Player(
             0,
             0,
             self,
             self.enemy_collision_layer,
-            self.door_collision_layer,
         )
         for player in self.players:
             if player["name"] == target_door_name:
                 self.player.rect.x = player["x"]
                 self.player.rect.y = player["y"] - self.player.rect.h
                 break
+        self.player.previous_position.update(self.player.rect.x, self.player.rect.y)
+
+        # new room, nothing to lerp from, snap the camera and start with nobody visible until the first tick
+        self.camera.center = self.player.rect.center
+        self.camera.clamp_ip(self.rect)
+        self.previous_camera_position.update(self.camera.x, self.camera.y)
+        self.visible_enemies = []
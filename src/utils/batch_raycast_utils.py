@@ -0,0 +1,270 @@
+import numpy as np
+import pygame
+
+from const import TILE_COLLIDABLE
+from utils.raycast_utils import resolve_counters
+
+# note
+# 1. this is the same move and slide as raycast_utils.resolve_vel_against_solid_tiles, but for a whole room of enemies at once
+# 2. the loop is over tile slots (at most 2 x 2 for bats), not over enemies, each slot is one numpy pass for every enemy
+# 3. results must match the scalar path bit for bit, so float32 is used wherever FRect stores a value and float64 wherever the kernel / python float does
+# 4. quirks of the scalar path are kept on purpose (shared sign in ray_vs_rect, normal written even when t is out of 0..1)
+
+
+def _python_max(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # python max(a, b) keeps a unless b is strictly bigger, nan included
+    return np.where(b > a, b, a)
+
+
+def _python_min(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # python min(a, b) keeps a unless b is strictly smaller, nan included
+    return np.where(b < a, b, a)
+
+
+def _direction(v: np.ndarray) -> np.ndarray:
+    # same as determine_movement_direction
+    return np.where(np.abs(v) <= 0.01, 0, np.where(v > 0, 1, -1))
+
+
+def resolve_vel_against_solid_tiles_batch(
+    rects: np.ndarray,
+    dt: int,
+    velocities: np.ndarray,
+    tileheight: int,
+    collision_grid: np.ndarray,
+    contact_normals: np.ndarray,
+    collision_sat_grid: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    | Batched resolve_vel_against_solid_tiles.
+    |
+    | rects is (n, 4) float32 x, y, w, h.
+    | velocities is (n, 2) float64, updated in place.
+    | contact_normals is (n, 2) float64, updated in place.
+    |
+    | collision_grid is the (height, width) uint8 tile flag grid from tilemap_routine.
+    | Pass collision_sat_grid to drop the rects whose swept region is all air before the tile loop.
+    |
+    | Returns (n,) uint8 of the flags of the last collidable tile each rect scanned, 0 if none.
+    """
+    n = len(rects)
+    tiles_hit = np.zeros(n, dtype=np.uint8)
+    if n == 0:
+        return tiles_hit
+    height, width = collision_grid.shape
+
+    # FRect values are float32, do the rect math in float32 like FRect does
+    x = rects[:, 0].astype(np.float32)
+    y = rects[:, 1].astype(np.float32)
+    w = rects[:, 2].astype(np.float32)
+    h = rects[:, 3].astype(np.float32)
+
+    # Compute the future position based on velocity and delta time
+    distance = velocities * dt
+    future_x = x + distance[:, 0].astype(np.float32)
+    future_y = y + distance[:, 1].astype(np.float32)
+
+    # Get the bounds of the combined rect (FRect.union)
+    combined_x = np.minimum(x, future_x)
+    combined_y = np.minimum(y, future_y)
+    combined_w = np.maximum(x + w, future_x + w) - combined_x
+    combined_h = np.maximum(y + h, future_y + h) - combined_y
+
+    # Truncate the bounds to tile coordinates
+    l_tu = np.floor_divide(combined_x.astype(np.float64), tileheight).astype(np.int64)
+    t_tu = np.floor_divide(combined_y.astype(np.float64), tileheight).astype(np.int64)
+    r_tu = np.floor_divide(
+        (combined_x + combined_w).astype(np.float64), tileheight
+    ).astype(np.int64)
+    b_tu = np.floor_divide(
+        (combined_y + combined_h).astype(np.float64), tileheight
+    ).astype(np.int64)
+    width_tu = r_tu - l_tu + 1
+    height_tu = b_tu - t_tu + 1
+
+    # All air in the swept region? the summed area table says so in 4 reads, give them an empty region
+    resolve_counters["calls"] += n
+    if collision_sat_grid is not None:
+        x0 = np.clip(l_tu, 0, width)
+        y0 = np.clip(t_tu, 0, height)
+        x1 = np.clip(r_tu + 1, 0, width)
+        y1 = np.clip(b_tu + 1, 0, height)
+        all_air = (
+            collision_sat_grid[y1, x1]
+            - collision_sat_grid[y0, x1]
+            - collision_sat_grid[y1, x0]
+            + collision_sat_grid[y0, x0]
+        ) == 0
+        resolve_counters["sat_early_outs"] += int(all_air.sum())
+        width_tu[all_air] = 0
+        height_tu[all_air] = 0
+        if all_air.all():
+            return tiles_hit
+
+    # Get direction
+    direction_x = _direction(velocities[:, 0])
+    direction_y = _direction(velocities[:, 1])
+
+    # Collider values in float64, like reading them off the FRect in python
+    x64 = x.astype(np.float64)
+    y64 = y.astype(np.float64)
+    w64 = w.astype(np.float64)
+    h64 = h.astype(np.float64)
+    origin_x = x64 + w64 / 2
+    origin_y = y64 + h64 / 2
+
+    # Iterate region candidate, one slot for every enemy at a time
+    for i in range(int(width_tu.max())):
+        world_tu_x = np.where(direction_x == -1, l_tu + width_tu - 1 - i, l_tu + i)
+        for j in range(int(height_tu.max())):
+            world_tu_y = np.where(direction_y == -1, t_tu + height_tu - 1 - j, t_tu + j)
+
+            # Ignore air, non collidable, out of bound and rects whose region is smaller than this slot
+            in_bounds = (
+                (i < width_tu)
+                & (j < height_tu)
+                & (0 <= world_tu_x)
+                & (world_tu_x < width)
+                & (0 <= world_tu_y)
+                & (world_tu_y < height)
+            )
+            tile = np.zeros(n, dtype=np.uint8)
+            tile[in_bounds] = collision_grid[
+                world_tu_y[in_bounds], world_tu_x[in_bounds]
+            ]
+            solid = (tile & TILE_COLLIDABLE) != 0
+
+            # update what u hit
+            tiles_hit[solid] = tile[solid]
+
+            # dynamic_rect_vs_rect, not moving means no test at all
+            moving = (np.abs(velocities[:, 0]) > 0.0) | (np.abs(velocities[:, 1]) > 0.0)
+            idx = np.flatnonzero(solid & moving)
+            if not len(idx):
+                continue
+
+            # Expanded target, plain floats like dynamic_rect_vs_rect_kernel
+            target_x = (world_tu_x[idx] * tileheight).astype(np.float64)
+            target_y = (world_tu_y[idx] * tileheight).astype(np.float64)
+            expanded_x = target_x - w64[idx] / 2
+            expanded_y = target_y - h64[idx] / 2
+            expanded_w = tileheight + w64[idx]
+            expanded_h = tileheight + h64[idx]
+
+            ray_dir_x = velocities[idx, 0] * dt
+            ray_dir_y = velocities[idx, 1] * dt
+
+            # Handle infinity, the sign is shared between x and y in ray_vs_rect
+            small_x = np.abs(ray_dir_x) < 0.1
+            small_y = np.abs(ray_dir_y) < 0.1
+            sign_x = np.where(ray_dir_x > 0.0, 1.0, -1.0)
+            sign_y = np.where(
+                ray_dir_y > 0.0, 1.0, np.where(small_x & (ray_dir_x > 0.0), 1.0, -1.0)
+            )
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                one_over_ray_dir_x = np.where(
+                    small_x, np.inf * sign_x, 1.0 / np.where(small_x, 1.0, ray_dir_x)
+                )
+                one_over_ray_dir_y = np.where(
+                    small_y, np.inf * sign_y, 1.0 / np.where(small_y, 1.0, ray_dir_y)
+                )
+
+                # Get near far time
+                t_near_x = (expanded_x - origin_x[idx]) * one_over_ray_dir_x
+                t_near_y = (expanded_y - origin_y[idx]) * one_over_ray_dir_y
+                t_far_x = (expanded_x + expanded_w - origin_x[idx]) * one_over_ray_dir_x
+                t_far_y = (expanded_y + expanded_h - origin_y[idx]) * one_over_ray_dir_y
+
+            # Sort near far time
+            swap_x = t_near_x > t_far_x
+            t_near_x, t_far_x = (
+                np.where(swap_x, t_far_x, t_near_x),
+                np.where(swap_x, t_near_x, t_far_x),
+            )
+            swap_y = t_near_y > t_far_y
+            t_near_y, t_far_y = (
+                np.where(swap_y, t_far_y, t_near_y),
+                np.where(swap_y, t_near_y, t_far_y),
+            )
+
+            # COLLISION RULE
+            t_hit_near = _python_max(t_near_x, t_near_y)
+            t_hit_far = _python_min(t_far_x, t_far_y)
+            ray_hit = ~((t_near_x > t_far_y) | (t_near_y > t_far_x)) & ~(t_hit_far < 0)
+
+            # Compute contact normal
+            normal_x = np.where(
+                t_near_x > t_near_y,
+                np.where(ray_dir_x < 0, 1.0, -1.0),
+                np.where(
+                    t_near_x < t_near_y,
+                    0.0,
+                    np.where(one_over_ray_dir_x < 0, 1.0, -1.0),
+                ),
+            )
+            normal_y = np.where(
+                t_near_x > t_near_y,
+                0.0,
+                np.where(
+                    t_near_x < t_near_y,
+                    np.where(ray_dir_y < 0, 1.0, -1.0),
+                    np.where(one_over_ray_dir_y < 0, 1.0, -1.0),
+                ),
+            )
+            hit_idx = idx[ray_hit]
+            contact_normals[hit_idx, 0] = normal_x[ray_hit]
+            contact_normals[hit_idx, 1] = normal_y[ray_hit]
+
+            # RESOLVE VEL, only when hit time is within this frame
+            resolve = ray_hit & (t_hit_near >= 0.0) & (t_hit_near < 1.0)
+            resolve_idx = idx[resolve]
+            t = t_hit_near[resolve]
+            velocities[resolve_idx, 0] += (
+                normal_x[resolve] * np.abs(velocities[resolve_idx, 0]) * (1 - t)
+            )
+            velocities[resolve_idx, 1] += (
+                normal_y[resolve] * np.abs(velocities[resolve_idx, 1]) * (1 - t)
+            )
+
+    return tiles_hit
+
+
+def move_and_slide_entities(
+    entities: list,
+    dt: int,
+    tileheight: int,
+    collision_grid: np.ndarray,
+    collision_sat_grid: np.ndarray | None = None,
+) -> list[pygame.Vector2]:
+    """
+    | Pack entity rect and velocity into arrays, resolve them all in one go, write the velocity back and move the rects.
+    |
+    | One step only, entities that need sub steps (see raycast_utils.count_substeps) must go through raycast_utils.move_and_slide.
+    |
+    | Returns the contact normal of each entity, same order as given.
+    """
+    n = len(entities)
+    rects = np.empty((n, 4), dtype=np.float32)
+    velocities = np.empty((n, 2), dtype=np.float64)
+    for i, entity in enumerate(entities):
+        rects[i] = (entity.rect.x, entity.rect.y, entity.rect.w, entity.rect.h)
+        velocities[i] = (entity.velocity.x, entity.velocity.y)
+    contact_normals = np.zeros((n, 2), dtype=np.float64)
+
+    resolve_vel_against_solid_tiles_batch(
+        rects,
+        dt,
+        velocities,
+        tileheight,
+        collision_grid,
+        contact_normals,
+        collision_sat_grid,
+    )
+
+    for i, entity in enumerate(entities):
+        entity.velocity.x = float(velocities[i, 0])
+        entity.velocity.y = float(velocities[i, 1])
+        # Update pos
+        entity.rect.x += entity.velocity.x * dt
+        entity.rect.y += entity.velocity.y * dt
+    return [pygame.Vector2(float(nx), float(ny)) for nx, ny in contact_normals]
@@ -0,0 +1,185 @@
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import pygame
+
+from const import (
+    BG_CHUNK_CACHE_SIZE,
+    BG_CHUNK_TILES,
+    BG_FILL_COLOR,
+    SPRITESHEET_WIDTH,
+)
+
+# note
+# 1. the room bg is never painted whole, it is cut in square chunks of chunk_tiles tiles that get painted the first time the camera sees them
+# 2. painted chunks live in an lru of at most max_chunks, the one not seen for the longest goes first, so memory is capped no matter the room size
+# 3. what is kept for the whole room is only the tile ids (2 bytes a tile per non empty layer), not 4 bytes a pixel
+# 4. layers are painted in tiled order, tiles of a layer never overlap, so a chunk comes out the same as that part of the old pre rendered bg
+# 5. draw only blits the chunks under the camera
+# 6. every tile layer sits under the entities and over a BG_FILL_COLOR fill, so an opaque chunk is painted over that color once (convert(), no per pixel alpha)
+#    translucent tiles get blended right there, at draw time it is a plain copy with no blending and the screen fill is not needed under it
+# 7. opaque=False keeps per pixel alpha chunks, for a bg that has to go over something else than a flat fill
+
+
+class ChunkedBackground:
+    def __init__(
+        self,
+        tile_layers: List[List[int]],
+        width: int,
+        height: int,
+        tileheight: int,
+        spritesheet: pygame.Surface,
+        chunk_tiles: int = BG_CHUNK_TILES,
+        max_chunks: int = BG_CHUNK_CACHE_SIZE,
+        opaque: bool = True,
+    ) -> None:
+        # all empty layers (no data or only 0s) paint nothing, drop them, 2 bytes a tile unless some tile id does not fit
+        self.tile_layers: List[array] = [
+            array("H" if max(layer_data) < 1 << 16 else "I", layer_data)
+            for layer_data in tile_layers
+            if layer_data and any(layer_data)
+        ]
+        self.width: int = width
+        self.height: int = height
+        self.tileheight: int = tileheight
+        self.spritesheet: pygame.Surface = spritesheet
+        self.chunk_tiles: int = chunk_tiles
+        self.chunk_size: int = chunk_tiles * tileheight
+        self.cols: int = -(-width // chunk_tiles)
+        self.rows: int = -(-height // chunk_tiles)
+        self.max_chunks: int = max_chunks
+        self.opaque: bool = opaque
+        self.rect: pygame.FRect = pygame.FRect(
+            0, 0, width * tileheight, height * tileheight
+        )
+        # row * cols + col -> painted chunk, oldest seen first
+        self.chunks: OrderedDict[int, pygame.Surface] = OrderedDict()
+        # tile id -> its spot on the spritesheet
+        self.tile_areas: Dict[int, Tuple[int, int, int, int]] = {}
+
+        # metrics, chunks_painted / cache_hits / evictions add up since load, the rest is the last draw
+        self.chunks_painted: int = 0
+        self.paint_ms: float = 0.0
+        self.cache_hits: int = 0
+        self.evictions: int = 0
+        self.chunks_blitted: int = 0
+        self.blit_ms: float = 0.0
+
+    def draw(self, screen: pygame.Surface, camera: pygame.FRect) -> None:
+        """Blit the chunks under camera, painting the ones not in the cache yet"""
+        start = time.perf_counter()
+        chunk_size = self.chunk_size
+        l_cu = max(int(camera.left // chunk_size), 0)
+        t_cu = max(int(camera.top // chunk_size), 0)
+        # right / bottom edge exclusive, a camera ending on a chunk line does not touch the next one
+        r_cu = min(-int(-camera.right // chunk_size) - 1, self.cols - 1)
+        b_cu = min(-int(-camera.bottom // chunk_size) - 1, self.rows - 1)
+        # where the room's top left lands, rounded once like blit would round it, so chunk seams never drift a px apart
+        origin_x = int(-camera.x)
+        origin_y = int(-camera.y)
+        blitted = 0
+        for chunk_y in range(t_cu, b_cu + 1):
+            for chunk_x in range(l_cu, r_cu + 1):
+                screen.blit(
+                    self._chunk(chunk_x, chunk_y),
+                    (origin_x + chunk_x * chunk_size, origin_y + chunk_y * chunk_size),
+                )
+                blitted += 1
+        self.chunks_blitted = blitted
+        # painting happens in here too, so this is the whole bg cost of the frame
+        self.blit_ms = (time.perf_counter() - start) * 1e3
+
+    def covers(self, camera: pygame.FRect) -> bool:
+        """True when opaque chunks fill the whole camera, so nothing under the bg shows and the screen fill can be skipped"""
+        return self.opaque and self.rect.contains(camera)
+
+    def _chunk(self, chunk_x: int, chunk_y: int) -> pygame.Surface:
+        key = chunk_y * self.cols + chunk_x
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            self.cache_hits += 1
+            return chunk
+        chunk = self._paint(chunk_x, chunk_y)
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+            self.evictions += 1
+        return chunk
+
+    def _paint(self, chunk_x: int, chunk_y: int) -> pygame.Surface:
+        start = time.perf_counter()
+        tileheight = self.tileheight
+        l_tu = chunk_x * self.chunk_tiles
+        t_tu = chunk_y * self.chunk_tiles
+        # last row / col of chunks gets cut to the room
+        r_tu = min(l_tu + self.chunk_tiles, self.width)
+        b_tu = min(t_tu + self.chunk_tiles, self.height)
+        size = ((r_tu - l_tu) * tileheight, (b_tu - t_tu) * tileheight)
+        if self.opaque:
+            chunk = pygame.Surface(size).convert()
+            chunk.fill(BG_FILL_COLOR)
+        else:
+            chunk = pygame.Surface(size, pygame.SRCALPHA)
+
+        spritesheet = self.spritesheet
+        blit_sequence = []
+        for layer_data in self.tile_layers:
+            for world_tu_y in range(t_tu, b_tu):
+                row = world_tu_y * self.width
+                dest_y = (world_tu_y - t_tu) * tileheight
+                for world_tu_x in range(l_tu, r_tu):
+                    tile_id = layer_data[row + world_tu_x] - 1
+                    if tile_id == -1:
+                        continue
+                    blit_sequence.append(
+                        (
+                            spritesheet,
+                            ((world_tu_x - l_tu) * tileheight, dest_y),
+                            self._tile_area(tile_id),
+                        )
+                    )
+        chunk.blits(blit_sequence, doreturn=False)
+
+        self.chunks_painted += 1
+        self.paint_ms += (time.perf_counter() - start) * 1e3
+        return chunk
+
+    def _tile_area(self, tile_id: int) -> Tuple[int, int, int, int]:
+        area = self.tile_areas.get(tile_id)
+        if area is None:
+            # get spritesheet region position
+            area = (
+                (tile_id % SPRITESHEET_WIDTH) * self.tileheight,
+                (tile_id // SPRITESHEET_WIDTH) * self.tileheight,
+                self.tileheight,
+                self.tileheight,
+            )
+            self.tile_areas[tile_id] = area
+        return area
+
+    def stats(self) -> dict:
+        """Memory held right now and the paint / blit counters"""
+        chunk_bytes = sum(
+            chunk.get_bytesize() * chunk.get_width() * chunk.get_height()
+            for chunk in self.chunks.values()
+        )
+        tile_bytes = sum(
+            layer_data.itemsize * len(layer_data) for layer_data in self.tile_layers
+        )
+        return {
+            "chunks": self.cols * self.rows,
+            "cached_chunks": len(self.chunks),
+            "cached_bytes": chunk_bytes,
+            "tile_bytes": tile_bytes,
+            # what the old single pre rendered surface took for this room
+            "full_surface_bytes": self.rect.w * self.rect.h * 4,
+            "chunks_painted": self.chunks_painted,
+            "paint_ms": self.paint_ms,
+            "cache_hits": self.cache_hits,
+            "evictions": self.evictions,
+            "chunks_blitted": self.chunks_blitted,
+            "blit_ms": self.blit_ms,
+        }
@@ -0,0 +1,63 @@
+import pygame
+
+from const import TILE_COLLIDABLE
+from definitions import MergedColliders
+
+# note
+# 1. greedy meshing, grow each box right as far as the flags match, then grow it down while the whole row matches
+# 2. only tiles with the exact same flags merge, so thin never merges with solid and sticky floor stays sticky
+# 3. greedy is not always the true minimum box count, but it is close and it is one pass
+# 4. boxes never overlap, so each tile points at exactly one box, that per tile id list is the spatial index
+
+
+def merge_collision_layer(
+    collision_layer: bytes, width: int, height: int, tileheight: int
+) -> MergedColliders:
+    """
+    | Greedy merge contiguous same flag collidable tiles into big boxes.
+    """
+    rects = []
+    flags = []
+    box_id_by_tile = [-1] * (width * height)
+
+    for y in range(height):
+        for x in range(width):
+            tile = collision_layer[y * width + x]
+            # Ignore air and tiles already in a box
+            if not tile & TILE_COLLIDABLE or box_id_by_tile[y * width + x] != -1:
+                continue
+
+            # Grow right
+            x_end = x + 1
+            while (
+                x_end < width
+                and collision_layer[y * width + x_end] == tile
+                and box_id_by_tile[y * width + x_end] == -1
+            ):
+                x_end += 1
+
+            # Grow down while the whole row span matches
+            y_end = y + 1
+            while y_end < height and all(
+                collision_layer[y_end * width + box_x] == tile
+                and box_id_by_tile[y_end * width + box_x] == -1
+                for box_x in range(x, x_end)
+            ):
+                y_end += 1
+
+            # Claim the tiles
+            box_id = len(rects)
+            for box_y in range(y, y_end):
+                for box_x in range(x, x_end):
+                    box_id_by_tile[box_y * width + box_x] = box_id
+            rects.append(
+                pygame.FRect(
+                    x * tileheight,
+                    y * tileheight,
+                    (x_end - x) * tileheight,
+                    (y_end - y) * tileheight,
+                )
+            )
+            flags.append(tile)
+
+    return MergedColliders(rects, flags, box_id_by_tile)
@@ -0,0 +1,472 @@
+import pygame
+from typing import Dict, List, Optional, Tuple
+
+# note
+# 1. same loose quadtree as quadtree_utils.QuadTree (same placement, same results), but nodes are indexes into parallel lists instead of objects
+# 2. the 4 children of a node sit next to each other, first_child[node] is the first one, -1 means leaf
+# 3. node slots are pooled, clear / collapse_empty hand child blocks back and the next subdivide reuses them, the lists only ever grow
+# 4. search_into walks the tree with one reused stack and fills a list the caller keeps, so a query makes no lists and no nodes
+
+
+class FlatQuadTree:
+    MAX_DEPTH: int = 6
+    MAX_ITEMS: int = 4
+
+    def __init__(self, rect: pygame.FRect, capacity: int = 1 + 4 * 64) -> None:
+        self.rect: pygame.FRect = rect
+        # per node slot, tight rect, its center, loose rect (tight grown to 2x around the center)
+        self.x: List[float] = []
+        self.y: List[float] = []
+        self.w: List[float] = []
+        self.h: List[float] = []
+        self.center_x: List[float] = []
+        self.center_y: List[float] = []
+        self.loose_left: List[float] = []
+        self.loose_top: List[float] = []
+        self.loose_right: List[float] = []
+        self.loose_bottom: List[float] = []
+        # the same loose rect as an FRect, made once per slot and updated in place, so search tests a child with 1 colliderect
+        self.loose_rects: List[pygame.FRect] = []
+        self.depth: List[int] = []
+        self.parent: List[int] = []
+        self.first_child: List[int] = []
+        # items in this node and everything under it, 0 means the whole subtree can be skipped / dropped
+        self.count: List[int] = []
+        self.items: List[List[any]] = []
+        self._grow(capacity)
+
+        # slots handed out so far, and child blocks handed back
+        self.node_total: int = 1
+        self.free_blocks: List[int] = []
+        # which node holds each item, so move / remove do not have to search for it
+        self.item_nodes: Dict[any, int] = {}
+        # nodes that went empty since the last collapse_empty
+        self.empty_nodes: List[int] = []
+        # reused by every walk, always empty between calls
+        self._stack: List[int] = []
+        # rect vs rect checks the last query_pairs did
+        self.pair_tests: int = 0
+        self._set_node(0, rect.x, rect.y, rect.w, rect.h, 0, -1)
+
+    def _grow(self, capacity: int) -> None:
+        more = capacity - len(self.x)
+        if more <= 0:
+            return
+        for values in (
+            self.x,
+            self.y,
+            self.w,
+            self.h,
+            self.center_x,
+            self.center_y,
+            self.loose_left,
+            self.loose_top,
+            self.loose_right,
+            self.loose_bottom,
+        ):
+            values.extend([0.0] * more)
+        self.depth.extend([0] * more)
+        self.parent.extend([-1] * more)
+        self.first_child.extend([-1] * more)
+        self.count.extend([0] * more)
+        self.items.extend([] for _ in range(more))
+        self.loose_rects.extend(pygame.FRect(0, 0, 0, 0) for _ in range(more))
+
+    def _set_node(self, node, x, y, w, h, depth, parent) -> None:
+        self.x[node] = x
+        self.y[node] = y
+        self.w[node] = w
+        self.h[node] = h
+        self.center_x[node] = x + w / 2
+        self.center_y[node] = y + h / 2
+        self.loose_left[node] = x - w / 2
+        self.loose_top[node] = y - h / 2
+        self.loose_right[node] = x + w * 1.5
+        self.loose_bottom[node] = y + h * 1.5
+        self.loose_rects[node].update(x - w / 2, y - h / 2, w * 2, h * 2)
+        self.depth[node] = depth
+        self.parent[node] = parent
+        self.first_child[node] = -1
+        self.count[node] = 0
+
+    def subdivide(self, node: int) -> None:
+        if self.first_child[node] >= 0:
+            return
+        if self.free_blocks:
+            first = self.free_blocks.pop()
+        else:
+            first = self.node_total
+            self.node_total += 4
+            if self.node_total > len(self.x):
+                # out of slots, double so this is rare
+                self._grow(max(len(self.x) * 2, self.node_total))
+        half_w = self.w[node] / 2
+        half_h = self.h[node] / 2
+        x = self.x[node]
+        y = self.y[node]
+        depth = self.depth[node] + 1
+        self._set_node(first, x, y, half_w, half_h, depth, node)
+        self._set_node(first + 1, x + half_w, y, half_w, half_h, depth, node)
+        self._set_node(first + 2, x, y + half_h, half_w, half_h, depth, node)
+        self._set_node(first + 3, x + half_w, y + half_h, half_w, half_h, depth, node)
+        self.first_child[node] = first
+
+    def insert(self, particle: any) -> bool:
+        if not self.rect.colliderect(particle.rect):
+            return False
+        self._insert(0, particle)
+        return True
+
+    def remove(self, particle: any) -> bool:
+        """Take it out, False if it was not in the tree. Emptied subtrees stay until collapse_empty"""
+        node = self.item_nodes.pop(particle, -1)
+        if node < 0:
+            return False
+        self.items[node].remove(particle)
+        self._uncount(node)
+        return True
+
+    def move(self, particle: any) -> bool:
+        """
+        Call after the particle rect moved, same return as insert.
+        Only relocates when its center left its node (or it outgrew it), so most moves are a few compares.
+        """
+        node = self.item_nodes.get(particle, -1)
+        if node < 0:
+            return self.insert(particle)
+        # _holds spelled out for the usual case, a non root node it has not left
+        rect = particle.rect
+        if node:
+            x = self.x[node]
+            y = self.y[node]
+            w = self.w[node]
+            h = self.h[node]
+            if (
+                x <= rect.centerx < x + w
+                and y <= rect.centery < y + h
+                and rect.w <= w
+                and rect.h <= h
+            ):
+                return True
+        elif self.rect.colliderect(rect):
+            return True
+
+        # crossed out of its node, climb to the first ancestor that can hold it and insert from there
+        del self.item_nodes[particle]
+        self.items[node].remove(particle)
+        self._uncount(node)
+        while not self._holds(node, particle.rect):
+            node = self.parent[node]
+            # left the whole tree, like insert it is just not in there
+            if node < 0:
+                return False
+        self._insert(node, particle)
+        # _insert counted node and below, the rest of the way up still has to know
+        ancestor = self.parent[node]
+        while ancestor >= 0:
+            self.count[ancestor] += 1
+            ancestor = self.parent[ancestor]
+        return True
+
+    def collapse_empty(self) -> None:
+        """Hand the children of subtrees that went empty back to the pool, lazily, so an item hopping back and forth does not re subdivide every frame"""
+        for node in self.empty_nodes:
+            if not self.count[node] and self.first_child[node] >= 0:
+                self._free_children(node)
+        self.empty_nodes.clear()
+
+    def _free_children(self, node: int) -> None:
+        # whole subtree under node is empty, give every child block back
+        stack = self._stack
+        stack.append(node)
+        while stack:
+            node = stack.pop()
+            first = self.first_child[node]
+            if first < 0:
+                continue
+            self.first_child[node] = -1
+            self.free_blocks.append(first)
+            stack.extend((first, first + 1, first + 2, first + 3))
+
+    def _holds(self, node: int, rect: pygame.FRect) -> bool:
+        # the root takes anything touching it, the rest need the center inside and the size to fit
+        if node == 0:
+            return self.rect.colliderect(rect)
+        x = self.x[node]
+        y = self.y[node]
+        w = self.w[node]
+        h = self.h[node]
+        return (
+            x <= rect.centerx < x + w
+            and y <= rect.centery < y + h
+            and rect.w <= w
+            and rect.h <= h
+        )
+
+    def _child_for(self, node: int, rect: pygame.FRect) -> int:
+        # the child slot this rect belongs in, -1 means it stays here
+        first = self.first_child[node]
+        if first < 0:
+            return -1
+        if rect.w > self.w[node] / 2 or rect.h > self.h[node] / 2:
+            return -1
+        x = self.x[node]
+        y = self.y[node]
+        centerx = rect.centerx
+        centery = rect.centery
+        if not (x <= centerx < x + self.w[node] and y <= centery < y + self.h[node]):
+            return -1
+        return (
+            first
+            + (centerx >= self.center_x[node])
+            + 2 * (centery >= self.center_y[node])
+        )
+
+    def _insert(self, node: int, particle: any) -> None:
+        # node must be able to hold it, walk down as far as it fits
+        self.count[node] += 1
+        child = self._child_for(node, particle.rect)
+        while child >= 0:
+            node = child
+            self.count[node] += 1
+            child = self._child_for(node, particle.rect)
+        self.items[node].append(particle)
+        self.item_nodes[particle] = node
+        self._split_if_full(node)
+
+    def _split_if_full(self, node: int) -> None:
+        # over the limit leaf, push down what fits a child, straddlers stay
+        items = self.items[node]
+        if (
+            len(items) <= self.MAX_ITEMS
+            or self.depth[node] >= self.MAX_DEPTH
+            or self.first_child[node] >= 0
+        ):
+            return
+        self.subdivide(node)
+        kept = 0
+        for particle in items:
+            child = self._child_for(node, particle.rect)
+            if child < 0:
+                # compact in place, no new list
+                items[kept] = particle
+                kept += 1
+                continue
+            self.items[child].append(particle)
+            self.count[child] += 1
+            self.item_nodes[particle] = child
+        del items[kept:]
+        first = self.first_child[node]
+        for child in range(first, first + 4):
+            self._split_if_full(child)
+
+    def _uncount(self, node: int) -> None:
+        # one item less from here up to the root
+        while node >= 0:
+            self.count[node] -= 1
+            if not self.count[node] and self.first_child[node] >= 0:
+                self.empty_nodes.append(node)
+            node = self.parent[node]
+
+    def search_into(self, area: pygame.FRect, out: List[any]) -> List[any]:
+        """Clear out and fill it with everything overlapping area, keep out around and reuse it every frame"""
+        out.clear()
+        if not self.count[0]:
+            return out
+        colliderect = area.colliderect
+        items = self.items
+        first_child = self.first_child
+        count = self.count
+        loose_rects = self.loose_rects
+        stack = self._stack
+        push = stack.append
+        pop = stack.pop
+        found = out.append
+        push(0)
+        while stack:
+            node = pop()
+            for p in items[node]:
+                if colliderect(p.rect):
+                    found(p)
+            child = first_child[node]
+            if child < 0:
+                continue
+            # the 4 children spelled out, a loop over them costs more than the tests
+            if count[child] and colliderect(loose_rects[child]):
+                push(child)
+            child += 1
+            if count[child] and colliderect(loose_rects[child]):
+                push(child)
+            child += 1
+            if count[child] and colliderect(loose_rects[child]):
+                push(child)
+            child += 1
+            if count[child] and colliderect(loose_rects[child]):
+                push(child)
+        return out
+
+    def query_pairs(
+        self, tag: Optional[str] = None, area: Optional[pygame.FRect] = None
+    ) -> List[Tuple[any, any]]:
+        """
+        Every overlapping pair once as (a, b), only items whose type is tag when given.
+        With an area only the pairs where at least 1 of the 2 overlaps it, and the rest is skipped.
+        One pass over the tree, the checks grow with how crowded it is, not with how many items there are.
+        """
+        pairs: List[Tuple[any, any]] = []
+        tests = 0
+        count = self.count
+        first_child = self.first_child
+        touched = self._touched(area)
+        # (node, -1) is every pair inside node's subtree, (a, b) is every pair between 2 disjoint subtrees
+        # a pair touching area sits inside the loose rect of any subtree holding one of them, so area prunes both
+        stack: List[Tuple[int, int]] = []
+        if count[0] and touched(0):
+            stack.append((0, -1))
+        while stack:
+            a, b = stack.pop()
+            if b < 0:
+                items = self._tagged(a, tag)
+                for i in range(len(items)):
+                    p = items[i]
+                    for j in range(i + 1, len(items)):
+                        tests += 1
+                        if p.rect.colliderect(items[j].rect):
+                            pairs.append((p, items[j]))
+                first = first_child[a]
+                if first < 0:
+                    continue
+                for child in range(first, first + 4):
+                    if not count[child]:
+                        continue
+                    if items:
+                        tests += self._pairs_with(child, items, tag, pairs)
+                    child_touched = touched(child)
+                    if child_touched:
+                        stack.append((child, -1))
+                    for other in range(child + 1, first + 4):
+                        if (
+                            count[other]
+                            and self._loose_overlap(child, other)
+                            and (child_touched or touched(other))
+                        ):
+                            stack.append((child, other))
+                continue
+            a_items = self._tagged(a, tag)
+            b_items = self._tagged(b, tag)
+            for p in a_items:
+                for q in b_items:
+                    tests += 1
+                    if p.rect.colliderect(q.rect):
+                        pairs.append((p, q))
+            a_first = first_child[a]
+            b_first = first_child[b]
+            if b_first >= 0 and a_items:
+                for child in range(b_first, b_first + 4):
+                    if count[child]:
+                        tests += self._pairs_with(child, a_items, tag, pairs)
+            if a_first < 0:
+                continue
+            for child in range(a_first, a_first + 4):
+                if not count[child]:
+                    continue
+                if b_items:
+                    tests += self._pairs_with(child, b_items, tag, pairs)
+                if b_first < 0:
+                    continue
+                child_touched = touched(child)
+                for other in range(b_first, b_first + 4):
+                    if (
+                        count[other]
+                        and self._loose_overlap(child, other)
+                        and (child_touched or touched(other))
+                    ):
+                        stack.append((child, other))
+        self.pair_tests = tests
+        if area is not None:
+            pairs = [
+                pair
+                for pair in pairs
+                if area.colliderect(pair[0].rect) or area.colliderect(pair[1].rect)
+            ]
+        return pairs
+
+    def _touched(self, area: Optional[pygame.FRect]):
+        # node -> does its loose rect overlap area, no area means everything does
+        if area is None:
+            return lambda node: True
+        left = area.left
+        top = area.top
+        right = area.right
+        bottom = area.bottom
+
+        def touched(node: int) -> bool:
+            return (
+                self.loose_left[node] < right
+                and self.loose_right[node] > left
+                and self.loose_top[node] < bottom
+                and self.loose_bottom[node] > top
+            )
+
+        return touched
+
+    def _loose_overlap(self, a: int, b: int) -> bool:
+        return (
+            self.loose_left[a] < self.loose_right[b]
+            and self.loose_right[a] > self.loose_left[b]
+            and self.loose_top[a] < self.loose_bottom[b]
+            and self.loose_bottom[a] > self.loose_top[b]
+        )
+
+    def _tagged(self, node: int, tag: Optional[str]) -> List[any]:
+        # this node's own items, only the tagged ones when asked
+        if tag is None or not self.items[node]:
+            return self.items[node]
+        return [p for p in self.items[node] if p.type == tag]
+
+    def _pairs_with(
+        self, node: int, others: List[any], tag: Optional[str], pairs: list
+    ) -> int:
+        # others (from outside node's subtree) vs everything in it, returns the checks done
+        tests = 0
+        stack = self._stack
+        for p in others:
+            rect = p.rect
+            left = rect.left
+            top = rect.top
+            right = rect.right
+            bottom = rect.bottom
+            stack.append(node)
+            while stack:
+                current = stack.pop()
+                if (
+                    not self.count[current]
+                    or self.loose_left[current] >= right
+                    or self.loose_right[current] <= left
+                    or self.loose_top[current] >= bottom
+                    or self.loose_bottom[current] <= top
+                ):
+                    continue
+                for q in self.items[current]:
+                    if tag is None or q.type == tag:
+                        tests += 1
+                        if rect.colliderect(q.rect):
+                            pairs.append((p, q))
+                first = self.first_child[current]
+                if first >= 0:
+                    stack.extend((first, first + 1, first + 2, first + 3))
+        return tests
+
+    def search(self, area: pygame.FRect) -> List[any]:
+        return self.search_into(area, [])
+
+    def clear(self) -> None:
+        # hand every slot back, the lists stay
+        for node in range(self.node_total):
+            self.items[node].clear()
+            self.first_child[node] = -1
+            self.count[node] = 0
+        self.node_total = 1
+        self.free_blocks.clear()
+        self.item_nodes.clear()
+        self.empty_nodes.clear()
@@ -1,12 +1,19 @@
+import os
+
 import pygame
 
 from const import HEIGHT, WIDTH
 from definitions import PygameContext
 
 
-def init_pygame():
+def init_pygame(headless: bool = False):
+    # headless is for stepping rooms with no window at all, no display mode so screen is None
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
     pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED)
+    screen = (
+        None if headless else pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED)
+    )
     clock = pygame.time.Clock()
 
     return PygameContext(screen, clock)
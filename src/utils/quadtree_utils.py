@@ -2,19 +2,51 @@
 # q - toggle draw quad
 # p - toggle pause
 
+import heapq
 import pygame
-from typing import List
+from itertools import count
+from math import inf
+from typing import Dict, List, Optional, Tuple
+
+from definitions import ItemRayHit
+from utils.raycast_utils import ray_vs_rect_kernel
+
+# note
+# 1. this is a loose quadtree, each node's loose_rect is its rect grown to 2x around the same center
+# 2. an item goes to the child whose rect holds its center, as long as it is no bigger than that child, so it always sits inside the child's loose_rect
+# 3. items too big for any child (or whose center is off the root) stay where they are, never split across / dropped into the wrong quadrant
+# 4. search prunes by loose_rect, so whatever overlaps the area is found, no matter where the quadrant lines are
+# 5. nearest / within_radius measure from the point to the closest spot of an item rect (0 when inside), a node's loose_rect distance is a lower bound for everything in it
+# 6. raycast uses the same slab test as move and slide (ray_vs_rect_kernel), nodes come off a heap by the t the ray enters their loose_rect, so it is front to back even though loose nodes overlap
 
 
 class QuadTree:
     MAX_DEPTH: int = 6
     MAX_ITEMS: int = 4
 
-    def __init__(self, rect: pygame.FRect, depth: int = 0) -> None:
+    def __init__(
+        self, rect: pygame.FRect, depth: int = 0, parent: Optional["QuadTree"] = None
+    ) -> None:
         self.rect: pygame.FRect = rect
+        # everything stored in this subtree is inside this
+        self.loose_rect: pygame.FRect = rect.inflate(rect.w, rect.h)
         self.depth: int = depth
         self.items: List[any] = []
         self.children: List[QuadTree] = []
+        # items in this node and everything under it, 0 means the whole subtree can be skipped / dropped
+        self.count: int = 0
+        self.parent: Optional[QuadTree] = parent
+        self.root: QuadTree = parent.root if parent else self
+        if parent is None:
+            # which node holds each item, so move / remove do not have to search for it
+            self.item_nodes: Dict[any, QuadTree] = {}
+            # nodes that went empty since the last collapse_empty
+            self.empty_nodes: List[QuadTree] = []
+            # rect vs rect checks the last query_pairs did
+            self.pair_tests: int = 0
+            # queries (search, nearest, within_radius, raycast, query_pairs) and the nodes they visited since reset_query_stats
+            self.queries: int = 0
+            self.nodes_visited: int = 0
 
     def subdivide(self) -> None:
         if self.children:
@@ -26,31 +58,441 @@ class QuadTree:
                 QuadTree(
                     pygame.FRect(self.rect.x + dx, self.rect.y + dy, half_w, half_h),
                     self.depth + 1,
+                    self,
                 )
             )
 
     def insert(self, particle: any) -> bool:
         if not self.rect.colliderect(particle.rect):
             return False
-        if len(self.items) < self.MAX_ITEMS or self.depth >= self.MAX_DEPTH:
-            self.items.append(particle)
+        self._insert(particle)
+        return True
+
+    def remove(self, particle: any) -> bool:
+        """Take it out, False if it was not in the tree. Emptied subtrees stay until collapse_empty"""
+        node = self.root.item_nodes.pop(particle, None)
+        if node is None:
+            return False
+        node.items.remove(particle)
+        node._uncount()
+        return True
+
+    def move(self, particle: any) -> bool:
+        """
+        Call after the particle rect moved, same return as insert.
+        Only relocates when its center left its node (or it outgrew it), so most moves are one collidepoint.
+        """
+        node = self.root.item_nodes.get(particle)
+        if node is None:
+            return self.root.insert(particle)
+        if node._holds(particle.rect):
             return True
+
+        # crossed out of its node, climb to the first ancestor that can hold it and insert from there
+        del self.root.item_nodes[particle]
+        node.items.remove(particle)
+        node._uncount()
+        while not node._holds(particle.rect):
+            node = node.parent
+            # left the whole tree, like insert it is just not in there
+            if node is None:
+                return False
+        node._insert(particle)
+        # _insert counted node and below, the rest of the way up still has to know
+        ancestor = node.parent
+        while ancestor is not None:
+            ancestor.count += 1
+            ancestor = ancestor.parent
+        return True
+
+    def collapse_empty(self) -> None:
+        """Drop the children of subtrees that went empty, lazily, so an item hopping back and forth does not re subdivide every frame"""
+        for node in self.root.empty_nodes:
+            if not node.count:
+                node.children = []
+        self.root.empty_nodes.clear()
+
+    def _holds(self, rect: pygame.FRect) -> bool:
+        # the root takes anything touching it, the rest need the center inside and the size to fit
+        if self.parent is None:
+            return self.rect.colliderect(rect)
+        return (
+            self.rect.collidepoint(rect.center)
+            and rect.w <= self.rect.w
+            and rect.h <= self.rect.h
+        )
+
+    def _child_for(self, rect: pygame.FRect) -> Optional["QuadTree"]:
+        # the child this rect belongs in, None means it stays here
         if not self.children:
-            self.subdivide()
+            return None
+        if rect.w > self.rect.w / 2 or rect.h > self.rect.h / 2:
+            return None
+        if not self.rect.collidepoint(rect.center):
+            return None
+        index = (rect.centerx >= self.rect.centerx) + 2 * (
+            rect.centery >= self.rect.centery
+        )
+        return self.children[index]
+
+    def _insert(self, particle: any) -> None:
+        # self must be able to hold it, walk down as far as it fits
+        node = self
+        node.count += 1
+        child = node._child_for(particle.rect)
+        while child is not None:
+            node = child
+            node.count += 1
+            child = node._child_for(particle.rect)
+        node.items.append(particle)
+        self.root.item_nodes[particle] = node
+        node._split_if_full()
+
+    def _split_if_full(self) -> None:
+        # over the limit leaf, push down what fits a child, straddlers stay
+        if (
+            len(self.items) <= self.MAX_ITEMS
+            or self.depth >= self.MAX_DEPTH
+            or self.children
+        ):
+            return
+        self.subdivide()
+        kept: List[any] = []
+        for particle in self.items:
+            child = self._child_for(particle.rect)
+            if child is None:
+                kept.append(particle)
+                continue
+            child.items.append(particle)
+            child.count += 1
+            self.root.item_nodes[particle] = child
+        self.items = kept
         for child in self.children:
-            if child.insert(particle):
-                return True
-        return False
+            child._split_if_full()
+
+    def _uncount(self) -> None:
+        # one item less from here up to the root
+        node = self
+        while node is not None:
+            node.count -= 1
+            if not node.count and node.children:
+                self.root.empty_nodes.append(node)
+            node = node.parent
 
     def search(self, area: pygame.FRect) -> List[any]:
-        found: List[any] = [p for p in self.items if area.colliderect(p.rect)]
-        for child in self.children:
-            if child.rect.colliderect(area):
-                found.extend(child.search(area))
+        found: List[any] = []
+        visited = 0
+        stack: List[QuadTree] = [self]
+        while stack:
+            node = stack.pop()
+            visited += 1
+            for p in node.items:
+                if area.colliderect(p.rect):
+                    found.append(p)
+            # reversed so children come off in order, same result order as walking it recursively
+            for child in reversed(node.children):
+                if child.count and child.loose_rect.colliderect(area):
+                    stack.append(child)
+        self.root._count_query(visited)
+        return found
+
+    def nearest(
+        self, point: pygame.Vector2, k: int = 1, max_distance: float = float("inf")
+    ) -> List[any]:
+        """
+        Up to k items closest to point, closest first, none further than max_distance.
+        Best first, nodes and items share 1 heap keyed by distance, so it stops as soon as k items come out of it.
+        """
+        px = point[0]
+        py = point[1]
+        max_distance_sq = max_distance * max_distance
+        found: List[any] = []
+        # tie breaker, nodes and items do not compare
+        order = count()
+        # (distance sq, order, is node, node or item)
+        heap: list = [(0.0, next(order), True, self)]
+        visited = 0
+        while heap and len(found) < k:
+            distance_sq, _, is_node, entry = heapq.heappop(heap)
+            if not is_node:
+                found.append(entry)
+                continue
+            visited += 1
+            for p in entry.items:
+                distance_sq = _distance_sq_to_rect(px, py, p.rect)
+                if distance_sq <= max_distance_sq:
+                    heapq.heappush(heap, (distance_sq, next(order), False, p))
+            for child in entry.children:
+                if not child.count:
+                    continue
+                distance_sq = _distance_sq_to_rect(px, py, child.loose_rect)
+                if distance_sq <= max_distance_sq:
+                    heapq.heappush(heap, (distance_sq, next(order), True, child))
+        self.root._count_query(visited)
         return found
 
+    def within_radius(self, point: pygame.Vector2, radius: float) -> List[any]:
+        """Every item whose rect is within radius of point (touches the circle), in no order"""
+        px = point[0]
+        py = point[1]
+        radius_sq = radius * radius
+        found: List[any] = []
+        stack: List[QuadTree] = [self]
+        visited = 0
+        while stack:
+            node = stack.pop()
+            visited += 1
+            for p in node.items:
+                if _distance_sq_to_rect(px, py, p.rect) <= radius_sq:
+                    found.append(p)
+            for child in node.children:
+                if (
+                    child.count
+                    and _distance_sq_to_rect(px, py, child.loose_rect) <= radius_sq
+                ):
+                    stack.append(child)
+        self.root._count_query(visited)
+        return found
+
+    def raycast(
+        self, origin: pygame.Vector2, direction: pygame.Vector2, max_t: float = 1.0
+    ) -> Optional[ItemRayHit]:
+        """
+        First item along origin + direction * t for t in 0..max_t, None if nothing.
+        Nodes are visited front to back, once the closest hit so far is nearer than the next node's entry it stops.
+        Like ray_vs_rect, a component that covers less than 0.1 px over the whole ray counts as parallel.
+        """
+        origin_x = origin[0]
+        origin_y = origin[1]
+        # kernel t is 0..1 over the whole ray
+        dir_x = direction[0] * max_t
+        dir_y = direction[1] * max_t
+        if not self.count or (dir_x == 0.0 and dir_y == 0.0):
+            return None
+        # colliderect against the ray's bounding box is way cheaper than the slab test, grown by 1 px since touching counts as a hit for the kernel but not for colliderect
+        ray_box = pygame.FRect(
+            min(origin_x, origin_x + dir_x),
+            min(origin_y, origin_y + dir_y),
+            abs(dir_x),
+            abs(dir_y),
+        ).inflate(2, 2)
+
+        best_item = None
+        best_t = inf
+        best_normal_x = 0.0
+        best_normal_y = 0.0
+        order = count()
+        # (entry t, order, node)
+        heap: list = [(0.0, next(order), self)]
+        visited = 0
+        while heap:
+            entry_t, _, node = heapq.heappop(heap)
+            if entry_t >= best_t:
+                break
+            visited += 1
+            for p in node.items:
+                rect = p.rect
+                if not ray_box.colliderect(rect):
+                    continue
+                hit, t, normal_x, normal_y = ray_vs_rect_kernel(
+                    origin_x, origin_y, dir_x, dir_y, rect.x, rect.y, rect.w, rect.h
+                )
+                # nan comes from an origin right on an edge with a parallel component, grazing, not a hit
+                if not hit or t != t or t > 1.0:
+                    continue
+                if t < 0.0:
+                    # started inside it
+                    t = 0.0
+                    normal_x = normal_y = 0.0
+                if t < best_t:
+                    best_item = p
+                    best_t = t
+                    best_normal_x = normal_x
+                    best_normal_y = normal_y
+            for child in node.children:
+                if not child.count:
+                    continue
+                rect = child.loose_rect
+                if not ray_box.colliderect(rect):
+                    continue
+                hit, t, _, _ = ray_vs_rect_kernel(
+                    origin_x, origin_y, dir_x, dir_y, rect.x, rect.y, rect.w, rect.h
+                )
+                if not hit or t > 1.0:
+                    continue
+                # inside it already (or nan, see above), better visit too early than skip it
+                if not t > 0.0:
+                    t = 0.0
+                if t < best_t:
+                    heapq.heappush(heap, (t, next(order), child))
+        self.root._count_query(visited)
+
+        if best_item is None:
+            return None
+        return ItemRayHit(
+            best_item,
+            pygame.Vector2(origin_x + dir_x * best_t, origin_y + dir_y * best_t),
+            pygame.Vector2(best_normal_x, best_normal_y),
+            best_t * max_t,
+        )
+
+    def query_pairs(
+        self, tag: Optional[str] = None, area: Optional[pygame.FRect] = None
+    ) -> List[Tuple[any, any]]:
+        """
+        Every overlapping pair once as (a, b), only items whose type is tag when given.
+        With an area only the pairs where at least 1 of the 2 overlaps it, and the rest is skipped.
+        One pass over the tree, the checks grow with how crowded it is, not with how many items there are.
+        """
+        pairs: List[Tuple[any, any]] = []
+        tests = 0
+        # (node, None) is every pair inside node's subtree, (a, b) is every pair between 2 disjoint subtrees
+        # a pair touching area sits inside the loose rect of any subtree holding one of them, so area prunes both
+        stack: List[Tuple[QuadTree, Optional[QuadTree]]] = []
+        if self.count and (area is None or self.loose_rect.colliderect(area)):
+            stack.append((self, None))
+        visited = 0
+        while stack:
+            a, b = stack.pop()
+            visited += 1 if b is None else 2
+            if b is None:
+                items = a._tagged(tag)
+                for i in range(len(items)):
+                    p = items[i]
+                    for j in range(i + 1, len(items)):
+                        tests += 1
+                        if p.rect.colliderect(items[j].rect):
+                            pairs.append((p, items[j]))
+                children = [child for child in a.children if child.count]
+                for i, child in enumerate(children):
+                    if items:
+                        tests += child._pairs_with(items, tag, pairs)
+                    touched = area is None or child.loose_rect.colliderect(area)
+                    if touched:
+                        stack.append((child, None))
+                    for other in children[i + 1 :]:
+                        if child.loose_rect.colliderect(other.loose_rect) and (
+                            touched or other.loose_rect.colliderect(area)
+                        ):
+                            stack.append((child, other))
+                continue
+            a_items = a._tagged(tag)
+            b_items = b._tagged(tag)
+            for p in a_items:
+                for q in b_items:
+                    tests += 1
+                    if p.rect.colliderect(q.rect):
+                        pairs.append((p, q))
+            if a_items:
+                for child in b.children:
+                    if child.count:
+                        tests += child._pairs_with(a_items, tag, pairs)
+            if b_items:
+                for child in a.children:
+                    if child.count:
+                        tests += child._pairs_with(b_items, tag, pairs)
+            for child in a.children:
+                if not child.count:
+                    continue
+                touched = area is None or child.loose_rect.colliderect(area)
+                for other in b.children:
+                    if (
+                        other.count
+                        and child.loose_rect.colliderect(other.loose_rect)
+                        and (touched or other.loose_rect.colliderect(area))
+                    ):
+                        stack.append((child, other))
+        self.pair_tests = tests
+        self.root._count_query(visited)
+        if area is not None:
+            pairs = [
+                pair
+                for pair in pairs
+                if area.colliderect(pair[0].rect) or area.colliderect(pair[1].rect)
+            ]
+        return pairs
+
+    def _count_query(self, visited: int) -> None:
+        # root only
+        self.queries += 1
+        self.nodes_visited += visited
+
+    def reset_query_stats(self) -> None:
+        """Room calls this every tick, so queries / nodes_visited hold a single tick"""
+        self.queries = 0
+        self.nodes_visited = 0
+
+    def stats(self) -> dict:
+        """
+        Shape of the tree right now plus the query counters, to tune MAX_ITEMS / MAX_DEPTH from.
+        leaf_items is how many leaves hold 0, 1, 2, ... items, node_items how many items sit on split nodes (too big or off center for any child).
+        """
+        node_count = 0
+        max_depth = 0
+        leaf_items: Dict[int, int] = {}
+        node_items = 0
+        stack: List[QuadTree] = [self]
+        while stack:
+            node = stack.pop()
+            node_count += 1
+            if node.depth > max_depth:
+                max_depth = node.depth
+            if node.children:
+                node_items += len(node.items)
+                stack.extend(node.children)
+            else:
+                leaf_items[len(node.items)] = leaf_items.get(len(node.items), 0) + 1
+        root = self.root
+        return {
+            "node_count": node_count,
+            "max_depth": max_depth,
+            "items": self.count,
+            "leaf_items": dict(sorted(leaf_items.items())),
+            "node_items": node_items,
+            "queries": root.queries,
+            "nodes_visited": root.nodes_visited,
+            "nodes_visited_per_query": root.nodes_visited / root.queries
+            if root.queries
+            else 0.0,
+        }
+
+    def _tagged(self, tag: Optional[str]) -> List[any]:
+        # this node's own items, only the tagged ones when asked
+        if tag is None or not self.items:
+            return self.items
+        return [p for p in self.items if p.type == tag]
+
+    def _pairs_with(self, others: List[any], tag: Optional[str], pairs: list) -> int:
+        # others (from outside this subtree) vs everything in this subtree, returns the checks done
+        tests = 0
+        for p in others:
+            rect = p.rect
+            stack = [self]
+            while stack:
+                node = stack.pop()
+                if not node.count or not node.loose_rect.colliderect(rect):
+                    continue
+                for q in node.items:
+                    if tag is None or q.type == tag:
+                        tests += 1
+                        if rect.colliderect(q.rect):
+                            pairs.append((p, q))
+                stack.extend(node.children)
+        return tests
+
     def clear(self) -> None:
         self.items.clear()
         for child in self.children:
             child.clear()
         self.children = []
+        self.count = 0
+        if self.root is self:
+            self.item_nodes.clear()
+            self.empty_nodes.clear()
+
+
+def _distance_sq_to_rect(px: float, py: float, rect: pygame.FRect) -> float:
+    # squared distance from the point to the closest spot of rect, 0 inside
+    dx = max(rect.left - px, 0.0, px - rect.right)
+    dy = max(rect.top - py, 0.0, py - rect.bottom)
+    return dx * dx + dy * dy
@@ -1,5 +1,8 @@
 import pygame
-from math import exp
+from math import ceil, exp, hypot, inf
+
+from const import CCD_MAX_SUBSTEPS, CCD_SAFE_FRACTION, TILE_COLLIDABLE, TILE_THIN
+from definitions import GridRayHit, MergedColliders
 
 # note
 # 1. camera finds candidate moving enemy rects in camera
@@ -7,9 +10,54 @@ from math import exp
 # 3. use the bottom func for ray vs rect, if it does hit something then player hits enemy, enemy can be another rect bullet or just enemy
 # 4. make sure that player, enemy and enemy bullets are slow, but maybe also have enemy that can also shoot ray at you too
 # 5. move slow so that there is no chance that you passes something through, slow as in in next frame you do not cover more than your half size
+#    move_and_slide enforces that, anything faster than CCD_SAFE_FRACTION of its size this frame gets sub stepped
+# 6. hitscan shots vs the room do not need rects at all, raycast_grid walks the collision layer cell by cell (amanatides woo)
+
+# What the kernels return on a miss, shared so a miss allocates nothing
+RAY_MISS = (False, 0.0, 0.0, 0.0)
+
+# Per frame counters, room resets them at the start of every update so after a frame they hold that frame only
+resolve_counters = {
+    "calls": 0,
+    "sat_early_outs": 0,
+    "ray_tests": 0,
+    "substepped_rects": 0,
+    "substeps": 0,
+}
 
-# For player to query collision (world map is just string, there are no boxes, this is the only solid box)
-one_tile_rect = pygame.FRect(0, 0, 16, 16)
+
+def reset_resolve_counters() -> None:
+    for key in resolve_counters:
+        resolve_counters[key] = 0
+
+
+def count_collidable_tiles(
+    l_tu: int,
+    t_tu: int,
+    r_tu: int,
+    b_tu: int,
+    width: int,
+    height: int,
+    collision_sat: list[int],
+) -> int:
+    """
+    | How many solid / thin tiles are in the inclusive tile region, O(1) with the summed area table.
+    |
+    | Region parts outside the room count as air.
+    """
+    l_tu = max(l_tu, 0)
+    t_tu = max(t_tu, 0)
+    r_tu = min(r_tu, width - 1)
+    b_tu = min(b_tu, height - 1)
+    if l_tu > r_tu or t_tu > b_tu:
+        return 0
+    stride = width + 1
+    return (
+        collision_sat[(b_tu + 1) * stride + r_tu + 1]
+        - collision_sat[t_tu * stride + r_tu + 1]
+        - collision_sat[(b_tu + 1) * stride + l_tu]
+        + collision_sat[t_tu * stride + l_tu]
+    )
 
 
 def determine_movement_direction(velocity_vector: pygame.Vector2) -> tuple[int, int]:
@@ -21,90 +69,150 @@ def determine_movement_direction(velocity_vector: pygame.Vector2) -> tuple[int,
     return direction_x, direction_y
 
 
-def ray_vs_rect(
-    ray_origin: pygame.Vector2,
-    ray_dir: pygame.Vector2,
-    target_rect: pygame.FRect,
-    contact_point: pygame.Vector2,
-    contact_normal: pygame.Vector2,
-    t_hit_near: list,
-) -> bool:
+def ray_vs_rect_kernel(
+    origin_x: float,
+    origin_y: float,
+    dir_x: float,
+    dir_y: float,
+    rect_x: float,
+    rect_y: float,
+    rect_w: float,
+    rect_h: float,
+) -> tuple[bool, float, float, float]:
     """
-    | True if light ray hits rect.
+    | Allocation free ray_vs_rect, plain floats in, (hit, t_hit_near, normal_x, normal_y) out.
     |
-    | Parameter needs ray origin, ray dir, target_rect.
-    |
-    | Need immutable list for extra info after computation.
-    | contact_point, contact_normal, t_hit_near.
+    | No Vector2, no FRect, no list. On a miss it returns the shared RAY_MISS tuple.
     """
 
     # Cache division
-    one_over_ray_dir_x: float = 0.0
-    one_over_ray_dir_y: float = 0.0
-    sign: float = -1.0
+    sign = -1.0
 
     # Handle infinity
-    if abs(ray_dir.x) < 0.1:
-        if ray_dir.x > 0.0:
+    if abs(dir_x) < 0.1:
+        if dir_x > 0.0:
             sign = 1.0
-        one_over_ray_dir_x = float("inf") * sign
+        one_over_ray_dir_x = inf * sign
     else:
-        one_over_ray_dir_x = 1.0 / ray_dir.x
+        one_over_ray_dir_x = 1.0 / dir_x
 
-    # Handle infinity
-    if abs(ray_dir.y) < 0.1:
-        if ray_dir.y > 0.0:
+    # Handle infinity (yes the sign is shared with x, keep it, move and slide results depend on it)
+    if abs(dir_y) < 0.1:
+        if dir_y > 0.0:
             sign = 1.0
-        one_over_ray_dir_y = float("inf") * sign
+        one_over_ray_dir_y = inf * sign
     else:
-        one_over_ray_dir_y = 1.0 / ray_dir.y
+        one_over_ray_dir_y = 1.0 / dir_y
 
     # Get near far time
-    t_near = pygame.Vector2(
-        (target_rect.x - ray_origin.x) * one_over_ray_dir_x,
-        (target_rect.y - ray_origin.y) * one_over_ray_dir_y,
-    )
-    t_far = pygame.Vector2(
-        (target_rect.x + target_rect.width - ray_origin.x) * one_over_ray_dir_x,
-        (target_rect.y + target_rect.height - ray_origin.y) * one_over_ray_dir_y,
-    )
+    t_near_x = (rect_x - origin_x) * one_over_ray_dir_x
+    t_near_y = (rect_y - origin_y) * one_over_ray_dir_y
+    t_far_x = (rect_x + rect_w - origin_x) * one_over_ray_dir_x
+    t_far_y = (rect_y + rect_h - origin_y) * one_over_ray_dir_y
 
     # Sort near far time
-    if t_near.x > t_far.x:
-        t_near.x, t_far.x = t_far.x, t_near.x
-    if t_near.y > t_far.y:
-        t_near.y, t_far.y = t_far.y, t_near.y
+    if t_near_x > t_far_x:
+        t_near_x, t_far_x = t_far_x, t_near_x
+    if t_near_y > t_far_y:
+        t_near_y, t_far_y = t_far_y, t_near_y
 
     # COLLISION RULE
-    if t_near.x > t_far.y or t_near.y > t_far.x:
-        return False
+    if t_near_x > t_far_y or t_near_y > t_far_x:
+        return RAY_MISS
 
-    # Get near far time
-    t_hit_near[0] = max(t_near.x, t_near.y)
-    t_hit_far: float = min(t_far.x, t_far.y)
+    # Get near far time, same as max / min but without the call
+    t_hit_near = t_near_y if t_near_y > t_near_x else t_near_x
+    t_hit_far = t_far_y if t_far_y < t_far_x else t_far_x
 
     if t_hit_far < 0:
-        return False
-
-    # Compute contact point
-    contact_point = ray_origin + t_hit_near[0] * ray_dir
+        return RAY_MISS
 
     # Compute contact normal
-    if t_near.x > t_near.y:
-        contact_normal.x, contact_normal.y = (1, 0) if ray_dir.x < 0 else (-1, 0)
-    elif t_near.x < t_near.y:
-        contact_normal.x, contact_normal.y = (0, 1) if ray_dir.y < 0 else (0, -1)
-    else:
-        if one_over_ray_dir_x < 0 and one_over_ray_dir_y < 0:
-            contact_normal.x, contact_normal.y = (1, 1)
-        elif one_over_ray_dir_x > 0 and one_over_ray_dir_y > 0:
-            contact_normal.x, contact_normal.y = (-1, -1)
-        elif one_over_ray_dir_x < 0 and one_over_ray_dir_y > 0:
-            contact_normal.x, contact_normal.y = (1, -1)
-        elif one_over_ray_dir_x > 0 and one_over_ray_dir_y < 0:
-            contact_normal.x, contact_normal.y = (-1, 1)
+    if t_near_x > t_near_y:
+        return True, t_hit_near, (1.0 if dir_x < 0 else -1.0), 0.0
+    elif t_near_x < t_near_y:
+        return True, t_hit_near, 0.0, (1.0 if dir_y < 0 else -1.0)
+    return (
+        True,
+        t_hit_near,
+        (1.0 if one_over_ray_dir_x < 0 else -1.0),
+        (1.0 if one_over_ray_dir_y < 0 else -1.0),
+    )
+
+
+def dynamic_rect_vs_rect_kernel(
+    vel_x: float,
+    vel_y: float,
+    collider_x: float,
+    collider_y: float,
+    collider_w: float,
+    collider_h: float,
+    target_x: float,
+    target_y: float,
+    target_w: float,
+    target_h: float,
+    dt: int,
+) -> tuple[bool, float, float, float]:
+    """
+    | Allocation free dynamic_rect_vs_rect, plain floats in, (hit, t_hit_near, normal_x, normal_y) out.
+    |
+    | hit is only True when the hit happens this frame (0 <= t < 1).
+    | But the normal is filled whenever the ray hits, even in the past or future, (0, 0) if it misses.
+    | That is what dynamic_rect_vs_rect always left in contact_normal, move and slide relies on it.
+    """
+
+    if not abs(vel_x) > 0.0 and not abs(vel_y) > 0.0:
+        return RAY_MISS
+    half_w = collider_w / 2
+    half_h = collider_h / 2
+    hit, t_hit_near, normal_x, normal_y = ray_vs_rect_kernel(
+        collider_x + half_w,
+        collider_y + half_h,
+        vel_x * dt,
+        vel_y * dt,
+        target_x - half_w,
+        target_y - half_h,
+        target_w + collider_w,
+        target_h + collider_h,
+    )
+    if hit:
+        return t_hit_near >= 0.0 and t_hit_near < 1.0, t_hit_near, normal_x, normal_y
+    return RAY_MISS
 
-    return True
+
+def ray_vs_rect(
+    ray_origin: pygame.Vector2,
+    ray_dir: pygame.Vector2,
+    target_rect: pygame.FRect,
+    contact_point: pygame.Vector2,
+    contact_normal: pygame.Vector2,
+    t_hit_near: list,
+) -> bool:
+    """
+    | True if light ray hits rect.
+    |
+    | Parameter needs ray origin, ray dir, target_rect.
+    |
+    | Need immutable list for extra info after computation.
+    | contact_point, contact_normal, t_hit_near.
+    |
+    | Thin wrapper over ray_vs_rect_kernel, use the kernel in hot loops.
+    """
+
+    hit, t, normal_x, normal_y = ray_vs_rect_kernel(
+        ray_origin.x,
+        ray_origin.y,
+        ray_dir.x,
+        ray_dir.y,
+        target_rect.x,
+        target_rect.y,
+        target_rect.width,
+        target_rect.height,
+    )
+    if hit:
+        t_hit_near[0] = t
+        contact_normal.x, contact_normal.y = normal_x, normal_y
+    return hit
 
 
 def dynamic_rect_vs_rect(
@@ -118,50 +226,27 @@ def dynamic_rect_vs_rect(
 ) -> bool:
     """
     | If dynamic actor is not moving, returns False.
+    |
+    | Thin wrapper over dynamic_rect_vs_rect_kernel, use the kernel in hot loops.
     """
 
-    if not abs(input_velocity.x) > 0.0 and not abs(input_velocity.y) > 0.0:
-        return False
-    expanded_target: pygame.FRect = pygame.FRect(
-        target_rect.x - collider_rect.width / 2,
-        target_rect.y - collider_rect.height / 2,
-        target_rect.width + collider_rect.width,
-        target_rect.height + collider_rect.height,
+    hit, t, normal_x, normal_y = dynamic_rect_vs_rect_kernel(
+        input_velocity.x,
+        input_velocity.y,
+        collider_rect.x,
+        collider_rect.y,
+        collider_rect.width,
+        collider_rect.height,
+        target_rect.x,
+        target_rect.y,
+        target_rect.width,
+        target_rect.height,
+        dt,
     )
-    hit = ray_vs_rect(
-        pygame.Vector2(
-            collider_rect.x + collider_rect.width / 2,
-            collider_rect.y + collider_rect.height / 2,
-        ),
-        input_velocity * dt,
-        expanded_target,
-        contact_point,
-        contact_normal,
-        t_hit_near,
-    )
-    if hit:
-        return t_hit_near[0] >= 0.0 and t_hit_near[0] < 1.0
-    else:
-        return False
-
-
-def get_tile_and_position(
-    world_tu_x: int,
-    world_tu_y: int,
-    width: int,
-    height: int,
-    world_map_grid_data: list[str],
-    tileheight: int,
-) -> tuple[str, tuple[int, int]]:
-    """
-    Returns the tile type and its pixel position (x, y).
-    Returns ("-1", (-1, -1)) if out of bounds.
-    """
-    if 0 <= world_tu_x < width and 0 <= world_tu_y < height:
-        tile = world_map_grid_data[world_tu_y * width + world_tu_x]
-        return tile, (world_tu_x * tileheight, world_tu_y * tileheight)
-    else:
-        return "-1", (-1, -1)  # Out of bounds
+    if normal_x or normal_y:
+        t_hit_near[0] = t
+        contact_normal.x, contact_normal.y = normal_x, normal_y
+    return hit
 
 
 def compute_range(start: int, length: int, direction: int) -> range:
@@ -180,16 +265,21 @@ def resolve_vel_against_solid_tiles(
     tileheight: pygame.FRect,
     width: int,
     height: int,
-    world_map_grid_data: list[str],
+    world_map_grid_data: bytes,
     contact_point: pygame.Vector2,
     contact_normal: pygame.Vector2,
     is_player: bool = False,
-):
+    collision_sat: list[int] | None = None,
+    merged_colliders: MergedColliders | None = None,
+) -> int:
     """
-    Vel is immutable, just pass it in and after you r done calling this the val updates! This thing returns what you hit as well, tile type in str
+    Vel is immutable, just pass it in and after you r done calling this the val updates! This thing returns what you hit as well, tile flags in int (0 if nothing)
+
+    Pass the room collision_sat to skip the tile loop when the swept region is all air.
+    Pass the room merged_colliders to collide with the merged boxes instead of tile by tile.
     """
 
-    tile_you_hit = ""
+    tile_you_hit = 0
 
     # Compute the future position based on velocity and delta time
     distance_vector = velocity * dt
@@ -208,6 +298,14 @@ def resolve_vel_against_solid_tiles(
         int(combined_rect.bottom // tileheight),
     )
 
+    # All air in the swept region? nothing to hit, the tile loop would skip every tile anyway
+    resolve_counters["calls"] += 1
+    if collision_sat is not None and not count_collidable_tiles(
+        l_tu, t_tu, r_tu, b_tu, width, height, collision_sat
+    ):
+        resolve_counters["sat_early_outs"] += 1
+        return tile_you_hit
+
     # Collect solid tiles in the combined rect
     combined_rect_width_ru = r_tu - l_tu + 1
     combined_rect_height_ru = b_tu - t_tu + 1
@@ -221,50 +319,313 @@ def resolve_vel_against_solid_tiles(
     x_range = compute_range(combined_rect_x_ru, combined_rect_width_ru, direction_x)
     y_range = compute_range(combined_rect_y_ru, combined_rect_height_ru, direction_y)
 
+    # Merged mode, same region and order but each big box is tested once
+    if merged_colliders is not None:
+        return resolve_vel_against_merged_colliders(
+            given_rect,
+            dt,
+            velocity,
+            width,
+            height,
+            merged_colliders,
+            x_range,
+            y_range,
+            contact_point,
+            contact_normal,
+            is_player,
+        )
+
+    # Read the collider once, the kernel takes plain floats
+    collider_x, collider_y = given_rect.x, given_rect.y
+    collider_w, collider_h = given_rect.width, given_rect.height
+
     # Iterate region candidate
     for world_tu_x in x_range:
+        # Ignore out of bound
+        if not 0 <= world_tu_x < width:
+            continue
         for world_tu_y in y_range:
-            # Get each one in solid_collision_map_list
-            tile, position = get_tile_and_position(
-                world_tu_x,
-                world_tu_y,
-                width,
-                height,
-                world_map_grid_data,
-                tileheight,
-            )
-            # Ignore air or out of bound
-            if tile == "0" or tile == "-1":
+            if not 0 <= world_tu_y < height:
+                continue
+            # Read the flags straight off the collision layer
+            tile = world_map_grid_data[world_tu_y * width + world_tu_x]
+            # Ignore air and non collidable (like sticky bit only)
+            if not tile & TILE_COLLIDABLE:
                 continue
 
             # update what u hit
             tile_you_hit = tile
 
-            # Prepare query tile pos
-            one_tile_rect.x = position[0]
-            one_tile_rect.y = position[1]
-            t_hit_near = [0.0]
-            # This one is passed the correct sorted, so returns correct data like t hit near
-            hit = dynamic_rect_vs_rect(
-                velocity,
-                given_rect,
-                one_tile_rect,
-                contact_point,
-                contact_normal,
-                t_hit_near,
+            # Plain float kernel, tile pos is the target, this one is passed the correct sorted, so returns correct data like t hit near
+            resolve_counters["ray_tests"] += 1
+            hit, t_hit_near, normal_x, normal_y = dynamic_rect_vs_rect_kernel(
+                velocity.x,
+                velocity.y,
+                collider_x,
+                collider_y,
+                collider_w,
+                collider_h,
+                world_tu_x * tileheight,
+                world_tu_y * tileheight,
+                tileheight,
+                tileheight,
                 dt,
             )
+            if normal_x or normal_y:
+                contact_normal.x, contact_normal.y = normal_x, normal_y
             if hit:
                 # PLAYER ONLY do not resolve vel if moving upward and hitting thin
-                if is_player and tile_you_hit == "2" and contact_normal.y == 1:
+                if is_player and tile_you_hit & TILE_THIN and normal_y == 1:
                     return tile_you_hit
 
                 # RESOLVE VEL
-                velocity.x += contact_normal.x * abs(velocity.x) * (1 - t_hit_near[0])
-                velocity.y += contact_normal.y * abs(velocity.y) * (1 - t_hit_near[0])
+                velocity.x += normal_x * abs(velocity.x) * (1 - t_hit_near)
+                velocity.y += normal_y * abs(velocity.y) * (1 - t_hit_near)
+
+    return tile_you_hit
+
+
+def resolve_vel_against_merged_colliders(
+    given_rect: pygame.FRect,
+    dt: int,
+    velocity: pygame.Vector2,
+    width: int,
+    height: int,
+    merged_colliders: MergedColliders,
+    x_range: range,
+    y_range: range,
+    contact_point: pygame.Vector2,
+    contact_normal: pygame.Vector2,
+    is_player: bool = False,
+) -> int:
+    """
+    | Merged box version of the tile loop in resolve_vel_against_solid_tiles.
+    |
+    | Walks the same tile region in the same order, but looks up which merged box covers each tile and tests every box once.
+    """
+
+    tile_you_hit = 0
+    box_id_by_tile = merged_colliders.box_id_by_tile
+    tested_box_ids = set()
+    collider_x, collider_y = given_rect.x, given_rect.y
+    collider_w, collider_h = given_rect.width, given_rect.height
+
+    # Iterate region candidate
+    for world_tu_x in x_range:
+        # Ignore out of bound
+        if not 0 <= world_tu_x < width:
+            continue
+        for world_tu_y in y_range:
+            if not 0 <= world_tu_y < height:
+                continue
+            # Ignore air and boxes already tested
+            box_id = box_id_by_tile[world_tu_y * width + world_tu_x]
+            if box_id == -1 or box_id in tested_box_ids:
+                continue
+            tested_box_ids.add(box_id)
+
+            # update what u hit
+            tile_you_hit = merged_colliders.flags[box_id]
+
+            box = merged_colliders.rects[box_id]
+            resolve_counters["ray_tests"] += 1
+            hit, t_hit_near, normal_x, normal_y = dynamic_rect_vs_rect_kernel(
+                velocity.x,
+                velocity.y,
+                collider_x,
+                collider_y,
+                collider_w,
+                collider_h,
+                box.x,
+                box.y,
+                box.width,
+                box.height,
+                dt,
+            )
+            if normal_x or normal_y:
+                contact_normal.x, contact_normal.y = normal_x, normal_y
+            if hit:
+                # PLAYER ONLY do not resolve vel if moving upward and hitting thin
+                if is_player and tile_you_hit & TILE_THIN and normal_y == 1:
+                    return tile_you_hit
+
+                # RESOLVE VEL
+                velocity.x += normal_x * abs(velocity.x) * (1 - t_hit_near)
+                velocity.y += normal_y * abs(velocity.y) * (1 - t_hit_near)
+
+    return tile_you_hit
+
+
+def count_substeps(
+    given_rect: pygame.FRect, velocity: pygame.Vector2, dt: float
+) -> int:
+    """
+    | How many move and slide steps this frame needs so no step moves more than CCD_SAFE_FRACTION of the rect size.
+    """
+    displacement = max(abs(velocity.x), abs(velocity.y)) * dt
+    safe_displacement = CCD_SAFE_FRACTION * min(given_rect.width, given_rect.height)
+    if displacement <= safe_displacement:
+        return 1
+    # a point / line shaped rect has no thickness to stay under, any move can tunnel, so take as many steps as allowed
+    if safe_displacement <= 0:
+        return CCD_MAX_SUBSTEPS
+    return min(ceil(displacement / safe_displacement), CCD_MAX_SUBSTEPS)
+
+
+def move_and_slide(
+    given_rect: pygame.FRect,
+    dt: float,
+    velocity: pygame.Vector2,
+    tileheight: int,
+    width: int,
+    height: int,
+    world_map_grid_data: bytes,
+    contact_point: pygame.Vector2,
+    contact_normal: pygame.Vector2,
+    is_player: bool = False,
+    collision_sat: list[int] | None = None,
+    merged_colliders: MergedColliders | None = None,
+) -> int:
+    """
+    | Move and slide just like in Godot, resolve vel against the tiles then move the rect by it.
+    |
+    | Slow movers (nearly everything) take one step, exactly like resolve then rect += vel * dt.
+    | Fast movers (dt spike, bullets) are split into equal sub steps so they can not tunnel.
+    | Returns the last tile flags hit, contact_normal keeps the last hit normal.
+    """
+
+    steps = count_substeps(given_rect, velocity, dt)
+    if steps > 1:
+        resolve_counters["substepped_rects"] += 1
+        resolve_counters["substeps"] += steps
+    step_dt = dt / steps
+
+    tile_you_hit = 0
+    for step in range(steps):
+        velocity_x, velocity_y = velocity.x, velocity.y
+        tile_you_hit = (
+            resolve_vel_against_solid_tiles(
+                given_rect,
+                step_dt,
+                velocity,
+                tileheight,
+                width,
+                height,
+                world_map_grid_data,
+                contact_point,
+                contact_normal,
+                is_player,
+                collision_sat,
+                merged_colliders,
+            )
+            or tile_you_hit
+        )
+        # Update pos
+        given_rect.x += velocity.x * step_dt
+        given_rect.y += velocity.y * step_dt
+        # Now touching on a resolved axis, what is left of vel there only walks into the wall
+        # and it is too small per sub step for ray_vs_rect to see (< 0.1 px counts as not moving), so drop it
+        if step < steps - 1:
+            if velocity.x != velocity_x:
+                velocity.x = 0.0
+            if velocity.y != velocity_y:
+                velocity.y = 0.0
 
     return tile_you_hit
 
 
+def raycast_grid(
+    origin: pygame.Vector2,
+    direction: pygame.Vector2,
+    max_distance: float,
+    tileheight: int,
+    width: int,
+    height: int,
+    world_map_grid_data: bytes,
+    flags: int = TILE_COLLIDABLE,
+) -> GridRayHit | None:
+    """
+    | First tile with any of flags (solid or thin by default) along the ray, None if nothing within max_distance.
+    |
+    | Walks the grid cell by cell, so the cost is the cells crossed, not the room size.
+    | Direction does not need to be normalized, distance is in px.
+    """
+
+    length = hypot(direction.x, direction.y)
+    if length == 0.0:
+        return None
+    dir_x = direction.x / length
+    dir_y = direction.y / length
+
+    # Start cell
+    world_tu_x = int(origin.x // tileheight)
+    world_tu_y = int(origin.y // tileheight)
+
+    # Which way to step, how far (in t) one whole cell is, and t to the first cell edge
+    if dir_x > 0.0:
+        step_x = 1
+        t_delta_x = tileheight / dir_x
+        t_max_x = ((world_tu_x + 1) * tileheight - origin.x) / dir_x
+    elif dir_x < 0.0:
+        step_x = -1
+        t_delta_x = tileheight / -dir_x
+        t_max_x = (world_tu_x * tileheight - origin.x) / dir_x
+    else:
+        step_x = 0
+        t_delta_x = t_max_x = inf
+    if dir_y > 0.0:
+        step_y = 1
+        t_delta_y = tileheight / dir_y
+        t_max_y = ((world_tu_y + 1) * tileheight - origin.y) / dir_y
+    elif dir_y < 0.0:
+        step_y = -1
+        t_delta_y = tileheight / -dir_y
+        t_max_y = (world_tu_y * tileheight - origin.y) / dir_y
+    else:
+        step_y = 0
+        t_delta_y = t_max_y = inf
+
+    t = 0.0
+    normal_x = normal_y = 0
+    while True:
+        if 0 <= world_tu_x < width and 0 <= world_tu_y < height:
+            tile = world_map_grid_data[world_tu_y * width + world_tu_x]
+            if tile & flags:
+                return GridRayHit(
+                    tile,
+                    world_tu_x,
+                    world_tu_y,
+                    pygame.Vector2(origin.x + dir_x * t, origin.y + dir_y * t),
+                    pygame.Vector2(normal_x, normal_y),
+                    t,
+                )
+        # Out of the room and going further out, nothing left to hit
+        elif (
+            (world_tu_x < 0 and step_x <= 0)
+            or (world_tu_x >= width and step_x >= 0)
+            or (world_tu_y < 0 and step_y <= 0)
+            or (world_tu_y >= height and step_y >= 0)
+        ):
+            return None
+
+        # Step into the next cell, the normal is the side we entered from
+        if t_max_x < t_max_y:
+            t = t_max_x
+            t_max_x += t_delta_x
+            world_tu_x += step_x
+            normal_x, normal_y = -step_x, 0
+        else:
+            t = t_max_y
+            t_max_y += t_delta_y
+            world_tu_y += step_y
+            normal_x, normal_y = 0, -step_y
+        if t > max_distance:
+            return None
+
+
 def exp_decay(a: float, b: float, decay: float, dt: int) -> float:
     return b + (a - b) * exp(-decay * dt)
+
+
+def lerp(a: float, b: float, t: float) -> float:
+    return a + (b - a) * t
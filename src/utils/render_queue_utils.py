@@ -0,0 +1,77 @@
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+# note
+# 1. sprites are not blitted when they draw, they submit (surface, dest, area) here and room flushes it all once a frame
+# 2. flush goes layer by layer (lower first), inside a layer 1 fblits per source surface, so every bat of a kind on screen is 1 call
+# 3. fblits takes no area, so a spritesheet area becomes a subsurface made once and kept, a frame is the same subsurface every frame after that
+# 4. grouping by source reorders sprites inside a layer, so anything that has to be on top of something else goes in a higher layer
+
+
+class RenderQueue:
+    def __init__(self) -> None:
+        # layer -> source surface -> (surface, dest) to hand to fblits, source surfaces in the order they first showed up
+        self.layers: Dict[int, Dict[pygame.Surface, List[tuple]]] = {}
+        # source surface -> id(area) -> (area, subsurface of that area), area is kept so its id stays its own
+        self.frames: Dict[
+            pygame.Surface, Dict[int, Tuple[pygame.Rect, pygame.Surface]]
+        ] = {}
+        # where the last submit went, sprites of 1 kind come in a row so most submits skip the 2 dict lookups
+        self._last_surface: Optional[pygame.Surface] = None
+        self._last_layer: int = 0
+        self._last_batch: List[tuple] = []
+        self._last_frames: Dict[int, Tuple[pygame.Rect, pygame.Surface]] = {}
+        # sprites / fblits calls the last flush did
+        self.sprites: int = 0
+        self.fblits_calls: int = 0
+
+    def submit(
+        self,
+        surface: pygame.Surface,
+        dest: Tuple[float, float],
+        area: Optional[pygame.Rect] = None,
+        layer: int = 0,
+    ) -> None:
+        """
+        Blit surface (only area of it when given) at dest on the next flush.
+        area is cut out once and looked up by identity after that, so it must not change once submitted (animator frames never do).
+        """
+        if surface is not self._last_surface or layer != self._last_layer:
+            self._start_batch(surface, layer)
+        if area is None:
+            self._last_batch.append((surface, dest))
+            return
+        frame = self._last_frames.get(id(area))
+        if frame is None:
+            frame = self._last_frames[id(area)] = (area, surface.subsurface(area))
+        self._last_batch.append((frame[1], dest))
+
+    def _start_batch(self, surface: pygame.Surface, layer: int) -> None:
+        sources = self.layers.get(layer)
+        if sources is None:
+            sources = self.layers[layer] = {}
+        batch = sources.get(surface)
+        if batch is None:
+            batch = sources[surface] = []
+        frames = self.frames.get(surface)
+        if frames is None:
+            frames = self.frames[surface] = {}
+        self._last_surface = surface
+        self._last_layer = layer
+        self._last_batch = batch
+        self._last_frames = frames
+
+    def flush(self, screen: pygame.Surface) -> None:
+        """Draw everything submitted since the last flush, lower layers first, then forget it"""
+        sprites = 0
+        calls = 0
+        for layer in sorted(self.layers):
+            for batch in self.layers[layer].values():
+                screen.fblits(batch)
+                sprites += len(batch)
+                calls += 1
+        self.layers.clear()
+        self._last_surface = None
+        self.sprites = sprites
+        self.fblits_calls = calls
@@ -0,0 +1,187 @@
+import pygame
+from typing import Dict, List, Optional, Tuple
+
+from const import SPATIAL_HASH_CELL_SIZE
+
+# note
+# 1. same insert / move / remove / collapse_empty / search / clear as QuadTree, so a room layer can use either
+# 2. uniform cells of cell_size px over the given rect, an item sits in every cell its rect touches
+# 3. cells live in a dict keyed by row * cols + col, only cells with something in them exist
+# 4. search dedups items that touch more than one of the searched cells
+# 5. query_pairs only reports a pair in the first cell both items share, so no dedup set there
+
+
+class SpatialHashGrid:
+    def __init__(
+        self, rect: pygame.FRect, cell_size: int = SPATIAL_HASH_CELL_SIZE
+    ) -> None:
+        self.rect: pygame.FRect = rect
+        self.cell_size: int = cell_size
+        self.cols: int = max(1, -int(-rect.w // cell_size))
+        self.rows: int = max(1, -int(-rect.h // cell_size))
+        self.cells: Dict[int, List[any]] = {}
+        # cell range (left, top, right, bottom) each item is in, so move / remove do not have to search for it
+        self.item_cells: Dict[any, Tuple[int, int, int, int]] = {}
+        # cells that went empty since the last collapse_empty
+        self.empty_cells: List[int] = []
+        # rect vs rect checks the last query_pairs did
+        self.pair_tests: int = 0
+
+    def _cell_range(self, rect: pygame.FRect) -> Tuple[int, int, int, int]:
+        # cells touched by rect, clamped to the grid (items hanging off the edge live in the edge cells)
+        cell_size = self.cell_size
+        last_col = self.cols - 1
+        last_row = self.rows - 1
+        left = int((rect.left - self.rect.x) // cell_size)
+        top = int((rect.top - self.rect.y) // cell_size)
+        right = int((rect.right - self.rect.x) // cell_size)
+        bottom = int((rect.bottom - self.rect.y) // cell_size)
+        return (
+            min(max(left, 0), last_col),
+            min(max(top, 0), last_row),
+            min(max(right, 0), last_col),
+            min(max(bottom, 0), last_row),
+        )
+
+    def _add(self, particle: any, cell_range: Tuple[int, int, int, int]) -> None:
+        left, top, right, bottom = cell_range
+        cells = self.cells
+        for row in range(top, bottom + 1):
+            key = row * self.cols
+            for col in range(left, right + 1):
+                cell = cells.get(key + col)
+                if cell is None:
+                    cells[key + col] = [particle]
+                else:
+                    cell.append(particle)
+        self.item_cells[particle] = cell_range
+
+    def _discard(self, particle: any, cell_range: Tuple[int, int, int, int]) -> None:
+        left, top, right, bottom = cell_range
+        cells = self.cells
+        for row in range(top, bottom + 1):
+            key = row * self.cols
+            for col in range(left, right + 1):
+                cell = cells[key + col]
+                cell.remove(particle)
+                if not cell:
+                    self.empty_cells.append(key + col)
+
+    def insert(self, particle: any) -> bool:
+        if not self.rect.colliderect(particle.rect):
+            return False
+        self._add(particle, self._cell_range(particle.rect))
+        return True
+
+    def remove(self, particle: any) -> bool:
+        """Take it out, False if it was not in the grid. Emptied cells stay until collapse_empty"""
+        cell_range = self.item_cells.pop(particle, None)
+        if cell_range is None:
+            return False
+        self._discard(particle, cell_range)
+        return True
+
+    def move(self, particle: any) -> bool:
+        """Call after the particle rect moved, same return as insert. Only touches cells when its cell range changed"""
+        cell_range = self.item_cells.get(particle)
+        if cell_range is None:
+            return self.insert(particle)
+        if not self.rect.colliderect(particle.rect):
+            # left the whole grid, like insert it is just not in there
+            self.remove(particle)
+            return False
+        new_cell_range = self._cell_range(particle.rect)
+        if new_cell_range == cell_range:
+            return True
+        self._discard(particle, cell_range)
+        self._add(particle, new_cell_range)
+        return True
+
+    def collapse_empty(self) -> None:
+        """Drop cells that went empty, lazily, so an item hopping back and forth does not churn the dict"""
+        cells = self.cells
+        for key in self.empty_cells:
+            cell = cells.get(key)
+            if cell is not None and not cell:
+                del cells[key]
+        self.empty_cells.clear()
+
+    def search(self, area: pygame.FRect) -> List[any]:
+        left, top, right, bottom = self._cell_range(area)
+        cells = self.cells
+        found: List[any] = []
+        if left == right and top == bottom:
+            # 1 cell, nothing can be seen twice
+            for p in cells.get(top * self.cols + left, ()):
+                if area.colliderect(p.rect):
+                    found.append(p)
+            return found
+        seen = set()
+        for row in range(top, bottom + 1):
+            key = row * self.cols
+            for col in range(left, right + 1):
+                cell = cells.get(key + col)
+                if not cell:
+                    continue
+                for p in cell:
+                    if p not in seen:
+                        seen.add(p)
+                        if area.colliderect(p.rect):
+                            found.append(p)
+        return found
+
+    def query_pairs(
+        self, tag: Optional[str] = None, area: Optional[pygame.FRect] = None
+    ) -> List[Tuple[any, any]]:
+        """
+        Every overlapping pair once as (a, b), only items whose type is tag when given.
+        With an area only the pairs where at least 1 of the 2 overlaps it, and the rest is skipped.
+        Only items sharing a cell get checked, the checks grow with how crowded cells are, not with how many items there are.
+        """
+        pairs: List[Tuple[any, any]] = []
+        tests = 0
+        item_cells = self.item_cells
+        cols = self.cols
+        cells = self.cells
+        keys = cells.keys()
+        if area is not None:
+            # every cell of everything touching area, whatever overlaps one of those shares a cell with it
+            keys = set()
+            for p in self.search(area):
+                left, top, right, bottom = item_cells[p]
+                for row in range(top, bottom + 1):
+                    keys.update(range(row * cols + left, row * cols + right + 1))
+        for key in keys:
+            cell = cells.get(key)
+            if cell is None or len(cell) < 2:
+                continue
+            row, col = divmod(key, cols)
+            for i in range(len(cell)):
+                p = cell[i]
+                if tag is not None and p.type != tag:
+                    continue
+                p_left, p_top, _, _ = item_cells[p]
+                for j in range(i + 1, len(cell)):
+                    q = cell[j]
+                    if tag is not None and q.type != tag:
+                        continue
+                    tests += 1
+                    if not p.rect.colliderect(q.rect):
+                        continue
+                    # the first cell both are in is the one that reports it
+                    q_left, q_top, _, _ = item_cells[q]
+                    if max(p_left, q_left) == col and max(p_top, q_top) == row:
+                        pairs.append((p, q))
+        self.pair_tests = tests
+        if area is not None:
+            pairs = [
+                pair
+                for pair in pairs
+                if area.colliderect(pair[0].rect) or area.colliderect(pair[1].rect)
+            ]
+        return pairs
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.item_cells.clear()
+        self.empty_cells.clear()
@@ -0,0 +1,135 @@
+import pygame
+from bisect import bisect_left
+from typing import List, Optional, Set, Tuple
+
+# note
+# 1. same insert / move / remove / collapse_empty / search / query_pairs / clear as QuadTree, so a room layer can use it too
+# 2. items are kept sorted by rect left, a search / query_pairs only looks at the run of items whose x range can reach it
+# 3. move only marks the list dirty, it gets re sorted once before the next query, positions barely change between frames
+#    so the list is almost sorted and list.sort (timsort finds the sorted runs and merges them) is close to 1 pass
+# 4. remove is lazy too, the item is dropped from the list on that same re sort
+#    an item removed and put back before that sort is in the list twice, the sort keeps only its first copy
+
+
+class SweepAndPrune:
+    def __init__(self, rect: pygame.FRect) -> None:
+        self.rect: pygame.FRect = rect
+        # sorted by rect left after _sort, lefts is the same order, for bisect
+        self.items: List[any] = []
+        self.lefts: List[float] = []
+        self.members: Set[any] = set()
+        # widest item seen, how far left of an area an overlapping item can start
+        self.max_w: float = 0.0
+        self.dirty: bool = False
+        # items may hold removed ones / doubles, only set by remove, a plain insert never makes a double
+        self.removed: bool = False
+        # rect vs rect checks the last query_pairs did
+        self.pair_tests: int = 0
+
+    def insert(self, particle: any) -> bool:
+        if not self.rect.colliderect(particle.rect):
+            return False
+        self.items.append(particle)
+        self.members.add(particle)
+        self.max_w = max(self.max_w, particle.rect.w)
+        self.dirty = True
+        return True
+
+    def remove(self, particle: any) -> bool:
+        """Take it out, False if it was not in. Leaves the list on the next sort"""
+        if particle not in self.members:
+            return False
+        self.members.remove(particle)
+        self.removed = True
+        self.dirty = True
+        return True
+
+    def move(self, particle: any) -> bool:
+        """Call after the particle rect moved, same return as insert. Only marks the list for a re sort"""
+        if particle not in self.members:
+            return self.insert(particle)
+        if not self.rect.colliderect(particle.rect):
+            # left the whole area, like insert it is just not in there
+            self.remove(particle)
+            return False
+        self.max_w = max(self.max_w, particle.rect.w)
+        self.dirty = True
+        return True
+
+    def collapse_empty(self) -> None:
+        """Nothing to collapse, here so room can treat every spatial index the same"""
+
+    def _sort(self) -> None:
+        if not self.dirty:
+            return
+        if self.removed:
+            # dict.fromkeys dedups by identity and keeps the first copy in place
+            members = self.members
+            self.items = [p for p in dict.fromkeys(self.items) if p in members]
+            self.removed = False
+        self.items.sort(key=_left)
+        self.lefts = [p.rect.left for p in self.items]
+        self.dirty = False
+
+    def _span(self, left: float, right: float) -> Tuple[int, int]:
+        # index range of the items whose left is in [left, right)
+        return bisect_left(self.lefts, left), bisect_left(self.lefts, right)
+
+    def search(self, area: pygame.FRect) -> List[any]:
+        self._sort()
+        start, end = self._span(area.left - self.max_w, area.right)
+        colliderect = area.colliderect
+        return [p for p in self.items[start:end] if colliderect(p.rect)]
+
+    def query_pairs(
+        self, tag: Optional[str] = None, area: Optional[pygame.FRect] = None
+    ) -> List[Tuple[any, any]]:
+        """
+        Every overlapping pair once as (a, b), only items whose type is tag when given.
+        With an area only the pairs where at least 1 of the 2 overlaps it, and the rest is skipped.
+        One sweep along x, each item is only checked against the ones that start before it ends.
+        """
+        self._sort()
+        items = self.items
+        lefts = self.lefts
+        start, end = 0, len(items)
+        if area is not None:
+            # a pair with 1 in area has both lefts within 2 widths left of it and 1 width right of it
+            start, end = self._span(area.left - 2 * self.max_w, area.right + self.max_w)
+        pairs: List[Tuple[any, any]] = []
+        tests = 0
+        for i in range(start, end):
+            p = items[i]
+            if tag is not None and p.type != tag:
+                continue
+            rect = p.rect
+            right = rect.right
+            j = i + 1
+            while j < end and lefts[j] < right:
+                q = items[j]
+                j += 1
+                if tag is not None and q.type != tag:
+                    continue
+                tests += 1
+                if rect.colliderect(q.rect):
+                    pairs.append((p, q))
+        self.pair_tests = tests
+        if area is not None:
+            pairs = [
+                pair
+                for pair in pairs
+                if area.colliderect(pair[0].rect) or area.colliderect(pair[1].rect)
+            ]
+        return pairs
+
+    def clear(self) -> None:
+        self.items.clear()
+        self.lefts.clear()
+        self.members.clear()
+        self.max_w = 0.0
+        self.dirty = False
+        self.removed = False
+
+
+def _left(particle: any) -> float:
+    return particle.rect.left
@@ -1,15 +1,57 @@
 import json
+import numpy as np
 import pygame
+from math import ceil
 from os import path
 
-from const import SPRITESHEET_WIDTH
+from const import (
+    TILE_COLLIDABLE,
+    TILE_SLIPPERY_FLOOR,
+    TILE_SOLID,
+    TILE_STICKY_FLOOR,
+    TILE_THIN,
+)
+from utils.chunked_bg_utils import ChunkedBackground
+from utils.collider_merge_utils import merge_collision_layer
 from utils.remove_file_extension import remove_file_extension
 
+# tile layer name in tiled -> flag it sets on the collision layer
+COLLISION_LAYER_FLAGS = {
+    "Solid": TILE_SOLID,
+    "Thin": TILE_THIN,
+    "Sticky": TILE_STICKY_FLOOR,
+    "Slippery": TILE_SLIPPERY_FLOOR,
+}
+
+# object layers in tiled whose objects go in the per tile trigger index
+# todo: item drop, save station, cutscene toggler, etc...
+TRIGGER_LAYER_NAMES = ("Doors",)
+
+
+def tile_range(
+    x: float, y: float, w: float, h: float, tileheight: int
+) -> tuple[int, int, int, int]:
+    """
+    | Inclusive (left, top, right, bottom) tiles a rect covers, not clamped to the room.
+    |
+    | Touching a tile edge is not covering it, same as colliderect, a 0 size rect covers the tile it is in.
+    """
+    l_tu = int(x // tileheight)
+    t_tu = int(y // tileheight)
+    r_tu = max(ceil((x + w) / tileheight) - 1, l_tu)
+    b_tu = max(ceil((y + h) / tileheight) - 1, t_tu)
+    return l_tu, t_tu, r_tu, b_tu
+
 
 def tilemap_routine(
-    tile_json_path: str, base_dir: str, current_stage: str, spritesheet: pygame.Surface
+    tile_json_path: str,
+    base_dir: str,
+    current_stage: str,
+    spritesheet: pygame.Surface,
+    merge_colliders: bool = False,
+    headless: bool = False,
 ):
-    """i give u list of obj like enemies, players positions, doors, str collision map and pre rendered bg"""
+    """i give u list of obj like enemies, players positions, doors, bytes collision map of tile flags, per tile trigger index and chunked bg (None when headless)"""
 
     # important! spritesheet must have 32 tiles per row or 512 x 512 px in size, this is by design for saving mem sake
 
@@ -17,11 +59,12 @@ def tilemap_routine(
     tileheight = 0
     width = 0
     height = 0
-    solid_layer_index = 0
-    thin_layer_index = 0
+    flag_layers = []
+    bg_layers = []
     players = []
     enemies = []
     doors = []
+    trigger_objects = []
     tile_sheet_name = ""
     old_new_spritesheet = {"old": "", "new": ""}
 
@@ -34,7 +77,8 @@ def tilemap_routine(
         tile_sheet_name = remove_file_extension(data["tilesets"][0]["source"])
 
     # if this json data has diff tile sheet, then we are entering a new stage room, switch stage!
-    if current_stage != tile_sheet_name:
+    # headless never draws, so no tile sheet and no bg
+    if current_stage != tile_sheet_name and not headless:
         # load new stage image, overwrite passed in spritesheet with new one
         spritesheet = pygame.image.load(
             path.join(base_dir, "pngs", f"{tile_sheet_name}.png")
@@ -44,11 +88,6 @@ def tilemap_routine(
     old_new_spritesheet["old"] = current_stage
     old_new_spritesheet["new"] = tile_sheet_name
 
-    # prepare pre rendered bg paper
-    pre_rendered_bg: pygame.Surface = pygame.Surface(
-        (width * tileheight, height * tileheight), pygame.SRCALPHA
-    )
-
     # iter json
     for index, layer in enumerate(data["layers"]):
         # collect player positions (in a room there are finite possible pos a player starts in, left door, right door, etc...)
@@ -65,42 +104,52 @@ def tilemap_routine(
             for door in layer["objects"]:
                 doors.append(door)
         # todo: collect item drop, save station, cutscene toggler, etc...
+        if layer["name"] in TRIGGER_LAYER_NAMES:
+            trigger_objects.extend(layer["objects"])
 
-        # find where solid and thin collision layer ones index are, this is for me to make the str collision map
+        # find the collision layers, this is for me to make the flag collision map
         if not layer["type"] == "tilelayer":
             continue
-        if layer["name"] == "Solid":
-            solid_layer_index = index
-        if layer["name"] == "Thin":
-            thin_layer_index = index
-        # draw pre rendered bg
-        for index, tile_id in enumerate(layer["data"]):
-            tile_id -= 1
-            if tile_id == -1:
-                continue
-            # calc destination on world
-            x = index % width
-            y = index // width
-            dest_x = x * tileheight
-            dest_y = y * tileheight
-            # get spritesheet region position
-            src_x = (tile_id % SPRITESHEET_WIDTH) * tileheight
-            src_y = (tile_id // SPRITESHEET_WIDTH) * tileheight
-            # start painting the pre rendered bg
-            pre_rendered_bg.blit(
-                spritesheet, (dest_x, dest_y), (src_x, src_y, tileheight, tileheight)
-            )
+        if layer["name"] in COLLISION_LAYER_FLAGS:
+            flag_layers.append((COLLISION_LAYER_FLAGS[layer["name"]], layer["data"]))
+        # every tile layer is bg, painted a chunk at a time when the camera gets there
+        bg_layers.append(layer["data"])
 
     # get solid, thin and other static collidable / hitable things THAT DOES NOT HAVE DATA (like sticky floor, or slippery floor, but NOT ITEMS or DOORS)
-    # cuz these are to hold id only, like oh im on id 2, that means its thin, then they do whatever they want with that info, like if its on id 2 and press jump we drop off of it
-    collision_layer = "".join(
-        "1"
-        if data["layers"][solid_layer_index]["data"][y * width + x] != 0
-        else "2"
-        if data["layers"][thin_layer_index]["data"][y * width + x] != 0
-        else "0"
-        for y in range(height)
-        for x in range(width)
+    # cuz these are to hold flags only, like oh im on a tile with the thin bit, then they do whatever they want with that info, like if its thin and press jump we drop off of it
+    collision_layer = bytearray(width * height)
+    for flag, layer_data in flag_layers:
+        for index, tile_id in enumerate(layer_data):
+            if tile_id != 0:
+                collision_layer[index] |= flag
+    # solid wins over thin, a tile is never both
+    for index, tile in enumerate(collision_layer):
+        if tile & TILE_SOLID and tile & TILE_THIN:
+            collision_layer[index] = tile & ~TILE_THIN
+    collision_layer = bytes(collision_layer)
+    collision_grid = np.frombuffer(collision_layer, dtype=np.uint8).reshape(
+        height, width
+    )
+
+    # tile index -> ids of the trigger objects covering it, static so it is baked once here and nobody needs a quadtree per trigger kind
+    # sparse, most tiles have none
+    trigger_layer: dict[int, list[int]] = {}
+    for obj in trigger_objects:
+        # tile objects (the ones with a gid) are placed by their bottom left
+        y = obj["y"] - obj["height"] if "gid" in obj else obj["y"]
+        l_tu, t_tu, r_tu, b_tu = tile_range(
+            obj["x"], y, obj["width"], obj["height"], tileheight
+        )
+        for world_tu_y in range(max(t_tu, 0), min(b_tu, height - 1) + 1):
+            for world_tu_x in range(max(l_tu, 0), min(r_tu, width - 1) + 1):
+                trigger_layer.setdefault(world_tu_y * width + world_tu_x, []).append(
+                    obj["id"]
+                )
+
+    # summed area table of solid / thin tiles, 1 row and col of padding so any region count is 4 reads
+    collision_sat_grid = np.zeros((height + 1, width + 1), dtype=np.int32)
+    collision_sat_grid[1:, 1:] = (
+        ((collision_grid & TILE_COLLIDABLE) != 0).cumsum(axis=0).cumsum(axis=1)
     )
 
     return {
@@ -108,7 +157,22 @@ def tilemap_routine(
         "height": height,
         "tileheight": tileheight,
         "collision_layer": collision_layer,
-        "pre_rendered_bg": pre_rendered_bg,
+        # same memory as collision_layer, just seen as a (height, width) grid for numpy users
+        "collision_grid": collision_grid,
+        # flat list for the scalar resolver (indexing a list is way faster than a numpy scalar read), grid for numpy users
+        "collision_sat": collision_sat_grid.ravel().tolist(),
+        "collision_sat_grid": collision_sat_grid,
+        # big boxes made of the collision layer, None unless asked for
+        "merged_colliders": merge_collision_layer(
+            collision_layer, width, height, tileheight
+        )
+        if merge_colliders
+        else None,
+        "trigger_layer": trigger_layer,
+        # headless never draws, so no bg
+        "background": None
+        if headless
+        else ChunkedBackground(bg_layers, width, height, tileheight, spritesheet),
         "players": players,
         "enemies": enemies,
         "doors": doors,